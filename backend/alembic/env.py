@@ -3,7 +3,7 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from sqlmodel import SQLModel
 from app.db.models import *
-from app.db.session import engine
+from app.db.search import SQLITE_FTS_TABLE
 from dotenv import load_dotenv
 from alembic import context
 from os import getenv
@@ -23,6 +23,18 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = SQLModel.metadata
 
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Objetos propios de un dialecto: índices de búsqueda solo de Postgres y
+    # la tabla FTS5 (con sus tablas internas) solo de SQLite
+    if type_ == "table" and reflected and name.startswith(SQLITE_FTS_TABLE):
+        return False
+    ddl_if = getattr(object, "_ddl_if", None)
+    if ddl_if is not None and ddl_if.dialect and ddl_if.dialect != context.get_context().dialect.name:
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -47,6 +59,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -68,7 +81,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,42 @@
+"""Unaccent description search
+
+Revision ID: 3d9c5e7a1f24
+Revises: 8e3241a9404f
+Create Date: 2026-10-18 05:12:40.631907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.search import POSTGRES_UNACCENT_DDL, TSVECTOR_EXPRESSION, UNACCENT_FUNCTION
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d9c5e7a1f24'
+down_revision: Union[str, None] = '8e3241a9404f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PREVIOUS_TSVECTOR_EXPRESSION = "to_tsvector('simple', coalesce(description, ''))"
+
+
+def upgrade() -> None:
+    # SQLite ya ignora los acentos con remove_diacritics en la tabla FTS5
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for statement in POSTGRES_UNACCENT_DDL:
+        op.execute(statement)
+    op.drop_index('ix_transactions_description_tsv', table_name='transactions')
+    op.create_index('ix_transactions_description_tsv', 'transactions', [sa.text(TSVECTOR_EXPRESSION)],
+                    postgresql_using='gin')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_transactions_description_tsv', table_name='transactions')
+    op.create_index('ix_transactions_description_tsv', 'transactions', [sa.text(PREVIOUS_TSVECTOR_EXPRESSION)],
+                    postgresql_using='gin')
+    op.execute(f'DROP FUNCTION IF EXISTS {UNACCENT_FUNCTION}(text)')
@@ -0,0 +1,32 @@
+"""Add transaction fingerprint
+
+Revision ID: 65a9d9f14015
+Revises: 22c42b45adb1
+Create Date: 2026-10-18 03:24:08.489037
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '65a9d9f14015'
+down_revision: Union[str, None] = '22c42b45adb1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Las filas existentes quedan sin huella: NULL no choca con la restricción única
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.add_column(sa.Column('fingerprint', sqlmodel.sql.sqltypes.AutoString(length=32), nullable=True))
+        batch_op.create_unique_constraint('uq_transactions_user_id_fingerprint', ['user_id', 'fingerprint'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.drop_constraint('uq_transactions_user_id_fingerprint', type_='unique')
+        batch_op.drop_column('fingerprint')
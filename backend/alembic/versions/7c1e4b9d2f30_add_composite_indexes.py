@@ -0,0 +1,42 @@
+"""Add composite indexes for per-user queries
+
+Revision ID: 7c1e4b9d2f30
+Revises: 2a9a69a5e5ab
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4b9d2f30'
+down_revision: Union[str, None] = '2a9a69a5e5ab'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_categories_user_id', 'categories', ['user_id'], unique=False)
+    op.create_index('ix_budget_user_id_start_date_end_date', 'budget', ['user_id', 'start_date', 'end_date'], unique=False)
+    op.create_index('ix_budget_category_id', 'budget', ['category_id'], unique=False)
+    op.create_index('ix_transactions_user_id_trasaction_date', 'transactions', ['user_id', 'trasaction_date'], unique=False)
+    op.create_index('ix_transactions_user_id_category_id', 'transactions', ['user_id', 'category_id'], unique=False)
+    op.create_index('ix_transactions_category_id', 'transactions', ['category_id'], unique=False)
+    op.create_index('ix_transactions_budget_id', 'transactions', ['budget_id'], unique=False)
+    op.create_index('ix_savingpots_user_id', 'savingpots', ['user_id'], unique=False)
+    op.create_index('ix_recurringbills_user_id', 'recurringbills', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recurringbills_user_id', table_name='recurringbills')
+    op.drop_index('ix_savingpots_user_id', table_name='savingpots')
+    op.drop_index('ix_transactions_budget_id', table_name='transactions')
+    op.drop_index('ix_transactions_category_id', table_name='transactions')
+    op.drop_index('ix_transactions_user_id_category_id', table_name='transactions')
+    op.drop_index('ix_transactions_user_id_trasaction_date', table_name='transactions')
+    op.drop_index('ix_budget_category_id', table_name='budget')
+    op.drop_index('ix_budget_user_id_start_date_end_date', table_name='budget')
+    op.drop_index('ix_categories_user_id', table_name='categories')
@@ -0,0 +1,31 @@
+"""Add fx rate updated_at
+
+Revision ID: 8e3241a9404f
+Revises: f83b2d6c4e17
+Create Date: 2026-10-18 03:54:15.027285
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3241a9404f'
+down_revision: Union[str, None] = 'f83b2d6c4e17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SQLite no admite ADD COLUMN con un default no constante: se recrea la tabla
+    recreate = 'always' if op.get_bind().dialect.name == 'sqlite' else 'auto'
+    with op.batch_alter_table('fxrate', recreate=recreate) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'),
+                                      nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('fxrate') as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,102 @@
+"""Add typed recurring bill schedule
+
+Revision ID: a32486bd5f62
+Revises: 0132de55daab
+Create Date: 2026-10-18 03:06:04.715139
+
+"""
+import calendar
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a32486bd5f62'
+down_revision: Union[str, None] = '0132de55daab'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def add_month(value: date) -> date:
+    year, month = value.year + value.month // 12, value.month % 12 + 1
+    return date(year, month, min(value.day, calendar.monthrange(year, month)[1]))
+
+
+def parse_due_date(value: str, today: date) -> date:
+    # due_date era texto libre: fecha ISO o día del mes; lo demás vence hoy
+    value = (value or "").strip()
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        pass
+    if value.isdigit() and 1 <= int(value) <= 31:
+        day = min(int(value), calendar.monthrange(today.year, today.month)[1])
+        due = today.replace(day=day)
+        return due if due >= today else add_month(due)
+    return today
+
+
+def upgrade() -> None:
+    op.create_table('billoccurrence',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('bill_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('due_on', sa.Date(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('is_paid', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['bill_id'], ['recurringbills.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('bill_id', 'due_on')
+    )
+    op.create_index('ix_billoccurrence_user_id_due_on', 'billoccurrence', ['user_id', 'due_on'], unique=False)
+    op.add_column('recurringbills', sa.Column('starts_on', sa.Date(), nullable=True))
+    op.add_column('recurringbills', sa.Column('interval_unit', sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default='month'))
+    op.add_column('recurringbills', sa.Column('interval_count', sa.Integer(), nullable=False, server_default='1'))
+    op.add_column('recurringbills', sa.Column('next_due_at', sa.Date(), nullable=True))
+
+    # Cada factura existente pasa a mensual desde su due_date; el vencimiento
+    # actual se materializa con su is_paid y la regla avanza al mes siguiente
+    bind = op.get_bind()
+    bills = sa.table('recurringbills', sa.column('id'), sa.column('user_id'), sa.column('amount'),
+                     sa.column('due_date'), sa.column('is_paid'),
+                     sa.column('starts_on'), sa.column('next_due_at'))
+    occurrences = sa.table('billoccurrence', sa.column('bill_id'), sa.column('user_id'),
+                           sa.column('due_on'), sa.column('amount'), sa.column('is_paid'))
+    today = date.today()
+    for bill in bind.execute(sa.select(bills)).all():
+        due_on = parse_due_date(bill.due_date, today)
+        bind.execute(occurrences.insert().values(
+            bill_id=bill.id, user_id=bill.user_id, due_on=due_on, amount=bill.amount, is_paid=bill.is_paid))
+        bind.execute(bills.update().where(bills.c.id == bill.id).values(
+            starts_on=due_on, next_due_at=add_month(due_on)))
+
+    op.drop_index('ix_recurringbills_user_id', table_name='recurringbills')
+    with op.batch_alter_table('recurringbills') as batch_op:
+        batch_op.alter_column('starts_on', existing_type=sa.Date(), nullable=False)
+        batch_op.alter_column('next_due_at', existing_type=sa.Date(), nullable=False)
+        batch_op.drop_column('due_date')
+        batch_op.drop_column('is_paid')
+    op.create_index('ix_recurringbills_next_due_at', 'recurringbills', ['next_due_at'], unique=False)
+    op.create_index('ix_recurringbills_user_id_next_due_at', 'recurringbills', ['user_id', 'next_due_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recurringbills_user_id_next_due_at', table_name='recurringbills')
+    op.drop_index('ix_recurringbills_next_due_at', table_name='recurringbills')
+    op.add_column('recurringbills', sa.Column('is_paid', sa.BOOLEAN(), nullable=False, server_default=sa.false()))
+    op.add_column('recurringbills', sa.Column('due_date', sa.VARCHAR(), nullable=True))
+    op.execute("UPDATE recurringbills SET due_date = CAST(next_due_at AS VARCHAR)")
+    with op.batch_alter_table('recurringbills') as batch_op:
+        batch_op.alter_column('due_date', existing_type=sa.VARCHAR(), nullable=False)
+        batch_op.drop_column('next_due_at')
+        batch_op.drop_column('interval_count')
+        batch_op.drop_column('interval_unit')
+        batch_op.drop_column('starts_on')
+    op.create_index('ix_recurringbills_user_id', 'recurringbills', ['user_id'], unique=False)
+    op.drop_index('ix_billoccurrence_user_id_due_on', table_name='billoccurrence')
+    op.drop_table('billoccurrence')
@@ -0,0 +1,59 @@
+"""Add transaction fingerprint table
+
+Revision ID: b6e1f4a8c230
+Revises: 3d9c5e7a1f24
+Create Date: 2026-10-18 05:31:07.214583
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+from app.db.search import SQLITE_FTS_DDL, SQLITE_FTS_TABLE
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e1f4a8c230'
+down_revision: Union[str, None] = '3d9c5e7a1f24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def set_fingerprint_key(columns: list[str] | None) -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        if columns is None:
+            op.drop_constraint('uq_transactions_user_id_fingerprint', 'transactions', type_='unique')
+        else:
+            op.create_unique_constraint('uq_transactions_user_id_fingerprint', 'transactions', columns)
+        return
+    with op.batch_alter_table('transactions') as batch_op:
+        if columns is None:
+            batch_op.drop_constraint('uq_transactions_user_id_fingerprint', type_='unique')
+        else:
+            batch_op.create_unique_constraint('uq_transactions_user_id_fingerprint', columns)
+    # batch_alter_table recrea la tabla y con ella se pierden los triggers de FTS5
+    for statement in SQLITE_FTS_DDL:
+        op.execute(statement)
+    op.execute(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    op.create_table('transactionfingerprint',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('fingerprint', sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'fingerprint')
+    )
+    # Las huellas ya importadas pasan a la tabla nueva antes de soltar la restricción vieja
+    op.execute(
+        "INSERT INTO transactionfingerprint (user_id, fingerprint) "
+        "SELECT DISTINCT user_id, fingerprint FROM transactions WHERE fingerprint IS NOT NULL"
+    )
+    set_fingerprint_key(None)
+
+
+def downgrade() -> None:
+    set_fingerprint_key(['user_id', 'fingerprint', 'trasaction_date'])
+    op.drop_table('transactionfingerprint')
@@ -0,0 +1,103 @@
+"""Store money as integer minor units with currency
+
+Revision ID: bbbe1019d614
+Revises: 2ae3398ce05a
+Create Date: 2026-10-18 03:12:41.902311
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bbbe1019d614'
+down_revision: Union[str, None] = '2ae3398ce05a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEFAULT_CURRENCY = os.getenv("DEFAULT_CURRENCY", "USD")
+
+# Columnas monetarias por tabla; se guardan en centésimos
+MONEY_COLUMNS = {
+    'transactions': ['amount'],
+    'budget': ['amount', 'consumed_amount'],
+    'savingpots': ['target_amount', 'current_amount'],
+    'potcontribution': ['amount', 'balance'],
+    'recurringbills': ['amount'],
+    'billoccurrence': ['amount'],
+}
+CURRENCY_TABLES = ['transactions', 'budget', 'savingpots', 'recurringbills']
+
+
+def create_monthlyspend(with_currency: bool) -> None:
+    money = sa.BigInteger() if with_currency else sa.Float()
+    key = ['user_id', 'category_id', 'month'] + (['currency'] if with_currency else [])
+    op.create_table('monthlyspend',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    *([sa.Column('currency', sqlmodel.sql.sqltypes.AutoString(length=3), nullable=False)] if with_currency else []),
+    sa.Column('total', money, nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('min_amount', money, nullable=False),
+    sa.Column('max_amount', money, nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint(*key)
+    )
+    op.create_index('ix_monthlyspend_user_id_month', 'monthlyspend', ['user_id', 'month'], unique=False)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        month = "date_trunc('month', trasaction_date)::date"
+    else:
+        month = "date(trasaction_date, 'start of month')"
+    columns = ', currency' if with_currency else ''
+    op.execute(
+        f"INSERT INTO monthlyspend (user_id, category_id, month{columns}, total, count, min_amount, max_amount) "
+        f"SELECT user_id, category_id, {month}{columns}, SUM(amount), COUNT(*), MIN(amount), MAX(amount) "
+        f"FROM transactions GROUP BY user_id, category_id, {month}{columns}"
+    )
+
+
+def upgrade() -> None:
+    for table in CURRENCY_TABLES:
+        op.add_column(table, sa.Column('currency', sqlmodel.sql.sqltypes.AutoString(length=3),
+                                       nullable=False, server_default=DEFAULT_CURRENCY))
+    # Redondeo como to_minor (mitades lejos del cero) sobre el decimal, no sobre el
+    # double: en Postgres numeric redondea así, y el round de SQLite a 2 decimales también
+    if op.get_bind().dialect.name == 'postgresql':
+        to_minor = 'ROUND({column}::numeric * 100)'
+    else:
+        to_minor = 'ROUND(ROUND({column}, 2) * 100)'
+    for table, columns in MONEY_COLUMNS.items():
+        for column in columns:
+            op.execute(f"UPDATE {table} SET {column} = {to_minor.format(column=column)}")
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.alter_column(column, existing_type=sa.Float(), type_=sa.BigInteger(),
+                                      existing_nullable=False, postgresql_using=f'{column}::bigint')
+
+    # La moneda pasa a formar parte de la clave del acumulado: se reconstruye
+    op.drop_index('ix_monthlyspend_user_id_month', table_name='monthlyspend')
+    op.drop_table('monthlyspend')
+    create_monthlyspend(with_currency=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_monthlyspend_user_id_month', table_name='monthlyspend')
+    op.drop_table('monthlyspend')
+    for table, columns in MONEY_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.alter_column(column, existing_type=sa.BigInteger(), type_=sa.Float(),
+                                      existing_nullable=False)
+        for column in columns:
+            op.execute(f"UPDATE {table} SET {column} = {column} / 100.0")
+    for table in CURRENCY_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('currency')
+    create_monthlyspend(with_currency=False)
@@ -0,0 +1,48 @@
+"""Add transaction description search
+
+Revision ID: e5d3c1a7b902
+Revises: a1f36e99a182
+Create Date: 2026-10-18 03:41:12.304518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.search import SQLITE_FTS_DDL, SQLITE_FTS_DROP, SQLITE_FTS_TABLE
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5d3c1a7b902'
+down_revision: Union[str, None] = 'a1f36e99a182'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Expresión del índice en esta revisión; la versión sin acentos llega en 3d9c5e7a1f24
+TSVECTOR_EXPRESSION = "to_tsvector('simple', coalesce(description, ''))"
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index('ix_transactions_description_tsv', 'transactions', [sa.text(TSVECTOR_EXPRESSION)],
+                        postgresql_using='gin')
+        op.create_index('ix_transactions_description_trgm', 'transactions', ['description'],
+                        postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+        # Indexa las transacciones existentes desde la tabla de contenido
+        op.execute(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_transactions_description_trgm', table_name='transactions')
+        op.drop_index('ix_transactions_description_tsv', table_name='transactions')
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS_DROP:
+            op.execute(statement)
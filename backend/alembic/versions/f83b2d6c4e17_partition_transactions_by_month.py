@@ -0,0 +1,97 @@
+"""Partition transactions by month
+
+Revision ID: f83b2d6c4e17
+Revises: e5d3c1a7b902
+Create Date: 2026-10-18 04:02:37.918264
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.partitions import (
+    PARTITION_MONTHS_AHEAD, add_months, create_default_partition_sql, create_partition_sql, month_start)
+from app.db.search import SQLITE_FTS_DDL, SQLITE_FTS_TABLE
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f83b2d6c4e17'
+down_revision: Union[str, None] = 'e5d3c1a7b902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Expresión del índice en esta revisión; la versión sin acentos llega en 3d9c5e7a1f24
+TSVECTOR_EXPRESSION = "to_tsvector('simple', coalesce(description, ''))"
+
+
+def create_keys_and_indexes(primary_key: list[str], fingerprint_key: list[str]) -> None:
+    op.create_primary_key('transactions_pkey', 'transactions', primary_key)
+    op.create_foreign_key('transactions_user_id_fkey', 'transactions', 'user',
+                          ['user_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('transactions_category_id_fkey', 'transactions', 'categories',
+                          ['category_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('transactions_budget_id_fkey', 'transactions', 'budget',
+                          ['budget_id'], ['id'], ondelete='CASCADE')
+    op.create_unique_constraint('uq_transactions_user_id_fingerprint', 'transactions', fingerprint_key)
+    op.create_index('ix_transactions_user_id_trasaction_date', 'transactions', ['user_id', 'trasaction_date'])
+    op.create_index('ix_transactions_user_id_category_id', 'transactions', ['user_id', 'category_id'])
+    op.create_index('ix_transactions_category_id', 'transactions', ['category_id'])
+    op.create_index('ix_transactions_budget_id', 'transactions', ['budget_id'])
+    op.create_index('ix_transactions_description_tsv', 'transactions', [sa.text(TSVECTOR_EXPRESSION)],
+                    postgresql_using='gin')
+    op.create_index('ix_transactions_description_trgm', 'transactions', ['description'],
+                    postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
+
+
+def rebuild_transactions(partitioned: bool) -> None:
+    """Copia transactions a una tabla nueva (particionada o no) y recrea claves e índices
+
+    La secuencia del id se desvincula antes de borrar la tabla vieja para conservarla.
+    Los índices se crean después de copiar los datos, que es más rápido.
+    """
+    op.execute('ALTER SEQUENCE transactions_id_seq OWNED BY NONE')
+    op.execute('ALTER TABLE transactions RENAME TO transactions_old')
+    if partitioned:
+        op.execute('CREATE TABLE transactions (LIKE transactions_old INCLUDING DEFAULTS) '
+                   'PARTITION BY RANGE (trasaction_date)')
+        first = op.get_bind().execute(sa.text('SELECT min(trasaction_date) FROM transactions_old')).scalar()
+        current = month_start(date.today())
+        month = month_start(first.date()) if first is not None else current
+        op.execute(create_default_partition_sql())
+        while month <= add_months(current, PARTITION_MONTHS_AHEAD):
+            op.execute(create_partition_sql(month))
+            month = add_months(month, 1)
+    else:
+        op.execute('CREATE TABLE transactions (LIKE transactions_old INCLUDING DEFAULTS)')
+    op.execute('INSERT INTO transactions SELECT * FROM transactions_old')
+    op.execute('DROP TABLE transactions_old CASCADE')
+    op.execute('ALTER SEQUENCE transactions_id_seq OWNED BY transactions.id')
+
+
+def set_sqlite_fingerprint_key(columns: list[str]) -> None:
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.drop_constraint('uq_transactions_user_id_fingerprint', type_='unique')
+        batch_op.create_unique_constraint('uq_transactions_user_id_fingerprint', columns)
+    # batch_alter_table recrea la tabla y con ella se pierden los triggers de FTS5
+    for statement in SQLITE_FTS_DDL:
+        op.execute(statement)
+    op.execute(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    # Toda restricción única de una tabla particionada debe incluir la clave de partición
+    if op.get_bind().dialect.name == 'postgresql':
+        rebuild_transactions(partitioned=True)
+        create_keys_and_indexes(['id', 'trasaction_date'], ['user_id', 'fingerprint', 'trasaction_date'])
+    else:
+        set_sqlite_fingerprint_key(['user_id', 'fingerprint', 'trasaction_date'])
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        rebuild_transactions(partitioned=False)
+        create_keys_and_indexes(['id'], ['user_id', 'fingerprint'])
+    else:
+        set_sqlite_fingerprint_key(['user_id', 'fingerprint'])
@@ -1,14 +1,17 @@
+from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from ..auth.jwt_manager import verify_jwt_token
+from ..auth.user_cache import AUTH_MODE, cache_user, get_cached_user
 from ..db.models import User
-from ..services.user_services import get_user_by_id
-from ..db.session import SessionDep
+from ..db.session import AsyncSessionDep
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+async def get_current_user(
+    session: AsyncSessionDep, token: str = Depends(oauth2_scheme)
+) -> User:
     try:
         # Verificar el token y obtener el usuario
         payload = verify_jwt_token(token)
@@ -18,13 +21,19 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token inválido: 'sub' no encontrado en el payload",
             )
+        if AUTH_MODE == "stateless":
+            user = get_cached_user(user_id=user_id)
+            if user is not None:
+                return user
         # Obtener el usuario desde la base de datos
-        user = get_user_by_id(user_id, SessionDep)
+        user = await session.get(User, UUID(user_id))
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Usuario no encontrado",
             )
+        if AUTH_MODE == "stateless":
+            cache_user(user)
         return user
     except Exception as e:
         raise HTTPException(
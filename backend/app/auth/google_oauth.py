@@ -0,0 +1,199 @@
+import asyncio
+import os
+import re
+from time import monotonic
+from typing import Annotated
+from urllib.parse import urlencode
+import httpx
+import jwt
+from dotenv import load_dotenv
+from fastapi import Depends
+
+load_dotenv(override=True)
+GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
+GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
+GOOGLE_REDIRECT_URI = os.getenv("GOOGLE_REDIRECT_URI")
+# Configurable para apuntar a un IdP local en pruebas
+GOOGLE_DISCOVERY_URL = os.getenv(
+    "GOOGLE_DISCOVERY_URL", "https://accounts.google.com/.well-known/openid-configuration")
+GOOGLE_PEOPLE_URL = os.getenv(
+    "GOOGLE_PEOPLE_URL",
+    "https://people.googleapis.com/v1/people/me?personFields=birthdays,emailAddresses,names,photos")
+GOOGLE_HTTP_TIMEOUT = float(os.getenv("GOOGLE_HTTP_TIMEOUT", "10"))
+GOOGLE_HTTP_MAX_CONNECTIONS = int(os.getenv("GOOGLE_HTTP_MAX_CONNECTIONS", "20"))
+# Vida de los documentos cuando la respuesta no trae Cache-Control max-age
+GOOGLE_DEFAULT_CACHE_TTL = float(os.getenv("GOOGLE_DEFAULT_CACHE_TTL", "3600"))
+
+GOOGLE_SCOPES = [
+    "openid",
+    "https://www.googleapis.com/auth/userinfo.email",
+    "https://www.googleapis.com/auth/userinfo.profile",
+    "https://www.googleapis.com/auth/user.birthday.read",
+]
+GOOGLE_ISSUERS = ["accounts.google.com", "https://accounts.google.com"]
+# Endpoints publicados por Google, usados mientras no se haya leído el documento de discovery
+DEFAULT_DISCOVERY = {
+    "issuer": "https://accounts.google.com",
+    "authorization_endpoint": "https://accounts.google.com/o/oauth2/auth",
+    "token_endpoint": "https://oauth2.googleapis.com/token",
+    "jwks_uri": "https://www.googleapis.com/oauth2/v3/certs",
+}
+
+MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class GoogleOAuthError(Exception):
+    pass
+
+
+def cache_ttl(response: httpx.Response) -> float:
+    """Segundos que se puede cachear la respuesta según Cache-Control"""
+    cache_control = response.headers.get("cache-control", "").lower()
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0.0
+    match = MAX_AGE.search(cache_control)
+    return float(match.group(1)) if match else GOOGLE_DEFAULT_CACHE_TTL
+
+
+class GoogleOAuth:
+    """Cliente OAuth/OpenID de Google sobre un único httpx.AsyncClient con pool de conexiones
+
+    El documento de discovery y las claves de firma (JWKS) se cachean el tiempo
+    que indica su Cache-Control. Un 'kid' desconocido fuerza una recarga de las
+    claves, que es como se ve una rotación de Google.
+    """
+
+    def __init__(
+        self,
+        client_id: str | None = GOOGLE_CLIENT_ID,
+        client_secret: str | None = GOOGLE_CLIENT_SECRET,
+        redirect_uri: str | None = GOOGLE_REDIRECT_URI,
+        discovery_url: str = GOOGLE_DISCOVERY_URL,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.redirect_uri = redirect_uri
+        self.discovery_url = discovery_url
+        self.transport = transport
+        self._http: httpx.AsyncClient | None = None
+        self._discovery: tuple[float, dict] | None = None
+        self._keys: tuple[float, dict[str, jwt.PyJWK]] | None = None
+        self._lock = asyncio.Lock()
+
+    def start(self) -> None:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                transport=self.transport,
+                timeout=GOOGLE_HTTP_TIMEOUT,
+                limits=httpx.Limits(max_connections=GOOGLE_HTTP_MAX_CONNECTIONS),
+            )
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        # Se crea en el lifespan; si se usa sin él (tests, jobs) se crea acá
+        self.start()
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _get_json(self, url: str) -> tuple[dict, float]:
+        response = await self.http.get(url)
+        response.raise_for_status()
+        return response.json(), monotonic() + cache_ttl(response)
+
+    def _cached_discovery(self) -> dict | None:
+        if self._discovery is not None and self._discovery[0] > monotonic():
+            return self._discovery[1]
+        return None
+
+    async def discovery(self) -> dict:
+        cached = self._cached_discovery()
+        if cached is not None:
+            return cached
+        async with self._lock:
+            cached = self._cached_discovery()
+            if cached is None:
+                document, expires_at = await self._get_json(self.discovery_url)
+                cached = {**DEFAULT_DISCOVERY, **document}
+                self._discovery = (expires_at, cached)
+            return cached
+
+    async def signing_keys(self, refresh: bool = False) -> dict[str, jwt.PyJWK]:
+        if not refresh and self._keys is not None and self._keys[0] > monotonic():
+            return self._keys[1]
+        jwks_uri = (await self.discovery())["jwks_uri"]
+        async with self._lock:
+            if not refresh and self._keys is not None and self._keys[0] > monotonic():
+                return self._keys[1]
+            document, expires_at = await self._get_json(jwks_uri)
+            keys = {key.key_id: key for key in jwt.PyJWKSet.from_dict(document).keys}
+            self._keys = (expires_at, keys)
+            return keys
+
+    async def warm_up(self) -> None:
+        """Carga discovery y claves por adelantado para que el primer callback no las espere"""
+        await self.signing_keys()
+
+    def authorization_url(self, state: str) -> str:
+        # Sin esperar a la red: usa el discovery cacheado o los endpoints conocidos
+        endpoint = (self._cached_discovery() or DEFAULT_DISCOVERY)["authorization_endpoint"]
+        return f"{endpoint}?" + urlencode({
+            "response_type": "code",
+            "client_id": self.client_id,
+            "redirect_uri": self.redirect_uri,
+            "scope": " ".join(GOOGLE_SCOPES),
+            "state": state,
+            "access_type": "offline",
+            "include_granted_scopes": "true",
+            "prompt": "consent",
+        })
+
+    async def exchange_code(self, code: str) -> dict:
+        """Canjea el código de autorización por los tokens (access_token, id_token, ...)"""
+        response = await self.http.post((await self.discovery())["token_endpoint"], data={
+            "grant_type": "authorization_code",
+            "code": code,
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "redirect_uri": self.redirect_uri,
+        })
+        if response.status_code != 200:
+            try:
+                error = response.json()
+            except ValueError:
+                error = {}
+            raise GoogleOAuthError(error.get("error_description") or error.get("error") or response.text)
+        return response.json()
+
+    async def verify_id_token(self, token: str) -> dict:
+        """Verifica firma, audiencia, emisor y vencimiento del id_token"""
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+            keys = await self.signing_keys()
+            if kid not in keys:
+                keys = await self.signing_keys(refresh=True)
+            if kid not in keys:
+                raise GoogleOAuthError("Unknown signing key")
+            issuers = list({*GOOGLE_ISSUERS, (await self.discovery())["issuer"]})
+            return jwt.decode(token, keys[kid], algorithms=["RS256"], audience=self.client_id, issuer=issuers)
+        except jwt.InvalidTokenError as e:
+            raise GoogleOAuthError(f"Invalid id_token: {e}") from e
+
+    async def get_user_profile(self, access_token: str) -> dict:
+        response = await self.http.get(GOOGLE_PEOPLE_URL, headers={"Authorization": f"Bearer {access_token}"})
+        response.raise_for_status()
+        return response.json()
+
+
+google_oauth = GoogleOAuth()
+
+
+def get_google_oauth() -> GoogleOAuth:
+    return google_oauth
+
+
+GoogleOAuthDep = Annotated[GoogleOAuth, Depends(get_google_oauth)]
@@ -1,15 +1,66 @@
+import hashlib
 import os
+import time
+import uuid
 import jwt
 from datetime import datetime, timedelta, timezone
 from typing import Dict
 from fastapi import HTTPException, status
 from fastapi.security import SecurityScopes
+from app.auth.keyring import KeyRing, load_keyring
 from app.db.models import User
+from app.utils.cache import TTLCache
 
 # Configuración básica
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+# Caché de payloads ya verificados, indexada por el digest del token
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+JWT_CACHE_MAX_TTL = float(os.getenv("JWT_CACHE_MAX_TTL", "300"))
+
+token_cache = TTLCache(maxsize=JWT_CACHE_SIZE, ttl=JWT_CACHE_MAX_TTL)
+
+# Con RS256/EdDSA los tokens se firman con el keyring (cabecera 'kid'); HS* usa SECRET_KEY
+_keyring: KeyRing | None = None
+
+
+def uses_keyring() -> bool:
+    return ALGORITHM is not None and not ALGORITHM.startswith("HS")
+
+
+def get_keyring() -> KeyRing:
+    """Keyring cargado una sola vez por proceso"""
+    global _keyring
+    if _keyring is None:
+        _keyring = load_keyring(ALGORITHM)
+    return _keyring
+
+
+def set_keyring(keyring: KeyRing | None) -> None:
+    """Reemplaza el keyring tras una rotación; los payloads cacheados se descartan"""
+    global _keyring
+    _keyring = keyring
+    token_cache.clear()
+
+
+def encode_token(payload: dict) -> str:
+    if not uses_keyring():
+        return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+    key = get_keyring().active
+    return jwt.encode(
+        payload, key.private_key, algorithm=key.algorithm, headers={"kid": key.kid})
+
+
+def _verify(token: str) -> Dict:
+    if not uses_keyring():
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    key = get_keyring().get(jwt.get_unverified_header(token).get("kid"))
+    if key is None:
+        raise jwt.InvalidTokenError("Clave de firma desconocida")
+    return jwt.decode(token, key.public_key, algorithms=[key.algorithm])
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
@@ -19,13 +70,29 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=15)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = encode_token(to_encode)
     return encoded_jwt
 
 
+def decode_token(token: str) -> Dict:
+    """Decodifica y verifica el token reutilizando el resultado hasta su 'exp'
+
+    Lanza las excepciones de PyJWT igual que jwt.decode; los tokens inválidos no se cachean.
+    """
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(key)
+    if payload is None:
+        payload = _verify(token)
+        exp = payload.get("exp")
+        token_cache.set(key, payload, exp - time.time() if exp else None)
+    return dict(payload)
+
+
 def verify_jwt_token(token: str) -> Dict:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
+        if payload.get("token_type") == "refresh":
+            raise jwt.InvalidTokenError("Un refresh token no autoriza requests")
         return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(
@@ -46,6 +113,20 @@ def create_user_token(user: User) -> str:
 
 def create_refresh_token(data: dict) -> str:
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(days=30)
-    to_encode.update({"exp": expire, "token_type": "refresh"})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    expire = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode.update(
+        {"exp": expire, "token_type": "refresh", "jti": uuid.uuid4().hex})
+    return encode_token(to_encode)
+
+
+def verify_refresh_token(token: str) -> Dict:
+    try:
+        payload = decode_token(token)
+    except jwt.InvalidTokenError:
+        payload = {}
+    if payload.get("token_type") != "refresh" or not payload.get("jti"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+        )
+    return payload
@@ -0,0 +1,97 @@
+import os
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+
+@dataclass
+class SigningKey:
+    kid: str
+    algorithm: str
+    public_key: object
+    private_key: object | None = None
+
+    def jwk(self) -> dict:
+        exporter = RSAAlgorithm if self.algorithm == "RS256" else OKPAlgorithm
+        return {
+            **exporter.to_jwk(self.public_key, as_dict=True),
+            "kid": self.kid,
+            "alg": self.algorithm,
+            "use": "sig",
+        }
+
+
+def _algorithm_for(public_key) -> str:
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return "RS256"
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return "EdDSA"
+    raise ValueError(f"Tipo de clave no soportado: {type(public_key).__name__}")
+
+
+class KeyRing:
+    """Claves de firma de JWT indexadas por 'kid'
+
+    Solo la clave activa firma; el resto sigue verificando tokens emitidos
+    antes de una rotación hasta que se retira del directorio.
+    """
+
+    def __init__(self, keys: list[SigningKey], active_kid: str):
+        self.keys = {key.kid: key for key in keys}
+        if active_kid not in self.keys or self.keys[active_kid].private_key is None:
+            raise ValueError(f"La clave activa '{active_kid}' no tiene clave privada")
+        self.active_kid = active_kid
+
+    @property
+    def active(self) -> SigningKey:
+        return self.keys[self.active_kid]
+
+    def get(self, kid: str | None) -> SigningKey | None:
+        return self.keys.get(kid)
+
+    def jwks(self) -> dict:
+        return {"keys": [key.jwk() for key in self.keys.values()]}
+
+    @classmethod
+    def from_directory(cls, path: str, active_kid: str | None = None) -> "KeyRing":
+        """Carga '<kid>.pem' (privadas) y '<kid>.pub.pem' (solo verificación)"""
+        keys = []
+        for file in sorted(Path(path).glob("*.pem")):
+            data = file.read_bytes()
+            if file.name.endswith(".pub.pem"):
+                kid = file.name.removesuffix(".pub.pem")
+                public_key = serialization.load_pem_public_key(data)
+                private_key = None
+            else:
+                kid = file.name.removesuffix(".pem")
+                private_key = serialization.load_pem_private_key(data, password=None)
+                public_key = private_key.public_key()
+            keys.append(SigningKey(kid, _algorithm_for(public_key), public_key, private_key))
+        signers = [key.kid for key in keys if key.private_key is not None]
+        if not signers:
+            raise ValueError(f"No hay claves privadas en {path}")
+        # Sin kid explícito firma la última en orden alfabético (p. ej. fechas)
+        return cls(keys, active_kid or signers[-1])
+
+    @classmethod
+    def generate(cls, algorithm: str) -> "KeyRing":
+        """Clave efímera para desarrollo: se pierde al reiniciar el proceso"""
+        if algorithm == "RS256":
+            private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        elif algorithm == "EdDSA":
+            private_key = ed25519.Ed25519PrivateKey.generate()
+        else:
+            raise ValueError(f"Algoritmo asimétrico no soportado: {algorithm}")
+        kid = uuid.uuid4().hex
+        key = SigningKey(kid, algorithm, private_key.public_key(), private_key)
+        return cls([key], kid)
+
+
+def load_keyring(algorithm: str) -> KeyRing:
+    keys_dir = os.getenv("JWT_KEYS_DIR")
+    if keys_dir:
+        return KeyRing.from_directory(keys_dir, os.getenv("JWT_ACTIVE_KID"))
+    return KeyRing.generate(algorithm)
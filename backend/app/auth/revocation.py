@@ -0,0 +1,88 @@
+import heapq
+import math
+import threading
+from abc import ABC, abstractmethod
+from os import getenv
+from time import time
+from typing import Annotated
+from fastapi import Depends
+
+REVOCATION_BACKEND = getenv("REVOCATION_BACKEND", "memory")
+REDIS_URL = getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class RevocationStore(ABC):
+    """Denylist de identificadores de token (jti) con expiración"""
+
+    @abstractmethod
+    async def revoke(self, jti: str, ttl: float) -> bool:
+        """Revoca el jti; devuelve False si ya estaba revocado (reuso del token)"""
+
+    @abstractmethod
+    async def is_revoked(self, jti: str) -> bool: ...
+
+
+class InMemoryRevocationStore(RevocationStore):
+    """Denylist por proceso; las entradas vencidas se descartan en orden de expiración"""
+
+    def __init__(self):
+        self._expires: dict[str, float] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float) -> None:
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, jti = heapq.heappop(self._heap)
+            if self._expires.get(jti) == expires_at:
+                del self._expires[jti]
+
+    async def revoke(self, jti: str, ttl: float) -> bool:
+        now = time()
+        with self._lock:
+            self._evict(now)
+            if jti in self._expires:
+                return False
+            expires_at = now + max(ttl, 0)
+            self._expires[jti] = expires_at
+            heapq.heappush(self._heap, (expires_at, jti))
+            return True
+
+    async def is_revoked(self, jti: str) -> bool:
+        with self._lock:
+            self._evict(time())
+            return jti in self._expires
+
+
+class RedisRevocationStore(RevocationStore):
+    """Denylist compartida entre réplicas sobre un cliente compatible con redis.asyncio"""
+
+    def __init__(self, client, prefix: str = "revoked:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def revoke(self, jti: str, ttl: float) -> bool:
+        # SET NX es atómico: solo el primer uso de un refresh token gana
+        created = await self.client.set(
+            self.prefix + jti, 1, ex=max(math.ceil(ttl), 1), nx=True)
+        return bool(created)
+
+    async def is_revoked(self, jti: str) -> bool:
+        return await self.client.exists(self.prefix + jti) > 0
+
+
+def create_revocation_store() -> RevocationStore:
+    if REVOCATION_BACKEND == "redis":
+        from redis.asyncio import from_url
+
+        return RedisRevocationStore(from_url(REDIS_URL))
+    return InMemoryRevocationStore()
+
+
+revocation_store = create_revocation_store()
+
+
+def get_revocation_store() -> RevocationStore:
+    return revocation_store
+
+
+RevocationStoreDep = Annotated[RevocationStore, Depends(get_revocation_store)]
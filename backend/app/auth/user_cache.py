@@ -0,0 +1,32 @@
+from os import getenv
+from ..db.models import User
+from ..utils.cache import TTLCache
+
+# "db": el usuario se lee en cada request; "stateless": se sirve de la caché en proceso
+AUTH_MODE = getenv("AUTH_MODE", "db")
+
+# Caché de usuarios autenticados por proceso; la invalidación es local al worker,
+# el TTL acota cuánto puede verse un dato viejo en los demás
+AUTH_USER_CACHE_TTL = float(getenv("AUTH_USER_CACHE_TTL", "30"))
+AUTH_USER_CACHE_SIZE = int(getenv("AUTH_USER_CACHE_SIZE", "10000"))
+
+user_cache = TTLCache(maxsize=AUTH_USER_CACHE_SIZE, ttl=AUTH_USER_CACHE_TTL)
+
+
+def get_cached_user(*, username: str | None = None, user_id: str | None = None) -> User | None:
+    if username is not None:
+        return user_cache.get(("username", username))
+    return user_cache.get(("id", str(user_id)))
+
+
+def cache_user(user: User) -> None:
+    """Guarda una copia desacoplada de la sesión para no compartir estado ORM"""
+    snapshot = User(**user.model_dump())
+    user_cache.set(("username", snapshot.username), snapshot)
+    user_cache.set(("id", str(snapshot.id)), snapshot)
+
+
+def invalidate_user(user_id, *usernames: str) -> None:
+    user_cache.pop(("id", str(user_id)))
+    for username in usernames:
+        user_cache.pop(("username", username))
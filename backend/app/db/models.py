@@ -1,7 +1,13 @@
 from uuid import uuid4, UUID
 from datetime import date, datetime
+from decimal import Decimal
 from pydantic import EmailStr, UUID4
+from sqlalchemy import DDL, Index, UniqueConstraint, event, text
 from sqlmodel import Field, SQLModel, Relationship
+from .partitions import PARTITION_KEY, create_default_partition_sql
+from .search import POSTGRES_UNACCENT_DDL, SQLITE_FTS_DDL, SQLITE_FTS_DROP, TSVECTOR_EXPRESSION
+from .types import Money
+from ..utils.money import DEFAULT_CURRENCY
 
 
 class User(SQLModel, table=True):
@@ -12,6 +18,7 @@ class User(SQLModel, table=True):
     last_name: str
     age: int
     password: str
+    home_currency: str = Field(default=DEFAULT_CURRENCY, max_length=3)
     categories: list["Categories"] = Relationship(back_populates="user")
     budgets: list["Budget"] = Relationship(back_populates="user")
     transactions: list["Transactions"] = Relationship(back_populates="user")
@@ -21,6 +28,8 @@ class User(SQLModel, table=True):
 
 
 class Categories(SQLModel, table=True):
+    __table_args__ = (Index("ix_categories_user_id", "user_id"),)
+
     id: int = Field(primary_key=True)
     user_id: UUID4 = Field(foreign_key="user.id", ondelete="CASCADE")
     name: str
@@ -28,44 +37,186 @@ class Categories(SQLModel, table=True):
     user: User = Relationship(back_populates="categories")
 
 
+class CategoryRule(SQLModel, table=True):
+    """Regla de categorización automática: palabra clave, regex o rango de montos
+
+    Los límites de monto son opcionales y acotan cualquier tipo de regla; ante
+    varias coincidencias gana la de mayor prioridad y, a igual prioridad, la más antigua.
+    """
+    __table_args__ = (
+        Index("ix_categoryrule_user_id", "user_id"),
+        Index("ix_categoryrule_category_id", "category_id"),
+    )
+
+    id: int = Field(primary_key=True)
+    user_id: UUID4 = Field(foreign_key="user.id", ondelete="CASCADE")
+    category_id: int = Field(foreign_key="categories.id", ondelete="CASCADE")
+    kind: str = Field(max_length=16)
+    pattern: str | None = Field(default=None)
+    min_amount: Decimal | None = Field(default=None, sa_type=Money)
+    max_amount: Decimal | None = Field(default=None, sa_type=Money)
+    priority: int = Field(default=0)
+
+
 class Budget(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_budget_user_id_start_date_end_date",
+              "user_id", "start_date", "end_date"),
+        Index("ix_budget_category_id", "category_id"),
+    )
+
     id: int = Field(primary_key=True)
     user_id: UUID4 = Field(foreign_key="user.id",
                            ondelete="CASCADE", default=None)
     category_id: int = Field(foreign_key="categories.id", ondelete="CASCADE")
-    amount: float = Field()
+    amount: Decimal = Field(sa_type=Money)
+    currency: str = Field(default=DEFAULT_CURRENCY, max_length=3)
     start_date: date = Field()
     end_date: date = Field()
+    consumed_amount: Decimal = Field(default=Decimal(0), sa_type=Money)
     user: User = Relationship(back_populates="budgets")
 
 
 class Transactions(SQLModel, table=True):
-    id: int = Field(primary_key=True)
+    __table_args__ = (
+        Index("ix_transactions_user_id_trasaction_date",
+              "user_id", "trasaction_date"),
+        Index("ix_transactions_user_id_category_id", "user_id", "category_id"),
+        Index("ix_transactions_category_id", "category_id"),
+        Index("ix_transactions_budget_id", "budget_id"),
+        # Búsqueda de texto en Postgres; SQLite usa la tabla FTS5 creada más abajo
+        Index("ix_transactions_description_tsv", text(TSVECTOR_EXPRESSION),
+              postgresql_using="gin").ddl_if(dialect="postgresql"),
+        Index("ix_transactions_description_trgm", "description", postgresql_using="gin",
+              postgresql_ops={"description": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        # Particionada por mes en Postgres (ver db/partitions.py): la clave primaria
+        # incluye la fecha porque toda restricción única debe incluir la clave de partición
+        {"postgresql_partition_by": f"RANGE ({PARTITION_KEY})"},
+    )
+
+    id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": True})
     user_id: UUID4 = Field(foreign_key="user.id", ondelete="CASCADE")
     category_id: int = Field(foreign_key="categories.id", ondelete="CASCADE")
     budget_id: int = Field(foreign_key="budget.id",
                            nullable=True, ondelete="CASCADE")
-    amount: float = Field()
+    amount: Decimal = Field(sa_type=Money)
+    currency: str = Field(default=DEFAULT_CURRENCY, max_length=3)
     description: str | None = Field(default=None)
-    trasaction_date: datetime = Field()
+    trasaction_date: datetime = Field(primary_key=True)
+    # Solo la tienen las filas importadas de extractos; las cargadas a mano quedan en NULL.
+    # La unicidad la da TransactionFingerprint
+    fingerprint: str | None = Field(default=None, max_length=32)
     user: User = Relationship(back_populates="transactions")
 
 
+class TransactionFingerprint(SQLModel, table=True):
+    """Huellas de los movimientos importados por usuario: una reimportación choca acá y se omite
+
+    Es una tabla aparte porque transactions está particionada por mes en Postgres
+    (ver db/partitions.py) y allí toda restricción única debe incluir la fecha; así
+    un movimiento cuya fecha corrige el banco sigue siendo el mismo.
+    """
+
+    user_id: UUID4 = Field(foreign_key="user.id", ondelete="CASCADE", primary_key=True)
+    fingerprint: str = Field(max_length=32, primary_key=True)
+
+
 class SavingPots(SQLModel, table=True):
+    __table_args__ = (Index("ix_savingpots_user_id", "user_id"),)
+
     id: int = Field(primary_key=True)
     user_id: UUID4 = Field(foreign_key="user.id", ondelete="CASCADE")
     name: str = Field()
-    target_amount: float = Field()
-    current_amount: float = Field(default=0.0)
+    target_amount: Decimal = Field(sa_type=Money)
+    current_amount: Decimal = Field(default=Decimal(0), sa_type=Money)
+    currency: str = Field(default=DEFAULT_CURRENCY, max_length=3)
     start_date: date = Field()
     user: User = Relationship(back_populates="saving_pots")
 
 
+class PotContribution(SQLModel, table=True):
+    """Movimiento del ledger de un pot: depósito (positivo) o retiro (negativo)"""
+    __table_args__ = (Index("ix_potcontribution_pot_id_id", "pot_id", "id"),)
+
+    id: int = Field(primary_key=True)
+    pot_id: int = Field(foreign_key="savingpots.id", ondelete="CASCADE")
+    user_id: UUID4 = Field(foreign_key="user.id", ondelete="CASCADE")
+    amount: Decimal = Field(sa_type=Money)
+    balance: Decimal = Field(sa_type=Money)
+    note: str | None = Field(default=None)
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
 class RecurringBills(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_recurringbills_user_id_next_due_at", "user_id", "next_due_at"),
+        Index("ix_recurringbills_next_due_at", "next_due_at"),
+    )
+
     id: int = Field(primary_key=True)
     user_id: UUID4 = Field(foreign_key="user.id", ondelete="CASCADE")
     name: str = Field()
-    amount: float = Field()
-    due_date: str = Field()
-    is_paid: bool = Field(default=False)
+    amount: Decimal = Field(sa_type=Money)
+    currency: str = Field(default=DEFAULT_CURRENCY, max_length=3)
+    # Regla de recurrencia: cada interval_count unidades a partir de starts_on
+    starts_on: date = Field()
+    interval_unit: str = Field(default="month")
+    interval_count: int = Field(default=1)
+    # Próxima fecha aún no materializada en BillOccurrence
+    next_due_at: date = Field()
     user: User = Relationship(back_populates="recurring_bills")
+
+
+class BillOccurrence(SQLModel, table=True):
+    """Vencimiento concreto de una factura recurrente, generado por el scheduler"""
+    __table_args__ = (
+        UniqueConstraint("bill_id", "due_on"),
+        Index("ix_billoccurrence_user_id_due_on", "user_id", "due_on"),
+    )
+
+    id: int = Field(primary_key=True)
+    bill_id: int = Field(foreign_key="recurringbills.id", ondelete="CASCADE")
+    user_id: UUID4 = Field(foreign_key="user.id", ondelete="CASCADE")
+    due_on: date = Field()
+    amount: Decimal = Field(sa_type=Money)
+    is_paid: bool = Field(default=False)
+
+
+class MonthlySpend(SQLModel, table=True):
+    """Acumulado mensual de transacciones por usuario, categoría y moneda, mantenido al escribir"""
+    __table_args__ = (Index("ix_monthlyspend_user_id_month", "user_id", "month"),)
+
+    user_id: UUID4 = Field(foreign_key="user.id",
+                           ondelete="CASCADE", primary_key=True)
+    category_id: int = Field(foreign_key="categories.id",
+                             ondelete="CASCADE", primary_key=True)
+    month: date = Field(primary_key=True)
+    currency: str = Field(default=DEFAULT_CURRENCY, max_length=3, primary_key=True)
+    total: Decimal = Field(default=Decimal(0), sa_type=Money)
+    count: int = Field(default=0)
+    min_amount: Decimal = Field(sa_type=Money)
+    max_amount: Decimal = Field(sa_type=Money)
+
+
+class FxRate(SQLModel, table=True):
+    """Cotización diaria: 1 unidad de base equivale a rate unidades de quote"""
+
+    base: str = Field(max_length=3, primary_key=True)
+    quote: str = Field(max_length=3, primary_key=True)
+    rate_date: date = Field(primary_key=True)
+    rate: float = Field()
+    # Cambia en cada alta o corrección: junto con la cantidad de filas es la versión de la tabla
+    updated_at: datetime = Field(
+        default_factory=datetime.now, sa_column_kwargs={"server_default": text("CURRENT_TIMESTAMP")})
+
+
+event.listen(SQLModel.metadata, "before_create",
+             DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+for statement in POSTGRES_UNACCENT_DDL:
+    event.listen(SQLModel.metadata, "before_create", DDL(statement).execute_if(dialect="postgresql"))
+event.listen(Transactions.__table__, "after_create",
+             DDL(create_default_partition_sql()).execute_if(dialect="postgresql"))
+for statement in SQLITE_FTS_DDL:
+    event.listen(Transactions.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in SQLITE_FTS_DROP:
+    event.listen(Transactions.__table__, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
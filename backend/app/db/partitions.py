@@ -0,0 +1,174 @@
+"""Particionado mensual de transactions por trasaction_date (solo Postgres)
+
+Cada mes vive en su propia partición (transactions_y2024m01) y una partición
+por defecto recibe lo que cae fuera de las creadas, así un insert nunca falla
+por falta de partición. Las consultas con límites de fecha solo leen los meses
+del rango, y los meses viejos se pueden separar con DETACH sin reescribir la tabla.
+"""
+import logging
+import re
+from datetime import date, datetime, time
+from os import getenv
+from sqlalchemy import PrimaryKeyConstraint, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .upsert import dialect_name
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLE = "transactions"
+PARTITION_KEY = "trasaction_date"
+DEFAULT_PARTITION = f"{PARTITIONED_TABLE}_default"
+# Meses futuros que se mantienen creados por adelantado
+PARTITION_MONTHS_AHEAD = int(getenv("PARTITION_MONTHS_AHEAD", "3"))
+
+# Clave del advisory lock que serializa el DDL de particiones entre workers y el cron
+PARTITION_LOCK = f"{PARTITIONED_TABLE}_partitions"
+
+PARTITION_NAME = re.compile(rf"^{PARTITIONED_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+
+# SQLite no particiona: la clave primaria de transactions queda solo en id, que
+# así sigue siendo el rowid autoincremental (SQLite no autoincrementa claves compuestas)
+@compiles(PrimaryKeyConstraint, "sqlite")
+def sqlite_primary_key(constraint: PrimaryKeyConstraint, compiler, **kw) -> str:
+    if constraint.table.name == PARTITIONED_TABLE:
+        return "PRIMARY KEY (id)"
+    return compiler.visit_primary_key_constraint(constraint, **kw)
+
+
+@compiles(CreateColumn, "sqlite")
+def sqlite_create_column(element: CreateColumn, compiler, **kw) -> str:
+    column = element.element
+    if column.table is not None and column.table.name == PARTITIONED_TABLE and column.name == "id":
+        return "id INTEGER NOT NULL"
+    return compiler.visit_create_column(element, **kw)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITIONED_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> date | None:
+    match = PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def create_partition_sql(month: date) -> str:
+    start, end = datetime.combine(month, time()), datetime.combine(add_months(month, 1), time())
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARTITIONED_TABLE} "
+        f"FOR VALUES FROM ('{start.isoformat(' ')}') TO ('{end.isoformat(' ')}')"
+    )
+
+
+def create_default_partition_sql() -> str:
+    return f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARTITIONED_TABLE} DEFAULT"
+
+
+async def is_partitioned(session: AsyncSession) -> bool:
+    if dialect_name(session) != "postgresql":
+        return False
+    relkind = (await session.exec(text(
+        "SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"
+    ).bindparams(table=PARTITIONED_TABLE))).scalar()
+    return relkind == "p"
+
+
+async def lock_partitions(session: AsyncSession) -> None:
+    """Espera el advisory lock de particiones; se libera al terminar la transacción"""
+    await session.exec(text("SELECT pg_advisory_xact_lock(hashtext(:name))").bindparams(name=PARTITION_LOCK))
+
+
+async def list_partitions(session: AsyncSession) -> list[str]:
+    return list((await session.exec(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(:table) ORDER BY child.relname"
+    ).bindparams(table=PARTITIONED_TABLE))).scalars())
+
+
+async def create_partition(session: AsyncSession, month: date) -> None:
+    """Crea la partición del mes, moviendo las filas que la partición por defecto ya tenga de ese mes
+
+    Postgres no deja crear una partición si la de defecto tiene filas de su
+    rango: se separa la de defecto, se crea el mes, se mueven sus filas y se
+    vuelve a adjuntar, todo en la misma transacción.
+    """
+    bounds = {"start": datetime.combine(month, time()), "end": datetime.combine(add_months(month, 1), time())}
+    in_range = f"{PARTITION_KEY} >= :start AND {PARTITION_KEY} < :end"
+    pending = (await session.exec(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})").bindparams(**bounds))).scalar()
+    if not pending:
+        await session.exec(text(create_partition_sql(month)))
+        return
+    await session.exec(text(f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+    await session.exec(text(create_partition_sql(month)))
+    await session.exec(text(
+        f"INSERT INTO {PARTITIONED_TABLE} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}").bindparams(**bounds))
+    await session.exec(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}").bindparams(**bounds))
+    await session.exec(text(f"ALTER TABLE {PARTITIONED_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+
+
+async def ensure_partitions(
+    session: AsyncSession, today: date | None = None, months_ahead: int = PARTITION_MONTHS_AHEAD
+) -> list[str]:
+    """Crea las particiones faltantes del mes actual y los siguientes; devuelve las creadas
+
+    Con el lock tomado, un worker que arranca a la vez espera y después ve las
+    particiones que creó el otro en lugar de chocar con ellas.
+    """
+    if not await is_partitioned(session):
+        return []
+    await lock_partitions(session)
+    existing = set(await list_partitions(session))
+    if DEFAULT_PARTITION not in existing:
+        await session.exec(text(create_default_partition_sql()))
+    current = month_start(today or date.today())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if partition_name(month) not in existing:
+            await create_partition(session, month)
+            created.append(partition_name(month))
+    return created
+
+
+async def detach_partitions(session: AsyncSession, before: date) -> list[str]:
+    """Separa las particiones de meses anteriores a before; quedan como tablas sueltas para archivarlas
+
+    Los acumulados mensuales (MonthlySpend) y el consumo de presupuestos no se tocan.
+    """
+    if not await is_partitioned(session):
+        return []
+    await lock_partitions(session)
+    detached = []
+    for name in await list_partitions(session):
+        month = partition_month(name)
+        if month is not None and month < month_start(before):
+            await session.exec(text(f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {name}"))
+            detached.append(name)
+    return detached
+
+
+async def maintain_partitions(session_factory: async_sessionmaker[AsyncSession]) -> None:
+    """Al arrancar: un fallo se registra pero no impide levantar la app, la partición por defecto cubre"""
+    try:
+        async with session_factory() as session:
+            created = await ensure_partitions(session)
+            await session.commit()
+        if created:
+            logger.info("Particiones creadas: %s", ", ".join(created))
+    except Exception:
+        logger.exception("No se pudieron crear las particiones de %s", PARTITIONED_TABLE)
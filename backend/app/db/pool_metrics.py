@@ -0,0 +1,65 @@
+from bisect import bisect_left
+from time import perf_counter
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Límites superiores (ms) de los buckets del histograma de espera
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolWaitHistogram:
+    """Histograma del tiempo que tarda una sesión en obtener una conexión"""
+
+    def __init__(self, buckets_ms: tuple[float, ...] = WAIT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, wait_ms: float) -> None:
+        self.counts[bisect_left(self.buckets_ms, wait_ms)] += 1
+        self.total += 1
+        self.sum_ms += wait_ms
+        self.max_ms = max(self.max_ms, wait_ms)
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{limit}" for limit in self.buckets_ms] + ["le_inf"]
+        return {
+            "count": self.total,
+            "sum_ms": round(self.sum_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+wait_histogram = PoolWaitHistogram()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Pool async que registra cuánto espera cada checkout de conexión"""
+
+    def connect(self):
+        start = perf_counter()
+        try:
+            return super().connect()
+        finally:
+            wait_histogram.observe((perf_counter() - start) * 1000)
+
+
+def get_pool_stats(engine: AsyncEngine) -> dict:
+    """Estado actual del pool del engine; los pools sin límite (p. ej. sqlite) devuelven None"""
+    pool = engine.pool
+
+    def read(name: str):
+        method = getattr(pool, name, None)
+        return method() if callable(method) else None
+
+    return {
+        "pool_class": type(pool).__name__,
+        "size": read("size"),
+        "checked_in": read("checkedin"),
+        "checked_out": read("checkedout"),
+        "overflow": read("overflow"),
+        "wait_time": wait_histogram.snapshot(),
+    }
@@ -0,0 +1,55 @@
+"""Búsqueda de texto sobre Transactions.description
+
+Postgres usa índices GIN sobre to_tsvector (palabras) y pg_trgm (coincidencia
+aproximada de comercios). SQLite, usado en los tests, usa una tabla FTS5
+sincronizada por triggers. Las dos ignoran los acentos: Postgres pasa el texto
+por unaccent y FTS5 usa remove_diacritics.
+"""
+import re
+
+TS_CONFIG = "simple"
+# unaccent() es STABLE y no puede usarse en un índice: el envoltorio fija el
+# diccionario y se declara IMMUTABLE para que el índice GIN lo acepte
+UNACCENT_FUNCTION = "f_unaccent"
+POSTGRES_UNACCENT_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    f"CREATE OR REPLACE FUNCTION {UNACCENT_FUNCTION}(text) RETURNS text "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT "
+    "AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$",
+)
+TSVECTOR_EXPRESSION = f"to_tsvector('{TS_CONFIG}', {UNACCENT_FUNCTION}(coalesce(description, '')))"
+
+SQLITE_FTS_TABLE = "transactions_fts"
+SQLITE_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+    "description, content='transactions', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON transactions BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, description) VALUES (new.id, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON transactions BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, description) "
+    "VALUES ('delete', old.id, old.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au AFTER UPDATE OF description ON transactions BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, description) VALUES (new.id, new.description); END",
+)
+SQLITE_FTS_DROP = (
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_au",
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ai",
+    f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}",
+)
+
+
+def search_terms(query: str) -> list[str]:
+    # Solo caracteres de palabra: así los términos no necesitan escaparse en ninguna sintaxis
+    return re.findall(r"\w+", query.lower())
+
+
+def to_tsquery_text(terms: list[str]) -> str:
+    """Todos los términos, cada uno como prefijo: 'uber eat' → 'uber:* & eat:*'"""
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def to_fts5_query(terms: list[str]) -> str:
+    return " AND ".join(f'"{term}"*' for term in terms)
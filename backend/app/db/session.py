@@ -1,20 +1,132 @@
+import logging
+from contextlib import AsyncExitStack
 from os import getenv
 from dotenv import load_dotenv
-from typing import Annotated
-from sqlmodel import Session, create_engine
+from typing import Annotated, AsyncIterator
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import QueuePool
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import Depends
+from .pool_metrics import InstrumentedAsyncQueuePool
+
+logger = logging.getLogger(__name__)
 
 load_dotenv(override=True)
 DB_URL = getenv("SQL_URL")
-if not DB_URL:
-    raise ValueError("La variable de entorno SQL_URL no está configurada")
 
-engine = create_engine(DB_URL)
+# Configuración del pool de conexiones
+DB_POOL_SIZE = int(getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+# Conexiones que se abren al arrancar (acotadas por pool_size); 0 lo desactiva
+DB_POOL_WARM_CONNECTIONS = int(getenv("DB_POOL_WARM_CONNECTIONS", "5"))
+
+# Drivers async equivalentes a los síncronos que usa Alembic
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Convierte una URL de base de datos síncrona a su driver async"""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+def engine_options(url: str) -> dict:
+    """Opciones de pool para el engine; sqlite usa su pool por defecto"""
+    if url.startswith("sqlite"):
+        return {}
+    options = {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if url.startswith("postgresql+asyncpg") and DB_STATEMENT_TIMEOUT_MS > 0:
+        options["connect_args"] = {
+            "server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+        }
+    return options
+
+
+# El engine se crea al primer uso (lifespan, dependencias o jobs), no al importar:
+# así importar la app no exige SQL_URL
+engine: AsyncEngine | None = None
+async_session_maker = async_sessionmaker(class_=AsyncSession, expire_on_commit=False)
+
+
+def get_engine() -> AsyncEngine:
+    """Devuelve el engine del proceso, creándolo y asociándolo a async_session_maker la primera vez"""
+    global engine
+    if engine is None:
+        if not DB_URL:
+            raise ValueError("La variable de entorno SQL_URL no está configurada")
+        async_url = to_async_url(DB_URL)
+        engine = create_async_engine(async_url, **engine_options(async_url))
+        async_session_maker.configure(bind=engine)
+    return engine
+
+
+async def warm_pool(engine: AsyncEngine, connections: int = DB_POOL_WARM_CONNECTIONS) -> int:
+    """Abre varias conexiones a la vez y las devuelve al pool, para que los primeros requests no paguen la conexión
 
+    Un fallo se registra pero no impide arrancar: pool_pre_ping reconecta después.
+    """
+    if isinstance(engine.pool, QueuePool):
+        connections = min(connections, engine.pool.size())
+    else:
+        connections = min(connections, 1)
+    if connections <= 0:
+        return 0
+    try:
+        async with AsyncExitStack() as stack:
+            for connection in [await stack.enter_async_context(engine.connect()) for _ in range(connections)]:
+                await connection.execute(text("SELECT 1"))
+    except Exception:
+        logger.exception("No se pudo precalentar el pool de conexiones")
+        return 0
+    return connections
 
-def get_session() -> Session:
-    with Session(engine) as session:
+
+async def dispose_engine() -> None:
+    """Cierra las conexiones del pool; el próximo uso vuelve a crear el engine"""
+    global engine
+    if engine is not None:
+        await engine.dispose()
+        engine = None
+        async_session_maker.configure(bind=None)
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    get_engine()
+    async with async_session_maker() as session:
         yield session
 
 
-SessionDep = Annotated[Session, Depends(get_session)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Para respuestas en streaming, que deben abrir su sesión dentro del generador, y para los jobs"""
+    get_engine()
+    return async_session_maker
+
+
+SessionFactoryDep = Annotated[async_sessionmaker[AsyncSession], Depends(get_session_factory)]
+
+
+def get_db_engine() -> AsyncEngine:
+    """Engine del proceso como dependencia, para poder sustituirlo en los tests"""
+    return get_engine()
+
+
+EngineDep = Annotated[AsyncEngine, Depends(get_db_engine)]
@@ -0,0 +1,21 @@
+from decimal import Decimal
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+from ..utils.money import from_minor, to_minor
+
+
+class Money(TypeDecorator):
+    """Monto guardado como BIGINT en unidades menores y expuesto como Decimal
+
+    SUM, MIN, MAX y los UPDATE relativos corren sobre enteros en la base, así que
+    los totales son exactos sin costo extra respecto de sumar floats.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect) -> int | None:
+        return None if value is None else to_minor(value)
+
+    def process_result_value(self, value, dialect) -> Decimal | None:
+        return None if value is None else from_minor(value)
@@ -0,0 +1,23 @@
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+def dialect_name(session: AsyncSession) -> str:
+    return session.get_bind().dialect.name
+
+
+def insert_for(session: AsyncSession, model):
+    """INSERT del dialecto activo, con soporte de ON CONFLICT (Postgres y SQLite)"""
+    if dialect_name(session) == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+def least(session: AsyncSession, *values):
+    # SQLite no tiene LEAST/GREATEST: min()/max() con varios argumentos son escalares
+    return func.least(*values) if dialect_name(session) == "postgresql" else func.min(*values)
+
+
+def greatest(session: AsyncSession, *values):
+    return func.greatest(*values) if dialect_name(session) == "postgresql" else func.max(*values)
@@ -0,0 +1,28 @@
+"""Importa cotizaciones desde un CSV con cabecera date,base,quote,rate
+
+Uso: python -m app.jobs.import_fx_rates rates.csv
+"""
+import argparse
+import asyncio
+from ..db.session import get_session_factory
+from ..services.fx_service import import_rates, parse_rates_csv
+
+
+async def run(path: str) -> int:
+    with open(path, newline="", encoding="utf-8") as file:
+        rows = parse_rates_csv(file)
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        return await import_rates(session, rows)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Import FX rates from a CSV file")
+    parser.add_argument("path", help="CSV with columns date,base,quote,rate")
+    args = parser.parse_args(argv)
+    count = asyncio.run(run(args.path))
+    print(f"Imported {count} FX rates")
+
+
+if __name__ == "__main__":
+    main()
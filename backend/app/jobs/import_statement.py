@@ -0,0 +1,62 @@
+"""Importa un extracto bancario CSV u OFX a las transacciones de un usuario
+
+Uso: python -m app.jobs.import_statement extracto.csv --user-id <uuid> --category-id 3 [--offset N]
+
+Imprime una línea JSON de progreso por lote; ante un corte se reanuda con el
+último offset informado.
+"""
+import argparse
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator
+from uuid import UUID
+from ..db.session import get_session_factory
+from ..services.import_service import Categorizer, ImportOptions, import_statement
+from ..utils.money import DEFAULT_CURRENCY
+from ..utils.statement_parsing import aiter_ofx, aiter_statement_csv
+
+CHUNK_SIZE = 64 * 1024
+
+
+async def aiter_file(path: Path) -> AsyncIterator[bytes]:
+    with path.open("rb") as file:
+        while chunk := await asyncio.to_thread(file.read, CHUNK_SIZE):
+            yield chunk
+
+
+async def run(path: Path, user_id: UUID, options: ImportOptions, file_format: str, encoding: str = "utf-8") -> None:
+    # Se relee desde el inicio aun al reanudar: las huellas numeran las filas repetidas
+    # en orden de aparición, y lo ya confirmado se omite por offset
+    if file_format == "ofx":
+        records = aiter_ofx(aiter_file(path))
+    else:
+        records = aiter_statement_csv(aiter_file(path), encoding=encoding)
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        categorizer = await Categorizer.load(session, user_id, options.category_id)
+    async for progress in import_statement(session_factory, user_id, records, options, categorizer):
+        print(progress.model_dump_json(), flush=True)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Import a CSV or OFX bank statement")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--user-id", type=UUID, required=True)
+    parser.add_argument("--category-id", type=int, required=True, help="Category for rows without a known category")
+    parser.add_argument("--format", choices=("csv", "ofx"), help="Defaults to the file extension")
+    parser.add_argument("--currency", default=DEFAULT_CURRENCY)
+    parser.add_argument("--date-format", help="strptime format, e.g. %%d/%%m/%%Y")
+    parser.add_argument("--encoding", default="utf-8", help="CSV encoding, e.g. latin-1 or cp1252")
+    parser.add_argument("--account", help="Statement account, used with bank ids when the file has none")
+    parser.add_argument("--keep-sign", action="store_true", help="Do not negate amounts")
+    parser.add_argument("--offset", type=int, default=0, help="Resume from this byte offset")
+    args = parser.parse_args(argv)
+    file_format = args.format or ("ofx" if args.path.suffix.lower() in (".ofx", ".qfx") else "csv")
+    options = ImportOptions(
+        category_id=args.category_id, currency=args.currency.upper(), negate=not args.keep_sign,
+        date_format=args.date_format, offset=args.offset, account=args.account)
+    asyncio.run(run(args.path, args.user_id, options, file_format, args.encoding))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Mantiene las particiones mensuales de transactions (Postgres); pensado para un cron diario
+
+Uso: python -m app.jobs.manage_partitions [--months-ahead 3] [--detach-before 2022-01-01]
+"""
+import argparse
+import asyncio
+from datetime import date
+from ..db.partitions import PARTITION_MONTHS_AHEAD, detach_partitions, ensure_partitions
+from ..db.session import get_session_factory
+
+
+async def run(months_ahead: int, detach_before: date | None) -> tuple[list[str], list[str]]:
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        created = await ensure_partitions(session, months_ahead=months_ahead)
+        detached = await detach_partitions(session, detach_before) if detach_before else []
+        await session.commit()
+    return created, detached
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Create upcoming monthly partitions and detach old ones")
+    parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--detach-before", type=date.fromisoformat,
+                        help="Detach partitions for months before this date (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+    created, detached = asyncio.run(run(args.months_ahead, args.detach_before))
+    print(f"Created {len(created)} partitions: {', '.join(created) or '-'}")
+    print(f"Detached {len(detached)} partitions: {', '.join(detached) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
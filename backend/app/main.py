@@ -1,9 +1,61 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from os import getenv
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from .routes import user_routes, auth_routes
+from .routes import user_routes, auth_routes, internal_routes, well_known_routes, transaction_routes, report_routes, budget_routes, analytics_routes, bill_routes, pot_routes, category_routes
+from .auth.google_oauth import google_oauth
+from .auth.jwt_manager import get_keyring, uses_keyring
+from .db.partitions import maintain_partitions
+from .db.session import dispose_engine, get_engine, get_session_factory, warm_pool
+from .services.bill_scheduler import BILL_SCHEDULER_ENABLED, BillScheduler
+from .utils.hashers import hashing_policy
+from .utils.inflight import InFlightMiddleware, in_flight
 
+logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# Tiempo máximo que se espera a los requests en curso antes de cerrar el pool
+SHUTDOWN_DRAIN_TIMEOUT = float(getenv("SHUTDOWN_DRAIN_TIMEOUT", "30"))
+
+
+async def prime_google_oauth() -> None:
+    """Trae discovery y claves de Google; si falla, el primer callback las pedirá"""
+    if not google_oauth.client_id:
+        return
+    try:
+        await google_oauth.warm_up()
+    except Exception:
+        logger.warning("No se pudieron precargar las claves de Google", exc_info=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    engine = get_engine()
+    session_factory = get_session_factory()
+    # Un solo cliente HTTP con pool para todas las llamadas a Google
+    google_oauth.start()
+    if uses_keyring():
+        get_keyring()
+    # Calentamientos independientes en paralelo; el hashing corre fuera del event loop
+    await asyncio.gather(
+        asyncio.to_thread(hashing_policy.calibrate),
+        warm_pool(engine),
+        prime_google_oauth(),
+    )
+    await maintain_partitions(session_factory)
+    scheduler = BillScheduler(session_factory)
+    if BILL_SCHEDULER_ENABLED:
+        scheduler.start()
+    yield
+    await scheduler.stop()
+    if not await in_flight.drain(SHUTDOWN_DRAIN_TIMEOUT):
+        logger.warning("Apagando con %d requests en curso", in_flight.count)
+    await google_oauth.aclose()
+    await dispose_engine()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,9 +64,20 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# El más externo: cuenta el request completo, CORS incluido
+app.add_middleware(InFlightMiddleware, counter=in_flight)
 
 app.include_router(user_routes.router)
 app.include_router(auth_routes.router)
+app.include_router(transaction_routes.router)
+app.include_router(report_routes.router)
+app.include_router(budget_routes.router)
+app.include_router(analytics_routes.router)
+app.include_router(bill_routes.router)
+app.include_router(pot_routes.router)
+app.include_router(category_routes.router)
+app.include_router(internal_routes.router)
+app.include_router(well_known_routes.router)
 
 @app.get("/")
 async def root(request: Request):
@@ -0,0 +1,36 @@
+from datetime import date, timedelta
+from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from ..db.session import AsyncSessionDep
+from ..schemas.analytics_schema import AnalyticsSummary
+from ..schemas.auth import TokenData
+from ..services import analytics_service
+from ..services.auth_service import get_current_claims
+from ..utils.money import DEFAULT_CURRENCY
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+CurrentClaims = Annotated[TokenData, Depends(get_current_claims)]
+
+ANALYTICS_DEFAULT_DAYS = 365
+ANALYTICS_MAX_DAYS = 3 * 365
+
+
+@router.get("/summary")
+async def get_summary(
+    session: AsyncSessionDep,
+    claims: CurrentClaims,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    horizon: Annotated[int, Query(ge=1, le=12)] = 3,
+    currency: str = DEFAULT_CURRENCY,
+) -> AnalyticsSummary:
+    """Medias móviles, participación por categoría, variación mensual y proyección en un solo payload"""
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=ANALYTICS_DEFAULT_DAYS - 1)
+    if date_from > date_to or (date_to - date_from).days >= ANALYTICS_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"date_from must be before date_to and span at most {ANALYTICS_MAX_DAYS} days")
+    return await analytics_service.get_summary(
+        session, claims.user_id, date_from, date_to, horizon, currency)
@@ -1,20 +1,38 @@
 import os
+import time
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.responses import RedirectResponse
 from datetime import timedelta
 from ..db.models import User
-from ..db.session import SessionDep
-from ..schemas.auth import Token, GoogleUserData
-from ..auth.jwt_manager import create_access_token
-from ..services.auth_service import get_current_active_user, authenticate_user, authenticate_with_google, create_google_user, create_google_oauth_flow, get_google_authorization_url
+from ..db.session import AsyncSessionDep
+from ..schemas.auth import Token, GoogleUserData, RefreshRequest
+from ..auth.jwt_manager import create_access_token, create_refresh_token, verify_refresh_token
+from ..auth.google_oauth import GoogleOAuthDep
+from ..auth.revocation import RevocationStoreDep
+from ..services.auth_service import get_current_active_user, get_user, authenticate_user, authenticate_with_google, create_google_user, get_google_authorization_url
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 
 
+def issue_tokens(username: str, user_id: str, scopes: list[str]) -> Token:
+    """Emite el par access/refresh token para un usuario ya autenticado"""
+    data = {"sub": username, "uid": user_id, "scopes": scopes}
+    access_token = create_access_token(
+        data=data,
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    return Token(
+        access_token=access_token,
+        refresh_token=create_refresh_token(data),
+        token_type="bearer",
+        expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    )
+
+
 @router.post("/login", responses={
     400: {
         "description": "Incorrect username or password",
@@ -43,19 +61,50 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 })
 async def login_for_access_token(
         form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-        session: SessionDep,
+        session: AsyncSessionDep,
 ) -> Token:
-    user = authenticate_user(
+    user = await authenticate_user(
         username=form_data.username, password=form_data.password, session=session)
     if not user:
         raise HTTPException(
             status_code=400, detail="Incorrect username or password")
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username, "scopes": form_data.scopes},
-        expires_delta=access_token_expires,
-    )
-    return Token(access_token=access_token, token_type="bearer")
+    return issue_tokens(user.username, str(user.id), form_data.scopes)
+
+
+@router.post("/refresh", responses={
+    401: {
+        "description": "Invalid, expired or already used refresh token",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Invalid refresh token"}
+            }
+        }
+    }
+})
+async def refresh_access_token(
+    body: RefreshRequest,
+    store: RevocationStoreDep,
+    session: AsyncSessionDep,
+) -> Token:
+    """Rota el refresh token: el recibido queda revocado y se emite un par nuevo"""
+    payload = verify_refresh_token(body.refresh_token)
+    # Como en el login: un usuario borrado no puede seguir renovando sus tokens
+    user = await get_user(session, payload["sub"])
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    if not await store.revoke(payload["jti"], payload["exp"] - time.time()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token already used")
+    return issue_tokens(user.username, str(user.id), payload.get("scopes", []))
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    body: RefreshRequest,
+    store: RevocationStoreDep,
+):
+    payload = verify_refresh_token(body.refresh_token)
+    await store.revoke(payload["jti"], payload["exp"] - time.time())
 
 
 @router.get("/users/me/", response_model=User)
@@ -66,24 +115,22 @@ async def read_users_me(
 
 
 @router.get("/google/login")
-async def google_login():
+async def google_login(google: GoogleOAuthDep):
     """Inicia el flujo de autenticación con Google"""
-    auth_data = get_google_authorization_url()
+    auth_data = get_google_authorization_url(google)
     return RedirectResponse(auth_data["url"])
 
 
 @router.get("/google/callback")
 async def google_callback(
     code: str,
-    session: SessionDep,
+    session: AsyncSessionDep,
+    google: GoogleOAuthDep,
 ):
     """Maneja la respuesta de Google después de la autenticación"""
     try:
-        flow = create_google_oauth_flow()
-        flow.fetch_token(code=code)
-        credentials = flow.credentials
-
-        user_info = await authenticate_with_google(credentials.id_token, session)
+        tokens = await google.exchange_code(code)
+        user_info = await authenticate_with_google(google, tokens, session)
 
         if isinstance(user_info, dict):
             if user_info.get('age'):
@@ -91,12 +138,7 @@ async def google_callback(
                     session=session,
                     google_data=user_info
                 )
-                access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-                access_token = create_access_token(
-                    data={"sub": user.username, "scopes": ["me"]},
-                    expires_delta=access_token_expires,
-                )
-                return Token(access_token=access_token, token_type="bearer")
+                return issue_tokens(user.username, str(user.id), ["me"])
             else:
                 # Si no tenemos la edad, pedimos información adicional
                 return {
@@ -107,12 +149,7 @@ async def google_callback(
                 }
 
         # Usuario existente
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user_info.username, "scopes": ["me"]},
-            expires_delta=access_token_expires,
-        )
-        return Token(access_token=access_token, token_type="bearer")
+        return issue_tokens(user_info.username, str(user_info.id), ["me"])
 
     except Exception as e:
         print(f"Error detallado: {str(e)}")
@@ -126,7 +163,7 @@ async def google_callback(
 async def complete_google_registration(
     google_data: dict,
     user_data: GoogleUserData,
-    session: SessionDep
+    session: AsyncSessionDep
 ):
     try:
         user = await create_google_user(
@@ -135,12 +172,7 @@ async def complete_google_registration(
             additional_data={"age": user_data.age}
         )
 
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.username, "scopes": ["me"]},
-            expires_delta=access_token_expires,
-        )
-        return Token(access_token=access_token, token_type="bearer")
+        return issue_tokens(user.username, str(user.id), ["me"])
 
     except Exception as e:
         raise HTTPException(
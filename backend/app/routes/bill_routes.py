@@ -0,0 +1,45 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, Query, status
+from ..db.session import AsyncSessionDep
+from ..schemas.auth import TokenData
+from ..schemas.bill_schema import BillCreate, BillOccurrenceResponse, BillResponse
+from ..services import bill_service
+from ..services.auth_service import get_current_claims
+
+router = APIRouter(
+    prefix="/bills",
+    tags=["bills"],
+    responses={404: {"description": "Not found"}},
+)
+
+CurrentClaims = Annotated[TokenData, Depends(get_current_claims)]
+
+
+@router.get("/")
+async def list_bills(session: AsyncSessionDep, claims: CurrentClaims) -> list[BillResponse]:
+    return await bill_service.list_bills(session, claims.user_id)
+
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
+async def create_bill(bill: BillCreate, session: AsyncSessionDep, claims: CurrentClaims) -> BillResponse:
+    return await bill_service.create_bill(session, claims.user_id, bill)
+
+
+@router.get("/due")
+async def get_due_bills(
+    session: AsyncSessionDep,
+    claims: CurrentClaims,
+    days: Annotated[int, Query(ge=0, le=bill_service.BILL_HORIZON_DAYS)] = 7,
+) -> list[BillOccurrenceResponse]:
+    """Vencimientos impagos en los próximos days días"""
+    return await bill_service.get_due_bills(session, claims.user_id, days)
+
+
+@router.post("/occurrences/{occurrence_id}/pay")
+async def pay_occurrence(occurrence_id: int, session: AsyncSessionDep, claims: CurrentClaims) -> BillOccurrenceResponse:
+    return await bill_service.pay_occurrence(session, claims.user_id, occurrence_id)
+
+
+@router.delete("/{bill_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_bill(bill_id: int, session: AsyncSessionDep, claims: CurrentClaims):
+    await bill_service.delete_bill(session, claims.user_id, bill_id)
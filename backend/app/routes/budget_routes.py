@@ -0,0 +1,38 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, status
+from ..db.session import AsyncSessionDep
+from ..schemas.auth import TokenData
+from ..schemas.budget_schema import BudgetCreate, BudgetResponse, BudgetStatus
+from ..services import budget_service
+from ..services.auth_service import get_current_claims
+
+router = APIRouter(
+    prefix="/budgets",
+    tags=["budgets"],
+    responses={404: {"description": "Not found"}},
+)
+
+CurrentClaims = Annotated[TokenData, Depends(get_current_claims)]
+
+
+@router.get("/")
+async def list_budgets(session: AsyncSessionDep, claims: CurrentClaims) -> list[BudgetResponse]:
+    return await budget_service.list_budgets(session, claims.user_id)
+
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
+async def create_budget(
+    budget: BudgetCreate, session: AsyncSessionDep, claims: CurrentClaims
+) -> BudgetResponse:
+    return await budget_service.create_budget(session, claims.user_id, budget)
+
+
+@router.get("/status")
+async def get_active_budgets_status(session: AsyncSessionDep, claims: CurrentClaims) -> list[BudgetStatus]:
+    """Estado de los presupuestos vigentes hoy, con el consumo acumulado y el flag de exceso"""
+    return await budget_service.get_active_budgets_status(session, claims.user_id)
+
+
+@router.get("/{budget_id}/status")
+async def get_budget_status(budget_id: int, session: AsyncSessionDep, claims: CurrentClaims) -> BudgetStatus:
+    return await budget_service.get_budget_status(session, claims.user_id, budget_id)
@@ -0,0 +1,33 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, status
+from ..db.session import AsyncSessionDep
+from ..schemas.auth import TokenData
+from ..schemas.category_schema import CategoryRuleCreate, CategoryRuleResponse
+from ..services import category_service
+from ..services.auth_service import get_current_claims
+
+router = APIRouter(
+    prefix="/categories",
+    tags=["categories"],
+    responses={404: {"description": "Not found"}},
+)
+
+CurrentClaims = Annotated[TokenData, Depends(get_current_claims)]
+
+
+@router.get("/rules")
+async def list_rules(session: AsyncSessionDep, claims: CurrentClaims) -> list[CategoryRuleResponse]:
+    """Reglas de categorización automática, en el orden en que se aplican"""
+    return await category_service.list_rules(session, claims.user_id)
+
+
+@router.post("/rules", status_code=status.HTTP_201_CREATED)
+async def create_rule(
+    rule: CategoryRuleCreate, session: AsyncSessionDep, claims: CurrentClaims
+) -> CategoryRuleResponse:
+    return await category_service.create_rule(session, claims.user_id, rule)
+
+
+@router.delete("/rules/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_rule(rule_id: int, session: AsyncSessionDep, claims: CurrentClaims):
+    await category_service.delete_rule(session, claims.user_id, rule_id)
@@ -0,0 +1,64 @@
+import secrets
+from os import getenv
+from typing import Annotated
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from ..auth.jwt_manager import token_cache
+from ..auth.user_cache import user_cache
+from ..db import session as db_session
+from ..db.session import EngineDep
+from ..db.pool_metrics import get_pool_stats
+from ..schemas.internal import AuthCacheStats, CacheStats, PasswordHashingStats, PasswordHashPoolStats, PoolSettings, PoolStats
+from ..utils.auth import password_hash_pool
+from ..utils.hashers import hashing_policy
+
+# Secreto compartido con el monitoreo; sin configurar, los endpoints internos no existen
+INTERNAL_API_TOKEN = getenv("INTERNAL_API_TOKEN")
+
+
+def verify_internal_token(x_internal_token: Annotated[str | None, Header()] = None) -> None:
+    if not INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if x_internal_token is None or not secrets.compare_digest(x_internal_token, INTERNAL_API_TOKEN):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid internal token")
+
+
+router = APIRouter(prefix="/internal", tags=["internal"], dependencies=[Depends(verify_internal_token)])
+
+
+@router.get("/db-pool")
+async def db_pool_stats(engine: EngineDep) -> PoolStats:
+    """Estado del pool de conexiones para dimensionar workers contra max_connections"""
+    return PoolStats(
+        **get_pool_stats(engine),
+        settings=PoolSettings(
+            pool_size=db_session.DB_POOL_SIZE,
+            max_overflow=db_session.DB_MAX_OVERFLOW,
+            pool_timeout=db_session.DB_POOL_TIMEOUT,
+            pool_recycle=db_session.DB_POOL_RECYCLE,
+            pool_pre_ping=db_session.DB_POOL_PRE_PING,
+            statement_timeout_ms=db_session.DB_STATEMENT_TIMEOUT_MS,
+        ),
+    )
+
+
+@router.get("/password-hashing")
+async def password_hashing_stats() -> PasswordHashingStats:
+    """Política de hashing vigente, costo calibrado y saturación del pool"""
+    return PasswordHashingStats(
+        **hashing_policy.stats(),
+        pool=PasswordHashPoolStats(
+            workers=password_hash_pool.workers,
+            max_queue=password_hash_pool.max_queue,
+            pending=password_hash_pool.pending,
+            rejected=password_hash_pool.rejected,
+        ),
+    )
+
+
+@router.get("/auth-cache")
+async def auth_cache_stats() -> AuthCacheStats:
+    """Aciertos y fallos de las cachés de tokens verificados y de usuarios"""
+    return AuthCacheStats(
+        token_cache=CacheStats(**token_cache.stats()),
+        user_cache=CacheStats(**user_cache.stats()),
+    )
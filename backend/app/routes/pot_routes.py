@@ -0,0 +1,60 @@
+from typing import Annotated
+from fastapi import APIRouter, Body, Depends, Query, status
+from ..db.session import AsyncSessionDep
+from ..schemas.auth import TokenData
+from ..schemas.pot_schema import (
+    BatchContribution, BatchContributionResult, ContributionCreate, ContributionResponse,
+    PotCreate, PotResponse)
+from ..services import pot_service
+from ..services.auth_service import get_current_claims
+
+router = APIRouter(
+    prefix="/pots",
+    tags=["pots"],
+    responses={404: {"description": "Not found"}},
+)
+
+CurrentClaims = Annotated[TokenData, Depends(get_current_claims)]
+
+CONTRIBUTIONS_PAGE_DEFAULT = 100
+CONTRIBUTIONS_PAGE_MAX = 500
+CONTRIBUTIONS_BATCH_MAX = 1000
+
+
+@router.get("/")
+async def list_pots(session: AsyncSessionDep, claims: CurrentClaims) -> list[PotResponse]:
+    return await pot_service.list_pots(session, claims.user_id)
+
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
+async def create_pot(pot: PotCreate, session: AsyncSessionDep, claims: CurrentClaims) -> PotResponse:
+    return await pot_service.create_pot(session, claims.user_id, pot)
+
+
+@router.post("/contributions/batch", responses={409: {"description": "Insufficient balance"}})
+async def contribute_batch(
+    contributions: Annotated[list[BatchContribution], Body(max_length=CONTRIBUTIONS_BATCH_MAX)],
+    session: AsyncSessionDep,
+    claims: CurrentClaims,
+) -> BatchContributionResult:
+    """Depósitos y retiros sobre varios pots en una sola transacción"""
+    return await pot_service.contribute_batch(session, claims.user_id, contributions)
+
+
+@router.post("/{pot_id}/contributions", status_code=status.HTTP_201_CREATED,
+             responses={409: {"description": "Insufficient balance"}})
+async def contribute(
+    pot_id: int, contribution: ContributionCreate, session: AsyncSessionDep, claims: CurrentClaims
+) -> ContributionResponse:
+    return await pot_service.contribute(session, claims.user_id, pot_id, contribution)
+
+
+@router.get("/{pot_id}/contributions")
+async def list_contributions(
+    pot_id: int,
+    session: AsyncSessionDep,
+    claims: CurrentClaims,
+    limit: Annotated[int, Query(ge=1, le=CONTRIBUTIONS_PAGE_MAX)] = CONTRIBUTIONS_PAGE_DEFAULT,
+    before: int | None = None,
+) -> list[ContributionResponse]:
+    return await pot_service.list_contributions(session, claims.user_id, pot_id, limit, before)
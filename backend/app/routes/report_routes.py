@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+from typing import Annotated
+from fastapi import APIRouter, Depends
+from ..db.session import AsyncSessionDep
+from ..schemas.auth import TokenData
+from ..schemas.report_schema import ConvertedMonthlySpend, MonthlySpendResponse
+from ..services import fx_service, report_service
+from ..services.auth_service import get_current_claims
+from ..utils.money import CurrencyCode
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+CurrentClaims = Annotated[TokenData, Depends(get_current_claims)]
+
+
+@router.get("/monthly")
+async def get_monthly_spend(
+    session: AsyncSessionDep,
+    claims: CurrentClaims,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    category_id: int | None = None,
+    currency: str | None = None,
+) -> list[MonthlySpendResponse]:
+    """Totales por mes y categoría leídos del acumulado, sin recorrer las transacciones"""
+    return await report_service.get_monthly_spend(
+        session, claims.user_id, date_from, date_to, category_id, currency)
+
+
+@router.get("/monthly/converted", responses={422: {"description": "Missing FX rate"}})
+async def get_converted_monthly_spend(
+    session: AsyncSessionDep,
+    claims: CurrentClaims,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    currency: CurrencyCode | None = None,
+) -> list[ConvertedMonthlySpend]:
+    """Totales por mes y categoría convertidos a la moneda del usuario (o a currency)"""
+    date_to = date_to or date.today()
+    date_from = date_from or report_service.month_start(date_to - timedelta(days=365))
+    return await fx_service.get_converted_monthly_spend(
+        session, claims.user_id, date_from, date_to, currency)
@@ -0,0 +1,191 @@
+from datetime import datetime
+from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response
+from ..db.session import AsyncSessionDep, SessionFactoryDep
+from ..schemas.auth import TokenData
+from ..schemas.import_schema import ImportProgress
+from ..schemas.transaction_schema import (
+    BatchResult, TransactionCreate, TransactionResponse, TransactionSearchPage, TransactionUpdate)
+from ..services import import_service, transaction_service
+from ..services.auth_service import get_current_claims
+from ..utils.batch_parsing import aiter_csv, aiter_json_array, aiter_ndjson
+from ..utils.money import DEFAULT_CURRENCY, CurrencyCode
+from ..utils.statement_parsing import aiter_ofx, aiter_statement_csv, line_codec
+
+router = APIRouter(
+    prefix="/transactions",
+    tags=["transactions"],
+    responses={404: {"description": "Not found"}},
+)
+
+CurrentClaims = Annotated[TokenData, Depends(get_current_claims)]
+
+TRANSACTIONS_PAGE_DEFAULT = 100
+TRANSACTIONS_PAGE_MAX = 500
+
+
+@router.get("/")
+async def list_transactions(
+    session: AsyncSessionDep,
+    claims: CurrentClaims,
+    limit: Annotated[int, Query(ge=1, le=TRANSACTIONS_PAGE_MAX)] = TRANSACTIONS_PAGE_DEFAULT,
+    after: int | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+) -> list[TransactionResponse]:
+    return await transaction_service.list_transactions(
+        session, claims.user_id, limit, after, date_from, date_to)
+
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
+async def create_transaction(
+    transaction: TransactionCreate, session: AsyncSessionDep, claims: CurrentClaims
+) -> TransactionResponse:
+    return await transaction_service.create_transaction(session, claims.user_id, transaction)
+
+
+async def read_limited_body(request: Request, max_bytes: int) -> bytes:
+    """Lee el body completo cortando con 413 apenas supera max_bytes"""
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"Body exceeds {max_bytes} bytes")
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > max_bytes:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+@router.post("/batch", responses={
+    413: {"description": "Batch exceeds the maximum number of rows or bytes"},
+    415: {"description": "Unsupported content type"},
+})
+async def create_transactions_batch(
+    request: Request, session: AsyncSessionDep, claims: CurrentClaims
+) -> BatchResult:
+    """Carga masiva desde un array JSON, NDJSON (application/x-ndjson) o CSV (text/csv)
+
+    NDJSON y CSV se leen del body en streaming, con líneas de hasta MAX_LINE_BYTES;
+    el array JSON se lee entero hasta BATCH_MAX_JSON_BYTES. El resultado informa
+    los errores por fila.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type == "application/json":
+        rows = aiter_json_array(await read_limited_body(request, transaction_service.BATCH_MAX_JSON_BYTES))
+    elif content_type == "application/x-ndjson":
+        rows = aiter_ndjson(request.stream())
+    elif content_type == "text/csv":
+        rows = aiter_csv(request.stream())
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Use application/json, application/x-ndjson or text/csv")
+    return await transaction_service.ingest_batch(session, claims.user_id, rows)
+
+
+@router.post("/import", responses={
+    200: {"content": {"application/x-ndjson": {}}},
+    415: {"description": "Unsupported content type"},
+    422: {"description": "Category not found or unknown encoding"},
+})
+async def import_statement(
+    request: Request,
+    session_factory: SessionFactoryDep,
+    claims: CurrentClaims,
+    category_id: int,
+    currency: CurrencyCode = DEFAULT_CURRENCY,
+    negate: bool = True,
+    date_format: str | None = None,
+    offset: Annotated[int, Query(ge=0)] = 0,
+    import_id: Annotated[str | None, Query(max_length=64)] = None,
+    encoding: Annotated[str | None, Query(max_length=32)] = None,
+    account: Annotated[str | None, Query(max_length=64)] = None,
+) -> Response:
+    """Importa un extracto CSV (text/csv) u OFX (application/x-ofx) leyendo el body en streaming
+
+    Responde NDJSON con el progreso de cada lote confirmado; el último objeto trae
+    done=true y los errores por fila. Con import_id el progreso se puede consultar
+    mientras corre. Para reanudar se reenvía el archivo con el último offset informado.
+    El encoding del CSV sale del parámetro, del charset del Content-Type o es UTF-8.
+    account identifica la cuenta del extracto cuando el archivo no la trae (ACCTID en OFX).
+    """
+    media_type, _, params = request.headers.get("content-type", "").partition(";")
+    content_type = media_type.strip()
+    charset = next((value.strip().strip('"') for key, _, value in
+                    (param.partition("=") for param in params.split(";")) if key.strip().lower() == "charset"), None)
+    encoding = encoding or charset or "utf-8"
+    try:
+        line_codec(encoding)
+    except LookupError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Unknown encoding '{encoding}'")
+    if content_type == "text/csv":
+        records = aiter_statement_csv(request.stream(), encoding=encoding)
+    elif content_type in ("application/x-ofx", "application/ofx"):
+        records = aiter_ofx(request.stream())
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Use text/csv or application/x-ofx")
+    async with session_factory() as session:
+        categorizer = await import_service.Categorizer.load(session, claims.user_id, category_id)
+    options = import_service.ImportOptions(
+        category_id=category_id, currency=currency, negate=negate, date_format=date_format, offset=offset,
+        account=account)
+    # El body se consume acá: una StreamingResponse competiría con él por receive()
+    lines = [
+        progress.model_dump_json() + "\n"
+        async for progress in import_service.import_statement(
+            session_factory, claims.user_id, records, options, categorizer, import_id)
+    ]
+    return Response("".join(lines), media_type="application/x-ndjson")
+
+
+@router.get("/import/{import_id}")
+async def get_import_progress(import_id: str, claims: CurrentClaims) -> ImportProgress:
+    progress = import_service.import_progress.get((claims.user_id, import_id))
+    if progress is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Import not found")
+    return progress
+
+
+@router.get("/search")
+async def search_transactions(
+    session: AsyncSessionDep,
+    claims: CurrentClaims,
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    limit: Annotated[int, Query(ge=1, le=TRANSACTIONS_PAGE_MAX)] = TRANSACTIONS_PAGE_DEFAULT,
+    cursor: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    fuzzy: bool = False,
+) -> TransactionSearchPage:
+    """Busca en las descripciones; fuzzy también acepta coincidencias aproximadas del comercio"""
+    return await transaction_service.search_transactions(
+        session, claims.user_id, q, limit, cursor, date_from, date_to, fuzzy)
+
+
+@router.get("/{transaction_id}")
+async def get_transaction(
+    transaction_id: int, session: AsyncSessionDep, claims: CurrentClaims
+) -> TransactionResponse:
+    return TransactionResponse.model_validate(
+        await transaction_service.get_transaction(session, claims.user_id, transaction_id))
+
+
+@router.patch("/{transaction_id}")
+async def update_transaction(
+    transaction_id: int, transaction: TransactionUpdate, session: AsyncSessionDep, claims: CurrentClaims
+) -> TransactionResponse:
+    return await transaction_service.update_transaction(
+        session, claims.user_id, transaction_id, transaction)
+
+
+@router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_transaction(transaction_id: int, session: AsyncSessionDep, claims: CurrentClaims):
+    await transaction_service.delete_transaction(session, claims.user_id, transaction_id)
@@ -1,7 +1,9 @@
+from typing import Annotated
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.exc import SQLAlchemyError
-from ..db.session import SessionDep
+from ..db.session import AsyncSessionDep, SessionFactoryDep
 from ..services import user_services
 from ..schemas.user_schema import UserCreate, UserResponse, UserUpdate
 
@@ -11,20 +13,42 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+USERS_PAGE_DEFAULT = 100
+USERS_PAGE_MAX = 500
+USERS_EXPORT_BATCH = 1000
+
 
 @router.get("/")
-async def get_all_users(session: SessionDep) -> list[UserResponse]:
+async def get_all_users(
+    session: AsyncSessionDep,
+    response: Response,
+    limit: Annotated[int, Query(ge=1, le=USERS_PAGE_MAX)] = USERS_PAGE_DEFAULT,
+    after: UUID | None = None,
+) -> list[UserResponse]:
     try:
-        return user_services.get_all_users(session)
+        users = await user_services.get_all_users(session, limit, after)
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
+    if len(users) == limit:
+        # Cursor para pedir la página siguiente con ?after=
+        response.headers["X-Next-Cursor"] = str(users[-1].id)
+    return users
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_users(session_factory: SessionFactoryDep):
+    """Exporta todos los usuarios como NDJSON en memoria constante"""
+    return StreamingResponse(
+        user_services.stream_users_ndjson(session_factory, USERS_EXPORT_BATCH),
+        media_type="application/x-ndjson",
+    )
 
 
 @router.get("/{user_id}")
-async def get_user_by_id(user_id: UUID, session: SessionDep) -> UserResponse:
+async def get_user_by_id(user_id: UUID, session: AsyncSessionDep) -> UserResponse:
     try:
-        return user_services.get_user_by_id(user_id, session)
+        return await user_services.get_user_by_id(user_id, session)
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
@@ -43,27 +67,27 @@ async def get_user_by_id(user_id: UUID, session: SessionDep) -> UserResponse:
                      }
                  }
              })
-async def create_user(user: UserCreate, session: SessionDep) -> UserResponse:
+async def create_user(user: UserCreate, session: AsyncSessionDep) -> UserResponse:
     try:
-        return user_services.create_user(user, session)
+        return await user_services.create_user(user, session)
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
 
 
 @router.patch("/{user_id}")
-async def update_user(user_id: UUID, user: UserUpdate, session: SessionDep) -> UserResponse:
+async def update_user(user_id: UUID, user: UserUpdate, session: AsyncSessionDep) -> UserResponse:
     try:
-        return user_services.update_user(user_id, user, session)
+        return await user_services.update_user(user_id, user, session)
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user(user_id: UUID, session: SessionDep):
+async def delete_user(user_id: UUID, session: AsyncSessionDep):
     try:
-        user_services.delete_user(user_id, session)
+        await user_services.delete_user(user_id, session)
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+from ..auth.jwt_manager import get_keyring, uses_keyring
+
+router = APIRouter(prefix="/.well-known", tags=["auth"])
+
+
+@router.get("/jwks.json")
+async def jwks(response: Response) -> dict:
+    """Claves públicas para verificar los tokens sin compartir el secreto de firma"""
+    response.headers["Cache-Control"] = "public, max-age=300"
+    if not uses_keyring():
+        return {"keys": []}
+    return get_keyring().jwks()
@@ -0,0 +1,39 @@
+from datetime import date
+from typing import Optional
+from pydantic import BaseModel
+
+
+class DailyPoint(BaseModel):
+    day: date
+    total: float
+    rolling_7: float
+    rolling_30: float
+
+
+class CategoryShare(BaseModel):
+    category_id: int
+    total: float
+    share: float
+
+
+class MonthlyPoint(BaseModel):
+    month: date
+    total: float
+    delta: Optional[float] = None
+    delta_pct: Optional[float] = None
+
+
+class ForecastPoint(BaseModel):
+    month: date
+    total: float
+
+
+class AnalyticsSummary(BaseModel):
+    date_from: date
+    date_to: date
+    total: float
+    count: int
+    daily: list[DailyPoint]
+    categories: list[CategoryShare]
+    months: list[MonthlyPoint]
+    forecast: list[ForecastPoint]
@@ -1,3 +1,4 @@
+from uuid import UUID
 from pydantic import BaseModel
 
 
@@ -18,8 +19,13 @@ class Token(BaseModel):
     expires_in: int | None = None
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
 class TokenData(BaseModel):
     username: str | None = None
+    user_id: UUID | None = None
     scopes: list[str] = []
 
 class GoogleUserData(BaseModel):
@@ -0,0 +1,39 @@
+from datetime import date
+from enum import Enum
+from pydantic import BaseModel, Field
+from ..utils.money import DEFAULT_CURRENCY, Amount, CurrencyCode
+
+
+class IntervalUnit(str, Enum):
+    day = "day"
+    week = "week"
+    month = "month"
+    year = "year"
+
+
+class BillCreate(BaseModel):
+    name: str
+    amount: Amount
+    currency: CurrencyCode = DEFAULT_CURRENCY
+    starts_on: date
+    interval_unit: IntervalUnit = IntervalUnit.month
+    interval_count: int = Field(default=1, ge=1)
+
+
+class BillResponse(BillCreate):
+    id: int
+    next_due_at: date
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class BillOccurrenceResponse(BaseModel):
+    id: int
+    bill_id: int
+    name: str
+    due_on: date
+    amount: Amount
+    currency: str
+    is_paid: bool
@@ -0,0 +1,39 @@
+from datetime import date
+from pydantic import BaseModel, model_validator
+from ..utils.money import DEFAULT_CURRENCY, Amount, CurrencyCode
+
+
+class BudgetCreate(BaseModel):
+    category_id: int
+    amount: Amount
+    currency: CurrencyCode = DEFAULT_CURRENCY
+    start_date: date
+    end_date: date
+
+    @model_validator(mode="after")
+    def check_dates(self):
+        if self.end_date < self.start_date:
+            raise ValueError("end_date must be on or after start_date")
+        return self
+
+
+class BudgetResponse(BudgetCreate):
+    id: int
+    consumed_amount: Amount
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class BudgetStatus(BaseModel):
+    budget_id: int
+    category_id: int
+    amount: Amount
+    currency: str
+    consumed_amount: Amount
+    remaining: Amount
+    utilization: float
+    overrun: bool
+    start_date: date
+    end_date: date
@@ -0,0 +1,44 @@
+from enum import Enum
+from typing import Optional
+from pydantic import BaseModel, model_validator
+from ..utils.money import Amount
+from ..utils.safe_regex import compile_rule_regex
+
+
+class RuleKind(str, Enum):
+    keyword = "keyword"
+    regex = "regex"
+    amount = "amount"
+
+
+class CategoryRuleCreate(BaseModel):
+    category_id: int
+    kind: RuleKind
+    # Palabra clave (se busca como subcadena, sin distinguir mayúsculas ni acentos) o regex
+    pattern: Optional[str] = None
+    min_amount: Optional[Amount] = None
+    max_amount: Optional[Amount] = None
+    priority: int = 0
+
+    @model_validator(mode="after")
+    def check_rule(self):
+        if self.kind == RuleKind.amount:
+            if self.pattern is not None:
+                raise ValueError("amount rules do not take a pattern")
+            if self.min_amount is None and self.max_amount is None:
+                raise ValueError("amount rules need min_amount or max_amount")
+        elif not (self.pattern or "").strip():
+            raise ValueError(f"{self.kind.value} rules need a pattern")
+        if self.kind == RuleKind.regex:
+            compile_rule_regex(self.pattern)
+        if self.min_amount is not None and self.max_amount is not None and self.min_amount > self.max_amount:
+            raise ValueError("min_amount must be less than or equal to max_amount")
+        return self
+
+
+class CategoryRuleResponse(CategoryRuleCreate):
+    id: int
+
+    model_config = {
+        "from_attributes": True
+    }
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from .transaction_schema import BatchRowError
+
+
+class NearDuplicate(BaseModel):
+    """Fila importada parecida a una transacción que ya existía (no se omite, se avisa)"""
+    row: int
+    transaction_id: int
+    similarity: float
+
+
+class ImportProgress(BaseModel):
+    rows: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    near_duplicates: int = 0
+    failed: int = 0
+    # Offset en bytes hasta donde quedó confirmada la importación, para reanudarla
+    offset: int = 0
+    done: bool = False
+    errors: list[BatchRowError] = []
+    near_duplicate_matches: list[NearDuplicate] = []
@@ -0,0 +1,58 @@
+from pydantic import BaseModel
+
+
+class PoolWaitTime(BaseModel):
+    count: int
+    sum_ms: float
+    max_ms: float
+    buckets: dict[str, int]
+
+
+class PoolSettings(BaseModel):
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float
+    pool_recycle: int
+    pool_pre_ping: bool
+    statement_timeout_ms: int
+
+
+class PoolStats(BaseModel):
+    pool_class: str
+    size: int | None = None
+    checked_in: int | None = None
+    checked_out: int | None = None
+    overflow: int | None = None
+    wait_time: PoolWaitTime
+    settings: PoolSettings
+
+
+class PasswordHashPoolStats(BaseModel):
+    workers: int
+    max_queue: int
+    pending: int
+    rejected: int
+
+
+class PasswordHashingStats(BaseModel):
+    algorithm: str
+    params: dict[str, int]
+    target_ms: float
+    calibrated_ms: float | None = None
+    hashes: int
+    verifications: int
+    rehashes: int
+    pool: PasswordHashPoolStats
+
+
+class CacheStats(BaseModel):
+    size: int
+    maxsize: int
+    ttl: float
+    hits: int
+    misses: int
+
+
+class AuthCacheStats(BaseModel):
+    token_cache: CacheStats
+    user_cache: CacheStats
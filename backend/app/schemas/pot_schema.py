@@ -0,0 +1,61 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Annotated, Optional
+from pydantic import BaseModel, Field, field_validator
+from ..utils.money import DEFAULT_CURRENCY, Amount, CurrencyCode
+
+
+class PotCreate(BaseModel):
+    name: str
+    target_amount: Annotated[Amount, Field(gt=0)]
+    currency: CurrencyCode = DEFAULT_CURRENCY
+    start_date: date
+
+
+class PotResponse(PotCreate):
+    id: int
+    current_amount: Amount
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class ContributionCreate(BaseModel):
+    # Positivo deposita, negativo retira
+    amount: Amount
+    note: Optional[str] = None
+
+    @field_validator("amount")
+    @classmethod
+    def check_amount(cls, value: Decimal) -> Decimal:
+        if value == 0:
+            raise ValueError("amount must not be zero")
+        return value
+
+
+class BatchContribution(ContributionCreate):
+    pot_id: int
+
+
+class ContributionResponse(BaseModel):
+    id: int
+    pot_id: int
+    amount: Amount
+    balance: Amount
+    note: Optional[str] = None
+    created_at: datetime
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class PotBalance(BaseModel):
+    pot_id: int
+    current_amount: Amount
+
+
+class BatchContributionResult(BaseModel):
+    applied: int
+    balances: list[PotBalance]
@@ -0,0 +1,25 @@
+from datetime import date
+from pydantic import BaseModel
+from ..utils.money import Amount
+
+
+class MonthlySpendResponse(BaseModel):
+    month: date
+    category_id: int
+    currency: str
+    total: Amount
+    count: int
+    min_amount: Amount
+    max_amount: Amount
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class ConvertedMonthlySpend(BaseModel):
+    month: date
+    category_id: int
+    currency: str
+    total: Amount
+    count: int
@@ -0,0 +1,53 @@
+from datetime import datetime
+from pydantic import BaseModel, UUID4
+from typing import Optional
+from ..utils.money import DEFAULT_CURRENCY, Amount, CurrencyCode
+
+
+class TransactionBase(BaseModel):
+    category_id: int
+    budget_id: Optional[int] = None
+    amount: Amount
+    currency: CurrencyCode = DEFAULT_CURRENCY
+    description: Optional[str] = None
+    trasaction_date: datetime
+
+
+class TransactionCreate(TransactionBase):
+    pass
+
+
+class TransactionUpdate(BaseModel):
+    category_id: Optional[int] = None
+    budget_id: Optional[int] = None
+    amount: Optional[Amount] = None
+    currency: Optional[CurrencyCode] = None
+    description: Optional[str] = None
+    trasaction_date: Optional[datetime] = None
+
+
+class TransactionResponse(TransactionBase):
+    id: int
+    user_id: UUID4
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class TransactionSearchPage(BaseModel):
+    items: list[TransactionResponse]
+    # Cursor opaco para pedir la página siguiente; None si no hay más resultados
+    next_cursor: Optional[str] = None
+
+
+class BatchRowError(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class BatchResult(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    errors: list[BatchRowError]
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, EmailStr, UUID4
 from typing import Optional
+from ..utils.money import DEFAULT_CURRENCY, CurrencyCode
 
 
 class UserBase(BaseModel):
@@ -8,6 +9,7 @@ class UserBase(BaseModel):
     first_name: str
     last_name: str
     age: int
+    home_currency: CurrencyCode = DEFAULT_CURRENCY
 
 
 class UserCreate(UserBase):
@@ -24,6 +26,7 @@ class UserUpdate(BaseModel):
     first_name: Optional[str] = None
     last_name: Optional[str] = None
     age: Optional[int] = None
+    home_currency: Optional[CurrencyCode] = None
     password: Optional[str] = None
 
     model_config = {
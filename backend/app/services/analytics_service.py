@@ -0,0 +1,131 @@
+from datetime import date, datetime, time, timedelta
+from uuid import UUID
+import numpy as np
+from sqlalchemy import BigInteger, type_coerce
+from sqlmodel import select
+from ..db.models import Transactions
+from ..db.session import AsyncSessionDep
+from ..schemas.analytics_schema import (
+    AnalyticsSummary, CategoryShare, DailyPoint, ForecastPoint, MonthlyPoint)
+from ..utils.money import MONEY_SCALE
+
+ROLLING_WINDOWS = (7, 30)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Media móvil hacia atrás; los primeros días promedian la ventana parcial"""
+    sums = np.cumsum(values)
+    sums[window:] = sums[window:] - sums[:-window]
+    return sums / np.minimum(np.arange(1, len(values) + 1), window)
+
+
+def sum_by_index(index: np.ndarray, amounts: np.ndarray, size: int) -> np.ndarray:
+    """Suma entera de los montos por posición; np.bincount con pesos devolvería float64"""
+    totals = np.zeros(size, dtype=np.int64)
+    np.add.at(totals, index, amounts)
+    return totals
+
+
+def to_date(value: np.datetime64) -> date:
+    return value.astype("datetime64[D]").item()
+
+
+def summarize(
+    dates: np.ndarray,
+    amounts: np.ndarray,
+    categories: np.ndarray,
+    date_from: date,
+    date_to: date,
+    horizon: int,
+) -> AnalyticsSummary:
+    """Calcula todas las métricas sobre columnas ya cargadas: fechas (datetime64[D]), montos y categorías
+
+    Los montos llegan en unidades menores (int64): las sumas por día, mes y categoría
+    son enteras y solo se pasan a unidades al armar el resultado.
+    """
+    scale = 10 ** MONEY_SCALE
+    first_day = np.datetime64(date_from, "D")
+    day_range = np.arange(first_day, np.datetime64(date_to, "D") + 1)
+    daily = sum_by_index((dates - first_day).astype(np.int64), amounts, len(day_range)) / scale
+    rolling = [rolling_mean(daily, window) for window in ROLLING_WINDOWS]
+
+    category_ids, category_index = np.unique(categories, return_inverse=True)
+    category_minor = sum_by_index(category_index, amounts, len(category_ids))
+    total_minor = int(amounts.sum())
+    shares = category_minor / total_minor if total_minor else np.zeros(len(category_minor))
+    category_totals = category_minor / scale
+
+    # Meses del rango completo, incluidos los que no tienen movimientos
+    first_month = np.datetime64(date_from, "M")
+    month_range = np.arange(first_month, np.datetime64(date_to, "M") + 1)
+    monthly = sum_by_index(
+        (dates.astype("datetime64[M]") - first_month).astype(np.int64), amounts, len(month_range)) / scale
+    deltas = np.diff(monthly)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        deltas_pct = np.where(monthly[:-1] != 0, deltas / monthly[:-1], np.nan)
+
+    # Tendencia lineal sobre los totales mensuales
+    if len(monthly) >= 2:
+        slope, intercept = np.polyfit(np.arange(len(monthly)), monthly, 1)
+    else:
+        slope, intercept = 0.0, float(monthly[-1])
+    future = np.arange(len(monthly), len(monthly) + horizon)
+    forecast = slope * future + intercept
+    forecast_months = np.arange(month_range[-1] + 1, month_range[-1] + 1 + horizon)
+
+    return AnalyticsSummary(
+        date_from=date_from,
+        date_to=date_to,
+        total=total_minor / scale,
+        count=len(amounts),
+        daily=[
+            DailyPoint(day=to_date(day), total=value, rolling_7=short, rolling_30=long)
+            for day, value, short, long in zip(day_range, daily.tolist(), *(r.tolist() for r in rolling))
+        ],
+        categories=[
+            CategoryShare(category_id=category_id, total=value, share=share)
+            for category_id, value, share in zip(
+                category_ids.tolist(), category_totals.tolist(), shares.tolist())
+        ],
+        months=[MonthlyPoint(month=to_date(month_range[0]), total=float(monthly[0]))] + [
+            MonthlyPoint(
+                month=to_date(month), total=value, delta=delta,
+                delta_pct=None if np.isnan(pct) else pct)
+            for month, value, delta, pct in zip(
+                month_range[1:], monthly[1:].tolist(), deltas.tolist(), deltas_pct.tolist())
+        ],
+        forecast=[
+            ForecastPoint(month=to_date(month), total=value)
+            for month, value in zip(forecast_months, forecast.tolist())
+        ],
+    )
+
+
+async def get_summary(
+    session: AsyncSessionDep,
+    user_id: UUID,
+    date_from: date,
+    date_to: date,
+    horizon: int,
+    currency: str,
+) -> AnalyticsSummary:
+    # Una sola consulta de tres columnas; los montos se leen crudos, en unidades menores
+    rows = (await session.exec(
+        select(
+            Transactions.trasaction_date,
+            type_coerce(Transactions.amount, BigInteger),
+            Transactions.category_id,
+        ).where(
+            Transactions.user_id == user_id,
+            Transactions.currency == currency,
+            Transactions.trasaction_date >= datetime.combine(date_from, time()),
+            Transactions.trasaction_date < datetime.combine(date_to + timedelta(days=1), time()),
+        )
+    )).all()
+    dates, amounts, categories = zip(*rows) if rows else ((), (), ())
+    return summarize(
+        np.array(dates, dtype="datetime64[D]"),
+        np.array(amounts, dtype=np.int64),
+        np.array(categories, dtype=np.int64),
+        date_from, date_to, horizon,
+    )
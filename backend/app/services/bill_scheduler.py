@@ -0,0 +1,67 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+from os import getenv
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..db.models import RecurringBills
+from .bill_service import BILL_HORIZON_DAYS, materialize
+
+logger = logging.getLogger(__name__)
+
+BILL_SCHEDULER_ENABLED = getenv("BILL_SCHEDULER_ENABLED", "true").lower() == "true"
+BILL_SCHEDULER_INTERVAL = float(getenv("BILL_SCHEDULER_INTERVAL", "60"))
+BILL_SCHEDULER_BATCH_SIZE = int(getenv("BILL_SCHEDULER_BATCH_SIZE", "500"))
+
+
+async def run_tick(session_factory: async_sessionmaker[AsyncSession], today: date | None = None) -> int:
+    """Procesa un lote de facturas con vencimientos pendientes dentro del horizonte
+
+    El lote sale del índice sobre next_due_at; en Postgres SKIP LOCKED permite
+    varias instancias sin que se pisen. Devuelve la cantidad de facturas procesadas.
+    """
+    until = (today or date.today()) + timedelta(days=BILL_HORIZON_DAYS)
+    async with session_factory() as session:
+        bills = (await session.exec(
+            select(RecurringBills)
+            .where(RecurringBills.next_due_at <= until)
+            .order_by(RecurringBills.next_due_at, RecurringBills.id)
+            .limit(BILL_SCHEDULER_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )).all()
+        await materialize(session, list(bills), until)
+        await session.commit()
+    return len(bills)
+
+
+class BillScheduler:
+    """Tarea de fondo que materializa vencimientos por lotes fuera del camino de los requests"""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], interval: float = BILL_SCHEDULER_INTERVAL):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self.run())
+
+    async def run(self) -> None:
+        while True:
+            try:
+                processed = await run_tick(self.session_factory)
+            except Exception:
+                logger.exception("Bill scheduler tick failed")
+                processed = 0
+            # Con un lote completo queda trabajo pendiente: se sigue sin esperar
+            await asyncio.sleep(0 if processed >= BILL_SCHEDULER_BATCH_SIZE else self.interval)
+
+    async def stop(self) -> None:
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
@@ -0,0 +1,117 @@
+import calendar
+from datetime import date, timedelta
+from os import getenv
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlmodel import select
+from ..db.models import BillOccurrence, RecurringBills
+from ..db.session import AsyncSessionDep
+from ..db.upsert import insert_for
+from ..schemas.bill_schema import BillCreate, BillOccurrenceResponse, BillResponse
+
+# Días hacia adelante que se materializan y tope de vencimientos por factura en una pasada
+BILL_HORIZON_DAYS = int(getenv("BILL_HORIZON_DAYS", "60"))
+BILL_MAX_OCCURRENCES_PER_PASS = 64
+
+
+def shift_months(value: date, months: int) -> date:
+    year, month = divmod(value.month - 1 + months, 12)
+    year += value.year
+    return date(year, month + 1, min(value.day, calendar.monthrange(year, month + 1)[1]))
+
+
+def next_occurrence(bill: RecurringBills, current: date) -> date:
+    """Vencimiento siguiente a current; meses y años se anclan a starts_on para no perder el día"""
+    if bill.interval_unit == "day":
+        return current + timedelta(days=bill.interval_count)
+    if bill.interval_unit == "week":
+        return current + timedelta(weeks=bill.interval_count)
+    step = bill.interval_count * (12 if bill.interval_unit == "year" else 1)
+    elapsed = (current.year - bill.starts_on.year) * 12 + current.month - bill.starts_on.month
+    return shift_months(bill.starts_on, elapsed + step)
+
+
+async def materialize(session: AsyncSessionDep, bills: list[RecurringBills], until: date) -> int:
+    """Genera los vencimientos hasta until y avanza next_due_at; idempotente ante reintentos"""
+    rows = []
+    for bill in bills:
+        due_on = bill.next_due_at
+        for _ in range(BILL_MAX_OCCURRENCES_PER_PASS):
+            if due_on > until:
+                break
+            rows.append({"bill_id": bill.id, "user_id": bill.user_id, "due_on": due_on, "amount": bill.amount})
+            due_on = next_occurrence(bill, due_on)
+        bill.next_due_at = due_on
+        session.add(bill)
+    if rows:
+        await session.exec(
+            insert_for(session, BillOccurrence).on_conflict_do_nothing(
+                index_elements=["bill_id", "due_on"]),
+            params=rows)
+    return len(rows)
+
+
+async def list_bills(session: AsyncSessionDep, user_id: UUID) -> list[BillResponse]:
+    bills = (await session.exec(select(RecurringBills).where(
+        RecurringBills.user_id == user_id).order_by(RecurringBills.next_due_at, RecurringBills.id))).all()
+    return [BillResponse.model_validate(bill) for bill in bills]
+
+
+async def create_bill(session: AsyncSessionDep, user_id: UUID, bill: BillCreate) -> BillResponse:
+    db_bill = RecurringBills(
+        **bill.model_dump(exclude={"interval_unit"}), interval_unit=bill.interval_unit.value,
+        user_id=user_id, next_due_at=bill.starts_on)
+    session.add(db_bill)
+    await session.flush()
+    # Los vencimientos cercanos quedan disponibles sin esperar al scheduler
+    await materialize(session, [db_bill], date.today() + timedelta(days=BILL_HORIZON_DAYS))
+    await session.commit()
+    await session.refresh(db_bill)
+    return BillResponse.model_validate(db_bill)
+
+
+async def delete_bill(session: AsyncSessionDep, user_id: UUID, bill_id: int):
+    db_bill = (await session.exec(select(RecurringBills).where(
+        RecurringBills.id == bill_id, RecurringBills.user_id == user_id))).first()
+    if not db_bill:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Bill not found")
+    await session.delete(db_bill)
+    await session.commit()
+
+
+async def get_due_bills(
+    session: AsyncSessionDep, user_id: UUID, days: int, today: date | None = None
+) -> list[BillOccurrenceResponse]:
+    """Vencimientos impagos entre hoy y hoy + days: un range scan sobre (user_id, due_on)"""
+    today = today or date.today()
+    rows = (await session.exec(
+        select(BillOccurrence, RecurringBills.name, RecurringBills.currency)
+        .join(RecurringBills, RecurringBills.id == BillOccurrence.bill_id)
+        .where(
+            BillOccurrence.user_id == user_id,
+            BillOccurrence.due_on >= today,
+            BillOccurrence.due_on <= today + timedelta(days=days),
+            BillOccurrence.is_paid == False,  # noqa: E712
+        ).order_by(BillOccurrence.due_on, BillOccurrence.id)
+    )).all()
+    return [
+        BillOccurrenceResponse(**occurrence.model_dump(exclude={"user_id"}), name=name, currency=currency)
+        for occurrence, name, currency in rows
+    ]
+
+
+async def pay_occurrence(session: AsyncSessionDep, user_id: UUID, occurrence_id: int) -> BillOccurrenceResponse:
+    row = (await session.exec(
+        select(BillOccurrence, RecurringBills.name, RecurringBills.currency)
+        .join(RecurringBills, RecurringBills.id == BillOccurrence.bill_id)
+        .where(BillOccurrence.id == occurrence_id, BillOccurrence.user_id == user_id)
+    )).first()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Bill occurrence not found")
+    occurrence, name, currency = row
+    occurrence.is_paid = True
+    session.add(occurrence)
+    await session.commit()
+    return BillOccurrenceResponse(**occurrence.model_dump(exclude={"user_id"}), name=name, currency=currency)
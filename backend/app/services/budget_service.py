@@ -0,0 +1,86 @@
+from datetime import date
+from decimal import Decimal
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import update
+from sqlmodel import select
+from ..db.models import Budget, Categories
+from ..db.session import AsyncSessionDep
+from ..schemas.budget_schema import BudgetCreate, BudgetResponse, BudgetStatus
+
+
+class BudgetConsumption:
+    """Variación del consumo por presupuesto pendiente de aplicar"""
+
+    def __init__(self):
+        self.deltas: dict[int, Decimal] = {}
+
+    def add(self, budget_id: int | None, amount: Decimal) -> None:
+        if budget_id is not None:
+            self.deltas[budget_id] = self.deltas.get(budget_id, Decimal(0)) + amount
+
+    def remove(self, budget_id: int | None, amount: Decimal) -> None:
+        self.add(budget_id, -amount)
+
+    async def apply(self, session: AsyncSessionDep) -> None:
+        # UPDATE relativo y en orden de id: sin lecturas previas ni deadlocks entre escrituras
+        for budget_id in sorted(self.deltas):
+            delta = self.deltas[budget_id]
+            if delta:
+                await session.exec(update(Budget).where(Budget.id == budget_id).values(
+                    consumed_amount=Budget.consumed_amount + delta))
+        self.deltas.clear()
+
+
+def to_status(budget: Budget) -> BudgetStatus:
+    return BudgetStatus(
+        budget_id=budget.id,
+        category_id=budget.category_id,
+        amount=budget.amount,
+        currency=budget.currency,
+        consumed_amount=budget.consumed_amount,
+        remaining=budget.amount - budget.consumed_amount,
+        utilization=float(budget.consumed_amount / budget.amount) if budget.amount else 0.0,
+        overrun=budget.consumed_amount > budget.amount,
+        start_date=budget.start_date,
+        end_date=budget.end_date,
+    )
+
+
+async def create_budget(session: AsyncSessionDep, user_id: UUID, budget: BudgetCreate) -> BudgetResponse:
+    category = (await session.exec(select(Categories).where(
+        Categories.id == budget.category_id, Categories.user_id == user_id))).first()
+    if not category:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Category not found")
+    db_budget = Budget(**budget.model_dump(), user_id=user_id)
+    session.add(db_budget)
+    await session.commit()
+    await session.refresh(db_budget)
+    return BudgetResponse.model_validate(db_budget)
+
+
+async def list_budgets(session: AsyncSessionDep, user_id: UUID) -> list[BudgetResponse]:
+    budgets = (await session.exec(
+        select(Budget).where(Budget.user_id == user_id).order_by(Budget.start_date, Budget.id))).all()
+    return [BudgetResponse.model_validate(budget) for budget in budgets]
+
+
+async def get_budget_status(session: AsyncSessionDep, user_id: UUID, budget_id: int) -> BudgetStatus:
+    budget = (await session.exec(select(Budget).where(
+        Budget.id == budget_id, Budget.user_id == user_id))).first()
+    if not budget:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Budget not found")
+    return to_status(budget)
+
+
+async def get_active_budgets_status(
+    session: AsyncSessionDep, user_id: UUID, on: date | None = None
+) -> list[BudgetStatus]:
+    """Estado de todos los presupuestos vigentes en una sola consulta"""
+    on = on or date.today()
+    budgets = (await session.exec(select(Budget).where(
+        Budget.user_id == user_id, Budget.start_date <= on, Budget.end_date >= on,
+    ).order_by(Budget.id))).all()
+    return [to_status(budget) for budget in budgets]
@@ -0,0 +1,123 @@
+import re
+from decimal import Decimal
+from os import getenv
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlmodel import select
+from ..db.models import Categories, CategoryRule
+from ..db.session import AsyncSessionDep
+from ..schemas.category_schema import CategoryRuleCreate, CategoryRuleResponse, RuleKind
+from ..utils.aho_corasick import AhoCorasick
+from ..utils.cache import TTLCache
+from ..utils.dedupe import normalize_description
+from ..utils.money import to_minor
+from ..utils.safe_regex import REGEX_MAX_INPUT, compile_rule_regex
+
+# El matcher compilado se invalida al cambiar las reglas; el TTL acota la
+# desactualización cuando las cambia otro proceso
+CATEGORY_RULES_CACHE_TTL = float(getenv("CATEGORY_RULES_CACHE_TTL", "300"))
+
+
+class RuleMatcher:
+    """Reglas de un usuario compiladas para categorizar muchas descripciones
+
+    Las palabras clave van a un único autómata de Aho-Corasick, así que cada
+    descripción se recorre una vez sin importar cuántas haya. Las reglas se
+    ordenan por prioridad (rank 0 = la que gana) y las de monto y regex solo se
+    evalúan mientras puedan superar a la mejor coincidencia encontrada. Una regex
+    guardada que ya no pasa la validación se ignora en lugar de evaluarse.
+    """
+
+    def __init__(self, rules: list[CategoryRule]):
+        rules = sorted(rules, key=lambda rule: (-rule.priority, rule.id))
+        self.categories = [rule.category_id for rule in rules]
+        self.bounds = [
+            (None if rule.min_amount is None else to_minor(rule.min_amount),
+             None if rule.max_amount is None else to_minor(rule.max_amount))
+            for rule in rules
+        ]
+        keywords: dict[str, list[int]] = {}
+        self.regexes: list[tuple[int, re.Pattern]] = []
+        self.amount_ranks: list[int] = []
+        for rank, rule in enumerate(rules):
+            if rule.kind == RuleKind.keyword:
+                keywords.setdefault(normalize_description(rule.pattern), []).append(rank)
+            elif rule.kind == RuleKind.regex:
+                try:
+                    self.regexes.append((rank, compile_rule_regex(rule.pattern)))
+                except ValueError:
+                    continue
+            else:
+                self.amount_ranks.append(rank)
+        self.keyword_ranks = list(keywords.values())
+        self.automaton = AhoCorasick(keywords)
+
+    def in_range(self, rank: int, minor: int) -> bool:
+        low, high = self.bounds[rank]
+        return (low is None or minor >= low) and (high is None or minor <= high)
+
+    def match(self, description: str | None, amount: Decimal) -> int | None:
+        minor = to_minor(amount)
+        best = None
+        for index in self.automaton.find(normalize_description(description)):
+            for rank in self.keyword_ranks[index]:
+                if (best is None or rank < best) and self.in_range(rank, minor):
+                    best = rank
+        for rank in self.amount_ranks:
+            if best is not None and rank >= best:
+                break
+            if self.in_range(rank, minor):
+                best = rank
+                break
+        text = (description or "")[:REGEX_MAX_INPUT]
+        for rank, regex in self.regexes:
+            if best is not None and rank >= best:
+                break
+            if self.in_range(rank, minor) and regex.search(text):
+                best = rank
+                break
+        return None if best is None else self.categories[best]
+
+
+rule_matchers = TTLCache(maxsize=1024, ttl=CATEGORY_RULES_CACHE_TTL)
+
+
+async def get_rule_matcher(session: AsyncSessionDep, user_id: UUID) -> RuleMatcher:
+    matcher = rule_matchers.get(user_id)
+    if matcher is None:
+        rules = (await session.exec(select(CategoryRule).where(CategoryRule.user_id == user_id))).all()
+        matcher = RuleMatcher(list(rules))
+        rule_matchers.set(user_id, matcher)
+    return matcher
+
+
+async def list_rules(session: AsyncSessionDep, user_id: UUID) -> list[CategoryRuleResponse]:
+    rules = (await session.exec(
+        select(CategoryRule).where(CategoryRule.user_id == user_id)
+        .order_by(CategoryRule.priority.desc(), CategoryRule.id))).all()
+    return [CategoryRuleResponse.model_validate(rule) for rule in rules]
+
+
+async def create_rule(session: AsyncSessionDep, user_id: UUID, rule: CategoryRuleCreate) -> CategoryRuleResponse:
+    category = (await session.exec(select(Categories.id).where(
+        Categories.id == rule.category_id, Categories.user_id == user_id))).first()
+    if category is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Category not found")
+    db_rule = CategoryRule(**rule.model_dump(exclude={"kind"}), kind=rule.kind.value, user_id=user_id)
+    session.add(db_rule)
+    await session.commit()
+    await session.refresh(db_rule)
+    rule_matchers.pop(user_id)
+    return CategoryRuleResponse.model_validate(db_rule)
+
+
+async def delete_rule(session: AsyncSessionDep, user_id: UUID, rule_id: int) -> None:
+    db_rule = (await session.exec(select(CategoryRule).where(
+        CategoryRule.id == rule_id, CategoryRule.user_id == user_id))).first()
+    if db_rule is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Rule not found")
+    await session.delete(db_rule)
+    await session.commit()
+    rule_matchers.pop(user_id)
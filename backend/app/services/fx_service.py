@@ -0,0 +1,185 @@
+import csv
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from os import getenv
+from time import monotonic
+from typing import Iterable
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import BigInteger, func, type_coerce
+from sqlmodel import select
+from ..db.models import FxRate, Transactions, User
+from ..db.session import AsyncSessionDep
+from ..db.upsert import insert_for
+from ..schemas.report_schema import ConvertedMonthlySpend
+from ..utils.money import from_minor, to_minor
+from .report_service import month_start
+
+# Segundos que la tabla de cotizaciones se sirve desde memoria antes de recargarse
+FX_CACHE_TTL = float(getenv("FX_CACHE_TTL", "3600"))
+# Cada cuánto se compara la versión de la tabla para ver importaciones de otros procesos (el job)
+FX_CACHE_CHECK_INTERVAL = float(getenv("FX_CACHE_CHECK_INTERVAL", "30"))
+# Moneda puente para pares sin cotización directa ni inversa
+FX_PIVOT_CURRENCY = getenv("FX_PIVOT_CURRENCY", "USD")
+
+
+class FxRateCache:
+    """Historial de cotizaciones en memoria, por par y ordenado por fecha
+
+    Cada consulta es una búsqueda binaria sobre las fechas del par: se usa la
+    última cotización publicada en o antes de la fecha pedida. Cada
+    check_interval se compara (cantidad de filas, max(updated_at)) con la versión
+    cargada, así una importación hecha por otro proceso se ve sin esperar al TTL.
+    """
+
+    def __init__(self, ttl: float = FX_CACHE_TTL, check_interval: float = FX_CACHE_CHECK_INTERVAL):
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.pairs: dict[tuple[str, str], tuple[list[date], list[float]]] = {}
+        self.version: tuple | None = None
+        self.loaded_at: float | None = None
+        self.checked_at: float | None = None
+
+    def is_stale(self) -> bool:
+        return self.loaded_at is None or monotonic() - self.loaded_at >= self.ttl
+
+    def needs_check(self) -> bool:
+        return self.checked_at is None or monotonic() - self.checked_at >= self.check_interval
+
+    def invalidate(self) -> None:
+        self.loaded_at = None
+
+    def load(self, rows: Iterable[tuple[str, str, date, float]], version: tuple | None = None) -> None:
+        """Reemplaza el historial; rows debe venir ordenado por (base, quote, fecha)"""
+        pairs: dict[tuple[str, str], tuple[list[date], list[float]]] = {}
+        for base, quote, rate_date, rate in rows:
+            dates, rates = pairs.setdefault((base, quote), ([], []))
+            dates.append(rate_date)
+            rates.append(rate)
+        self.pairs = pairs
+        self.version = version
+        self.loaded_at = self.checked_at = monotonic()
+
+    async def refresh(self, session: AsyncSessionDep) -> None:
+        if not self.is_stale() and not self.needs_check():
+            return
+        # La versión se lee antes que las filas: un cambio en el medio se detecta en el próximo chequeo
+        version = tuple((await session.exec(select(func.count(), func.max(FxRate.updated_at)))).one())
+        self.checked_at = monotonic()
+        if self.is_stale() or version != self.version:
+            rows = (await session.exec(
+                select(FxRate.base, FxRate.quote, FxRate.rate_date, FxRate.rate)
+                .order_by(FxRate.base, FxRate.quote, FxRate.rate_date))).all()
+            self.load(rows, version)
+
+    def _lookup(self, base: str, quote: str, on: date) -> float | None:
+        pair = self.pairs.get((base, quote))
+        if pair is not None:
+            index = bisect_right(pair[0], on) - 1
+            if index >= 0:
+                return pair[1][index]
+        pair = self.pairs.get((quote, base))
+        if pair is not None:
+            index = bisect_right(pair[0], on) - 1
+            if index >= 0:
+                return 1 / pair[1][index]
+        return None
+
+    def rate(self, base: str, quote: str, on: date) -> float:
+        if base == quote:
+            return 1.0
+        rate = self._lookup(base, quote, on)
+        if rate is None and FX_PIVOT_CURRENCY not in (base, quote):
+            to_pivot = self._lookup(base, FX_PIVOT_CURRENCY, on)
+            from_pivot = self._lookup(FX_PIVOT_CURRENCY, quote, on)
+            if to_pivot is not None and from_pivot is not None:
+                rate = to_pivot * from_pivot
+        if rate is None:
+            raise KeyError((base, quote, on))
+        return rate
+
+
+fx_rates = FxRateCache()
+
+
+def parse_rates_csv(lines: Iterable[str]) -> list[dict]:
+    """CSV con cabecera date,base,quote,rate"""
+    rows = []
+    for record in csv.DictReader(lines):
+        rows.append({
+            "rate_date": date.fromisoformat(record["date"].strip()),
+            "base": record["base"].strip().upper(),
+            "quote": record["quote"].strip().upper(),
+            "rate": float(record["rate"]),
+        })
+    return rows
+
+
+async def import_rates(session: AsyncSessionDep, rows: list[dict]) -> int:
+    """Inserta o corrige cotizaciones
+
+    La caché de este proceso se recarga ya; los demás la recargan en su próximo
+    chequeo de versión (FX_CACHE_CHECK_INTERVAL).
+    """
+    if rows:
+        statement = insert_for(session, FxRate).values(updated_at=func.current_timestamp())
+        await session.exec(statement.on_conflict_do_update(
+            index_elements=["base", "quote", "rate_date"],
+            set_={"rate": statement.excluded.rate, "updated_at": func.current_timestamp()},
+        ), params=rows)
+        await session.commit()
+    fx_rates.invalidate()
+    return len(rows)
+
+
+async def get_home_currency(session: AsyncSessionDep, user_id: UUID) -> str:
+    return (await session.exec(select(User.home_currency).where(User.id == user_id))).one()
+
+
+async def get_converted_monthly_spend(
+    session: AsyncSessionDep,
+    user_id: UUID,
+    date_from: date,
+    date_to: date,
+    currency: str | None = None,
+) -> list[ConvertedMonthlySpend]:
+    """Totales por mes y categoría convertidos a una moneda con la cotización de cada día
+
+    Las transacciones se leen en una consulta y cada una se convierte contra la caché;
+    la tasa de un mismo (moneda, día) se resuelve una sola vez por request.
+    """
+    currency = currency or await get_home_currency(session, user_id)
+    await fx_rates.refresh(session)
+    rows = (await session.exec(
+        select(
+            Transactions.trasaction_date,
+            Transactions.currency,
+            type_coerce(Transactions.amount, BigInteger),
+            Transactions.category_id,
+        ).where(
+            Transactions.user_id == user_id,
+            Transactions.trasaction_date >= datetime.combine(date_from, time()),
+            Transactions.trasaction_date < datetime.combine(date_to + timedelta(days=1), time()),
+        )
+    )).all()
+    rates: dict[tuple[str, date], Decimal] = {}
+    totals: dict[tuple[date, int], list[int]] = {}
+    for when, source, minor, category_id in rows:
+        day = when.date()
+        key = (source, day)
+        if key not in rates:
+            try:
+                rates[key] = Decimal(str(fx_rates.rate(source, currency, day)))
+            except KeyError:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"No FX rate for {source}/{currency} on {day.isoformat()}")
+        bucket = totals.setdefault((month_start(day), category_id), [0, 0])
+        bucket[0] += to_minor(from_minor(minor) * rates[key])
+        bucket[1] += 1
+    return [
+        ConvertedMonthlySpend(
+            month=month, category_id=category_id, currency=currency, total=from_minor(total), count=count)
+        for (month, category_id), (total, count) in sorted(totals.items())
+    ]
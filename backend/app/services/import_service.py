@@ -0,0 +1,325 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from os import getenv
+from typing import AsyncIterator
+from uuid import UUID
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import func, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..db.models import Categories, TransactionFingerprint, Transactions
+from ..db.upsert import insert_for
+from ..schemas.import_schema import ImportProgress, NearDuplicate
+from ..schemas.transaction_schema import BatchRowError, TransactionCreate
+from ..utils.cache import TTLCache
+from ..utils.dedupe import NearDuplicateIndex, fingerprint, normalize_description
+from ..utils.money import DEFAULT_CURRENCY, to_minor
+from ..utils.statement_parsing import StatementRecord, parse_statement_amount, parse_statement_date
+from .category_service import RuleMatcher, get_rule_matcher
+from .transaction_service import TransactionEffects, format_validation_error
+
+# Registros por lote: cada lote se deduplica, inserta y confirma por separado
+IMPORT_BATCH_SIZE = int(getenv("IMPORT_BATCH_SIZE", "1000"))
+IMPORT_MAX_REPORTED_ERRORS = 100
+IMPORT_PROGRESS_TTL = float(getenv("IMPORT_PROGRESS_TTL", "3600"))
+# Casi duplicados: mismo monto y moneda, fechas a lo sumo a N días y descripciones parecidas
+NEAR_DUPLICATE_WINDOW_DAYS = int(getenv("NEAR_DUPLICATE_WINDOW_DAYS", "2"))
+NEAR_DUPLICATE_THRESHOLD = float(getenv("NEAR_DUPLICATE_THRESHOLD", "0.6"))
+# Días distintos con contadores de huella abiertos a la vez: acota la memoria en extractos grandes
+FINGERPRINT_OPEN_DAYS = int(getenv("FINGERPRINT_OPEN_DAYS", "7"))
+
+# Último progreso de cada importación en curso, por (usuario, import_id), para consultarlo mientras corre
+import_progress = TTLCache(maxsize=1000, ttl=IMPORT_PROGRESS_TTL)
+
+# Nombres de columna habituales en extractos, normalizados a minúsculas
+FIELD_ALIASES = {
+    "date": ("date", "fecha", "transaction date", "posted date", "posting date", "fecha operacion"),
+    "amount": ("amount", "monto", "importe"),
+    "debit": ("debit", "debito", "débito", "withdrawal"),
+    "credit": ("credit", "credito", "crédito", "deposit"),
+    "description": ("description", "descripcion", "descripción", "concepto", "memo", "payee", "details"),
+    "currency": ("currency", "moneda"),
+    "category": ("category", "categoria", "categoría"),
+    "external_id": ("external_id", "fitid", "reference", "referencia", "transaction id"),
+    "account": ("account", "cuenta", "account number", "numero de cuenta", "acctid"),
+}
+
+
+@dataclass
+class ImportOptions:
+    category_id: int
+    currency: str = DEFAULT_CURRENCY
+    # Los bancos informan los gastos en negativo; se invierte el signo para que
+    # sumen positivo como el resto de las transacciones de la app
+    negate: bool = True
+    date_format: str | None = None
+    offset: int = 0
+    # Cuenta del extracto, para las huellas por FITID cuando el archivo no la trae
+    account: str | None = None
+
+
+@dataclass
+class ImportRow:
+    row: int
+    offset: int
+    transaction: TransactionCreate | None = None
+    fingerprint: str | None = None
+    errors: list[str] | None = None
+
+
+def pick(data: dict, field: str) -> str | None:
+    for alias in FIELD_ALIASES.get(field, (field,)):
+        if data.get(alias):
+            return data[alias]
+    return None
+
+
+def normalize_record(data: dict, options: ImportOptions) -> dict:
+    """Lleva un registro de CSV u OFX a los campos de TransactionCreate (sin categoría)"""
+    when = pick(data, "date")
+    if not when:
+        raise ValueError("date: missing")
+    amount = pick(data, "amount")
+    if amount is not None:
+        value = parse_statement_amount(amount)
+    else:
+        debit, credit = pick(data, "debit"), pick(data, "credit")
+        if debit is None and credit is None:
+            raise ValueError("amount: missing")
+        value = (parse_statement_amount(credit) if credit else Decimal(0)) - (
+            abs(parse_statement_amount(debit)) if debit else Decimal(0))
+    return {
+        "trasaction_date": parse_statement_date(when, options.date_format),
+        "amount": -value if options.negate else value,
+        "currency": (pick(data, "currency") or options.currency).upper(),
+        "description": pick(data, "description"),
+        "category": pick(data, "category"),
+        "external_id": pick(data, "external_id"),
+        "account": pick(data, "account") or options.account,
+    }
+
+
+class Categorizer:
+    """Asigna la categoría por nombre (columna del extracto), por las reglas del usuario o la por defecto"""
+
+    def __init__(self, default_category_id: int, names: dict[str, int], rules: RuleMatcher | None = None):
+        self.default_category_id = default_category_id
+        self.names = names
+        self.rules = rules
+
+    @classmethod
+    async def load(cls, session: AsyncSession, user_id: UUID, default_category_id: int) -> "Categorizer":
+        categories = (await session.exec(
+            select(Categories.id, Categories.name).where(Categories.user_id == user_id))).all()
+        names = {name.strip().lower(): category_id for category_id, name in categories}
+        if default_category_id not in names.values():
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Category not found")
+        return cls(default_category_id, names, await get_rule_matcher(session, user_id))
+
+    def categorize(self, record: dict) -> int:
+        name = record.get("category")
+        if name and name.strip().lower() in self.names:
+            return self.names[name.strip().lower()]
+        if self.rules is not None:
+            category_id = self.rules.match(record.get("description"), record["amount"])
+            if category_id is not None:
+                return category_id
+        return self.default_category_id
+
+
+class Fingerprinter:
+    """Huella de cada fila: el id del banco (FITID) si lo hay, si no (día, moneda, monto, descripción)
+
+    El FITID solo es único dentro de una cuenta, así que va junto a la cuenta; sin
+    cuenta conocida se suma el día para no confundir movimientos de cuentas distintas.
+    Filas idénticas en un mismo extracto son legítimas (dos cafés el mismo día),
+    así que se numeran por orden de aparición y reimportar el extracto reproduce
+    las mismas huellas. Por eso se calculan sobre el archivo completo, antes de
+    omitir lo ya confirmado al reanudar.
+
+    Los contadores se guardan por día y solo para los últimos open_days días vistos:
+    los extractos vienen ordenados por fecha, y un día ya cerrado que reaparece se
+    rechaza en lugar de reiniciar su numeración.
+    """
+
+    def __init__(self, open_days: int = FINGERPRINT_OPEN_DAYS):
+        self.open_days = open_days
+        self.seen: OrderedDict[date, dict[tuple, int]] = OrderedDict()
+        self.closed: set[date] = set()
+
+    def __call__(self, transaction: TransactionCreate, external_id: str | None, account: str | None = None) -> str:
+        day = transaction.trasaction_date.date()
+        if external_id:
+            if account:
+                return fingerprint("fitid", account, transaction.currency, external_id)
+            return fingerprint("fitid", day.isoformat(), transaction.currency, external_id)
+        counters = self.counters(day)
+        key = (day.isoformat(), transaction.currency,
+               to_minor(transaction.amount), normalize_description(transaction.description))
+        ordinal = counters.get(key, 0)
+        counters[key] = ordinal + 1
+        return fingerprint(*key, ordinal)
+
+    def counters(self, day: date) -> dict[tuple, int]:
+        if day in self.seen:
+            self.seen.move_to_end(day)
+            return self.seen[day]
+        if day in self.closed:
+            raise ValueError(f"date: rows for {day} are not together, sort the statement by date")
+        if len(self.seen) >= self.open_days:
+            closed, _ = self.seen.popitem(last=False)
+            self.closed.add(closed)
+        return self.seen.setdefault(day, {})
+
+
+async def insert_new(session: AsyncSession, user_id: UUID, items: list[ImportRow]) -> list[ImportRow]:
+    """Inserta las filas cuya huella no existe todavía y devuelve las insertadas
+
+    Las huellas se reclaman primero en TransactionFingerprint, con clave (user_id,
+    fingerprint): el duplicado se resuelve con una consulta al índice por fila, sin
+    recorrer el historial del usuario, y solo se insertan las transacciones reclamadas.
+    """
+    unique = {}
+    for item in items:
+        unique.setdefault(item.fingerprint, item)
+    statement = insert_for(session, TransactionFingerprint).on_conflict_do_nothing(
+        index_elements=["user_id", "fingerprint"]).returning(TransactionFingerprint.fingerprint)
+    claimed = set((await session.exec(statement, params=[
+        {"user_id": user_id, "fingerprint": key} for key in unique
+    ])).scalars())
+    inserted = [item for item in unique.values() if item.fingerprint in claimed]
+    if inserted:
+        await session.exec(insert(Transactions), params=[
+            {**item.transaction.model_dump(), "user_id": user_id, "fingerprint": item.fingerprint}
+            for item in inserted
+        ])
+    return inserted
+
+
+async def find_near_duplicates(
+    session: AsyncSession, user_id: UUID, watermark: int, items: list[ImportRow]
+) -> list[NearDuplicate]:
+    """Compara las filas recién insertadas con las transacciones previas a la importación
+
+    Las filas del lote van a un índice en memoria y cada candidata de la base (mismo
+    monto, fechas dentro de la ventana) se prueba contra él.
+    """
+    index = NearDuplicateIndex(NEAR_DUPLICATE_WINDOW_DAYS, NEAR_DUPLICATE_THRESHOLD)
+    for item in items:
+        transaction = item.transaction
+        index.add(item.row, transaction.currency, to_minor(transaction.amount),
+                  transaction.trasaction_date.date(), transaction.description)
+    days = [item.transaction.trasaction_date.date() for item in items]
+    window = timedelta(days=NEAR_DUPLICATE_WINDOW_DAYS)
+    candidates = (await session.exec(
+        select(Transactions.id, Transactions.currency, Transactions.amount,
+               Transactions.trasaction_date, Transactions.description)
+        .where(
+            Transactions.user_id == user_id,
+            Transactions.id <= watermark,
+            Transactions.trasaction_date >= datetime.combine(min(days) - window, time.min),
+            Transactions.trasaction_date < datetime.combine(max(days) + window + timedelta(days=1), time.min),
+            Transactions.amount.in_({item.transaction.amount for item in items}),
+        )
+    )).all()
+    matches = []
+    for transaction_id, currency, amount, when, description in candidates:
+        for row, score in index.match(currency, to_minor(amount), when.date(), description):
+            matches.append(NearDuplicate(row=row, transaction_id=transaction_id, similarity=round(score, 2)))
+    return sorted(matches, key=lambda match: (match.row, -match.similarity))
+
+
+async def skip_to_offset(rows: AsyncIterator[ImportRow], offset: int) -> AsyncIterator[ImportRow]:
+    """Omite las filas ya confirmadas en una importación anterior"""
+    async for row in rows:
+        if row.offset > offset:
+            yield row
+
+
+async def normalize_records(
+    records: AsyncIterator[StatementRecord], options: ImportOptions, categorizer: Categorizer
+) -> AsyncIterator[ImportRow]:
+    fingerprinter = Fingerprinter()
+    async for row, offset, data, error in records:
+        if error is not None:
+            yield ImportRow(row, offset, errors=[error])
+            continue
+        try:
+            record = normalize_record(data, options)
+            record["category_id"] = categorizer.categorize(record)
+            transaction = TransactionCreate.model_validate(record)
+            item = ImportRow(row, offset, transaction=transaction,
+                             fingerprint=fingerprinter(transaction, record["external_id"], record["account"]))
+        except ValidationError as e:
+            item = ImportRow(row, offset, errors=format_validation_error(e))
+        except ValueError as e:
+            item = ImportRow(row, offset, errors=[str(e)])
+        yield item
+
+
+async def batched(rows: AsyncIterator[ImportRow], size: int) -> AsyncIterator[list[ImportRow]]:
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def import_statement(
+    session_factory: async_sessionmaker[AsyncSession],
+    user_id: UUID,
+    records: AsyncIterator[StatementRecord],
+    options: ImportOptions,
+    categorizer: Categorizer,
+    import_id: str | None = None,
+) -> AsyncIterator[ImportProgress]:
+    """Pipeline parse → normalize → categorize → dedupe → insert, un progreso por lote
+
+    Cada lote se confirma por separado y el progreso informa el offset confirmado:
+    si la importación se corta, se reanuda desde ese offset sin duplicar filas.
+    Los duplicados exactos (misma huella) se omiten; los casi duplicados se
+    insertan y se informan para revisarlos.
+    """
+    progress = ImportProgress(offset=options.offset)
+    rows = skip_to_offset(normalize_records(records, options, categorizer), options.offset)
+    async with session_factory() as session:
+        # Solo se buscan casi duplicados entre lo que existía antes de empezar
+        watermark = (await session.exec(select(func.coalesce(func.max(Transactions.id), 0)))).one()
+        async for batch in batched(rows, IMPORT_BATCH_SIZE):
+            valid = [item for item in batch if item.transaction is not None]
+            for item in batch:
+                if item.errors is not None:
+                    progress.failed += 1
+                    if len(progress.errors) < IMPORT_MAX_REPORTED_ERRORS:
+                        progress.errors.append(BatchRowError(row=item.row, errors=item.errors))
+            inserted = await insert_new(session, user_id, valid) if valid else []
+            if inserted:
+                effects = TransactionEffects(user_id)
+                for item in inserted:
+                    effects.add(item.transaction)
+                await effects.apply(session)
+                near_duplicates = await find_near_duplicates(session, user_id, watermark, inserted)
+                progress.near_duplicates += len({match.row for match in near_duplicates})
+                room = IMPORT_MAX_REPORTED_ERRORS - len(progress.near_duplicate_matches)
+                progress.near_duplicate_matches.extend(near_duplicates[:max(room, 0)])
+            await session.commit()
+            progress.rows += len(batch)
+            progress.inserted += len(inserted)
+            progress.duplicates += len(valid) - len(inserted)
+            progress.offset = batch[-1].offset
+            snapshot = progress.model_copy(update={"errors": [], "near_duplicate_matches": []})
+            if import_id is not None:
+                import_progress.set((user_id, import_id), snapshot)
+            yield snapshot
+    progress.done = True
+    if import_id is not None:
+        import_progress.set((user_id, import_id), progress)
+    yield progress
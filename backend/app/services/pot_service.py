@@ -0,0 +1,123 @@
+from decimal import Decimal
+from itertools import accumulate, groupby
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import insert, update
+from sqlmodel import select
+from ..db.models import PotContribution, SavingPots
+from ..db.session import AsyncSessionDep
+from ..schemas.pot_schema import (
+    BatchContribution, BatchContributionResult, ContributionCreate, ContributionResponse,
+    PotBalance, PotCreate, PotResponse)
+
+
+async def get_pot(session: AsyncSessionDep, user_id: UUID, pot_id: int) -> SavingPots:
+    pot = (await session.exec(select(SavingPots).where(
+        SavingPots.id == pot_id, SavingPots.user_id == user_id))).first()
+    if not pot:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Saving pot not found")
+    return pot
+
+
+async def list_pots(session: AsyncSessionDep, user_id: UUID) -> list[PotResponse]:
+    pots = (await session.exec(
+        select(SavingPots).where(SavingPots.user_id == user_id).order_by(SavingPots.id))).all()
+    return [PotResponse.model_validate(pot) for pot in pots]
+
+
+async def create_pot(session: AsyncSessionDep, user_id: UUID, pot: PotCreate) -> PotResponse:
+    db_pot = SavingPots(**pot.model_dump(), user_id=user_id)
+    session.add(db_pot)
+    await session.commit()
+    await session.refresh(db_pot)
+    return PotResponse.model_validate(db_pot)
+
+
+async def apply_delta(
+    session: AsyncSessionDep, user_id: UUID, pot_id: int, delta: Decimal, low: Decimal | None = None
+) -> Decimal:
+    """Suma delta al saldo en un único UPDATE ... RETURNING, sin leer antes la fila
+
+    La condición sobre el saldo resultante impide dejar el pot en negativo aun con
+    retiros concurrentes; si no se actualiza ninguna fila se distingue 404 de 409.
+    low es la menor variación intermedia (por defecto delta): el saldo más low tampoco
+    puede quedar negativo.
+    """
+    low = delta if low is None else min(low, delta)
+    balance = (await session.exec(
+        update(SavingPots)
+        .where(
+            SavingPots.id == pot_id,
+            SavingPots.user_id == user_id,
+            SavingPots.current_amount + low >= 0,
+        )
+        .values(current_amount=SavingPots.current_amount + delta)
+        .returning(SavingPots.current_amount)
+    )).scalar_one_or_none()
+    if balance is None:
+        await get_pot(session, user_id, pot_id)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=f"Insufficient balance in saving pot {pot_id}")
+    return balance
+
+
+async def contribute(
+    session: AsyncSessionDep, user_id: UUID, pot_id: int, contribution: ContributionCreate
+) -> ContributionResponse:
+    balance = await apply_delta(session, user_id, pot_id, contribution.amount)
+    entry = PotContribution(
+        pot_id=pot_id, user_id=user_id, amount=contribution.amount, balance=balance, note=contribution.note)
+    session.add(entry)
+    await session.commit()
+    await session.refresh(entry)
+    return ContributionResponse.model_validate(entry)
+
+
+async def contribute_batch(
+    session: AsyncSessionDep, user_id: UUID, contributions: list[BatchContribution]
+) -> BatchContributionResult:
+    """Aplica todos los movimientos o ninguno: un UPDATE por pot con el delta agregado
+
+    Cada movimiento guarda el saldo corrido, así que ninguno puede quedar negativo:
+    el UPDATE exige que el saldo alcance para el punto más bajo de la secuencia.
+    Los pots se actualizan en orden de id para que dos lotes concurrentes tomen los
+    locks de fila en el mismo orden y no se bloqueen entre sí.
+    """
+    entries = []
+    balances = []
+    ordered = sorted(enumerate(contributions), key=lambda item: (item[1].pot_id, item[0]))
+    try:
+        for pot_id, group in groupby(ordered, key=lambda item: item[1].pot_id):
+            items = [contribution for _, contribution in group]
+            partial = list(accumulate(item.amount for item in items))
+            balance = await apply_delta(session, user_id, pot_id, partial[-1], low=min(partial))
+            balances.append(PotBalance(pot_id=pot_id, current_amount=balance))
+            # Saldo corrido de cada movimiento, reconstruido desde el saldo final
+            running = balance - partial[-1]
+            for item in items:
+                running += item.amount
+                entries.append({
+                    "pot_id": pot_id, "user_id": user_id, "amount": item.amount,
+                    "balance": running, "note": item.note,
+                })
+    except HTTPException:
+        await session.rollback()
+        raise
+    if entries:
+        await session.exec(insert(PotContribution), params=entries)
+    await session.commit()
+    return BatchContributionResult(applied=len(entries), balances=balances)
+
+
+async def list_contributions(
+    session: AsyncSessionDep, user_id: UUID, pot_id: int, limit: int, before: int | None = None
+) -> list[ContributionResponse]:
+    """Historial del pot del más reciente al más antiguo, paginado por id"""
+    await get_pot(session, user_id, pot_id)
+    query = select(PotContribution).where(
+        PotContribution.pot_id == pot_id).order_by(PotContribution.id.desc()).limit(limit)
+    if before is not None:
+        query = query.where(PotContribution.id < before)
+    entries = (await session.exec(query)).all()
+    return [ContributionResponse.model_validate(entry) for entry in entries]
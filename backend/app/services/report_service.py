@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+from sqlalchemy import delete, func, update
+from sqlmodel import select
+from ..db.models import MonthlySpend, Transactions
+from ..db.session import AsyncSessionDep
+from ..db.upsert import greatest, insert_for, least
+from ..schemas.report_schema import MonthlySpendResponse
+
+
+def month_start(value: date | datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+@dataclass
+class SpendBucket:
+    total: Decimal = Decimal(0)
+    count: int = 0
+    min_amount: Decimal | None = None
+    max_amount: Decimal | None = None
+
+    def add(self, amount: Decimal) -> None:
+        self.total += amount
+        self.count += 1
+        self.min_amount = amount if self.min_amount is None else min(self.min_amount, amount)
+        self.max_amount = amount if self.max_amount is None else max(self.max_amount, amount)
+
+
+class SpendDelta:
+    """Cambios pendientes sobre el acumulado mensual, agrupados por (categoría, mes, moneda)
+
+    Se alimenta con las transacciones agregadas y quitadas en una escritura y se
+    aplica con una sentencia por bucket, sin recorrer el historial del usuario.
+    """
+
+    def __init__(self, user_id: UUID):
+        self.user_id = user_id
+        self.added: dict[tuple[int, date, str], SpendBucket] = {}
+        self.removed: dict[tuple[int, date, str], SpendBucket] = {}
+
+    def add(self, category_id: int, when: datetime, currency: str, amount: Decimal) -> None:
+        self.added.setdefault((category_id, month_start(when), currency), SpendBucket()).add(amount)
+
+    def remove(self, category_id: int, when: datetime, currency: str, amount: Decimal) -> None:
+        self.removed.setdefault((category_id, month_start(when), currency), SpendBucket()).add(amount)
+
+    async def apply(self, session: AsyncSessionDep) -> None:
+        """Aplica los cambios en la transacción en curso; requiere las filas ya escritas"""
+        await session.flush()
+        # Orden fijo de buckets para que dos escrituras concurrentes no se bloqueen en cruz
+        for (category_id, month, currency), bucket in sorted(self.added.items()):
+            await upsert_bucket(session, self.user_id, category_id, month, currency, bucket)
+        for (category_id, month, currency), bucket in sorted(self.removed.items()):
+            await subtract_bucket(session, self.user_id, category_id, month, currency, bucket)
+        self.added.clear()
+        self.removed.clear()
+
+
+async def upsert_bucket(
+    session: AsyncSessionDep, user_id: UUID, category_id: int, month: date, currency: str, bucket: SpendBucket
+) -> None:
+    statement = insert_for(session, MonthlySpend).values(
+        user_id=user_id, category_id=category_id, month=month, currency=currency, total=bucket.total,
+        count=bucket.count, min_amount=bucket.min_amount, max_amount=bucket.max_amount,
+    )
+    excluded = statement.excluded
+    await session.exec(statement.on_conflict_do_update(
+        index_elements=["user_id", "category_id", "month", "currency"],
+        set_={
+            "total": MonthlySpend.total + excluded.total,
+            "count": MonthlySpend.count + excluded.count,
+            "min_amount": least(session, MonthlySpend.min_amount, excluded.min_amount),
+            "max_amount": greatest(session, MonthlySpend.max_amount, excluded.max_amount),
+        },
+    ))
+
+
+async def subtract_bucket(
+    session: AsyncSessionDep, user_id: UUID, category_id: int, month: date, currency: str, bucket: SpendBucket
+) -> None:
+    key = (
+        MonthlySpend.user_id == user_id,
+        MonthlySpend.category_id == category_id,
+        MonthlySpend.month == month,
+        MonthlySpend.currency == currency,
+    )
+    # Se bloquea la fila antes de leer transactions: un upsert_bucket concurrente del
+    # mismo bucket espera a este commit o ya confirmó y sus filas se ven (Postgres;
+    # SQLite serializa las escrituras de por sí)
+    await session.exec(select(MonthlySpend.count).where(*key).with_for_update())
+    # min y max no se pueden restar: se recalculan solo sobre el mes afectado
+    min_amount, max_amount = (await session.exec(
+        select(func.min(Transactions.amount), func.max(Transactions.amount)).where(
+            Transactions.user_id == user_id,
+            Transactions.category_id == category_id,
+            Transactions.currency == currency,
+            Transactions.trasaction_date >= datetime.combine(month, time()),
+            Transactions.trasaction_date < datetime.combine(next_month(month), time()),
+        )
+    )).one()
+    # total y count se descuentan en forma relativa y la fila solo se borra si quedó vacía
+    values = {"total": MonthlySpend.total - bucket.total, "count": MonthlySpend.count - bucket.count}
+    if min_amount is not None:
+        values.update(min_amount=min_amount, max_amount=max_amount)
+    await session.exec(update(MonthlySpend).where(*key).values(**values))
+    await session.exec(delete(MonthlySpend).where(*key, MonthlySpend.count <= 0))
+
+
+async def get_monthly_spend(
+    session: AsyncSessionDep,
+    user_id: UUID,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    category_id: int | None = None,
+    currency: str | None = None,
+) -> list[MonthlySpendResponse]:
+    query = select(MonthlySpend).where(MonthlySpend.user_id == user_id).order_by(
+        MonthlySpend.month, MonthlySpend.category_id, MonthlySpend.currency)
+    if date_from is not None:
+        query = query.where(MonthlySpend.month >= month_start(date_from))
+    if date_to is not None:
+        query = query.where(MonthlySpend.month <= month_start(date_to))
+    if category_id is not None:
+        query = query.where(MonthlySpend.category_id == category_id)
+    if currency is not None:
+        query = query.where(MonthlySpend.currency == currency)
+    rows = (await session.exec(query)).all()
+    return [MonthlySpendResponse.model_validate(row) for row in rows]
@@ -0,0 +1,300 @@
+import base64
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import AsyncIterator
+from uuid import UUID
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import delete, func, insert, literal_column, or_, text, tuple_
+from sqlalchemy.sql import column
+from sqlmodel import select
+from ..db.models import Budget, Categories, TransactionFingerprint, Transactions
+from ..db.search import (
+    SQLITE_FTS_TABLE, TS_CONFIG, TSVECTOR_EXPRESSION, UNACCENT_FUNCTION, search_terms, to_fts5_query, to_tsquery_text)
+from ..db.session import AsyncSessionDep
+from ..db.upsert import dialect_name
+from ..schemas.transaction_schema import (
+    BatchResult, BatchRowError, TransactionCreate, TransactionResponse, TransactionSearchPage, TransactionUpdate)
+from ..utils.batch_parsing import ParsedRow
+from .budget_service import BudgetConsumption
+from .report_service import SpendDelta
+
+# Filas por INSERT multi-fila y máximo de filas aceptadas por request
+BATCH_INSERT_SIZE = 1000
+BATCH_MAX_ROWS = 50_000
+# Un array JSON se parsea entero en memoria: su tamaño se acota en bytes antes de leerlo
+BATCH_MAX_JSON_BYTES = 32 * 1024 * 1024
+
+
+class TransactionEffects:
+    """Efectos derivados de escribir transacciones: acumulado mensual y consumo de presupuestos"""
+
+    def __init__(self, user_id: UUID):
+        self.spend = SpendDelta(user_id)
+        self.budgets = BudgetConsumption()
+
+    def add(self, transaction: Transactions | TransactionCreate) -> None:
+        self.spend.add(
+            transaction.category_id, transaction.trasaction_date, transaction.currency, transaction.amount)
+        self.budgets.add(transaction.budget_id, transaction.amount)
+
+    def remove(self, transaction: Transactions) -> None:
+        self.spend.remove(
+            transaction.category_id, transaction.trasaction_date, transaction.currency, transaction.amount)
+        self.budgets.remove(transaction.budget_id, transaction.amount)
+
+    async def apply(self, session: AsyncSessionDep) -> None:
+        await self.spend.apply(session)
+        await self.budgets.apply(session)
+
+
+async def get_transaction(session: AsyncSessionDep, user_id: UUID, transaction_id: int) -> Transactions:
+    db_transaction = (await session.exec(
+        select(Transactions).where(
+            Transactions.id == transaction_id, Transactions.user_id == user_id)
+    )).first()
+    if not db_transaction:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Transaction not found")
+    return db_transaction
+
+
+async def list_transactions(
+    session: AsyncSessionDep,
+    user_id: UUID,
+    limit: int,
+    after: int | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+) -> list[TransactionResponse]:
+    query = select(Transactions).where(
+        Transactions.user_id == user_id).order_by(Transactions.id).limit(limit)
+    if after is not None:
+        query = query.where(Transactions.id > after)
+    if date_from is not None:
+        query = query.where(Transactions.trasaction_date >= date_from)
+    if date_to is not None:
+        query = query.where(Transactions.trasaction_date < date_to)
+    transactions = (await session.exec(query)).all()
+    return [TransactionResponse.model_validate(transaction) for transaction in transactions]
+
+
+def encode_search_cursor(transaction: Transactions) -> str:
+    raw = f"{transaction.trasaction_date.isoformat()}|{transaction.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_search_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        when, transaction_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(when), int(transaction_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid cursor")
+
+
+def description_matches(session: AsyncSessionDep, query: str, terms: list[str], fuzzy: bool):
+    """Condición de búsqueda sobre la descripción, resuelta por el índice de texto del dialecto"""
+    if dialect_name(session) == "postgresql":
+        # Expresión y configuración literales para que coincidan con el índice GIN
+        condition = literal_column(TSVECTOR_EXPRESSION).op("@@")(
+            func.to_tsquery(literal_column(f"'{TS_CONFIG}'"),
+                            getattr(func, UNACCENT_FUNCTION)(to_tsquery_text(terms))))
+        if fuzzy:
+            # word_similarity sobre el índice de trigramas: tolera errores de tipeo en comercios
+            condition = or_(condition, Transactions.description.op("%>")(query))
+        return condition
+    condition = Transactions.id.in_(
+        text(f"SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH :fts_query")
+        .bindparams(fts_query=to_fts5_query(terms)).columns(column("rowid")))
+    if fuzzy:
+        condition = or_(condition, Transactions.description.icontains(query, autoescape=True))
+    return condition
+
+
+async def search_transactions(
+    session: AsyncSessionDep,
+    user_id: UUID,
+    query: str,
+    limit: int,
+    cursor: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    fuzzy: bool = False,
+) -> TransactionSearchPage:
+    """Transacciones cuya descripción contiene todos los términos (como prefijos), de la más reciente a la más antigua
+
+    Paginación por keyset sobre (fecha, id): cada página continúa desde la última
+    fila de la anterior sin OFFSET.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return TransactionSearchPage(items=[])
+    statement = select(Transactions).where(
+        Transactions.user_id == user_id,
+        description_matches(session, query, terms, fuzzy),
+    ).order_by(Transactions.trasaction_date.desc(), Transactions.id.desc()).limit(limit + 1)
+    if date_from is not None:
+        statement = statement.where(Transactions.trasaction_date >= date_from)
+    if date_to is not None:
+        statement = statement.where(Transactions.trasaction_date < date_to)
+    if cursor is not None:
+        statement = statement.where(
+            tuple_(Transactions.trasaction_date, Transactions.id) < decode_search_cursor(cursor))
+    transactions = (await session.exec(statement)).all()
+    page = transactions[:limit]
+    return TransactionSearchPage(
+        items=[TransactionResponse.model_validate(transaction) for transaction in page],
+        next_cursor=encode_search_cursor(page[-1]) if len(transactions) > limit else None,
+    )
+
+
+@dataclass(frozen=True)
+class BudgetScope:
+    """Lo que una transacción debe cumplir para imputarse a un presupuesto"""
+    category_id: int
+    currency: str
+    start_date: date
+    end_date: date
+
+
+async def get_owned_ids(session: AsyncSessionDep, user_id: UUID) -> tuple[set[int], dict[int, BudgetScope]]:
+    """Categorías y presupuestos (con su alcance) del usuario, para validar referencias sin una consulta por fila"""
+    category_ids = set((await session.exec(
+        select(Categories.id).where(Categories.user_id == user_id))).all())
+    budgets = (await session.exec(
+        select(Budget.id, Budget.category_id, Budget.currency, Budget.start_date, Budget.end_date)
+        .where(Budget.user_id == user_id))).all()
+    return category_ids, {budget_id: BudgetScope(*scope) for budget_id, *scope in budgets}
+
+
+def check_references(
+    transaction: TransactionCreate | TransactionUpdate, category_ids: set[int], budgets: dict[int, BudgetScope]
+) -> list[str]:
+    errors = []
+    if transaction.category_id is not None and transaction.category_id not in category_ids:
+        errors.append("category_id: Category not found")
+    if transaction.budget_id is not None:
+        budget = budgets.get(transaction.budget_id)
+        if budget is None:
+            errors.append("budget_id: Budget not found")
+            return errors
+        # Lo que queda fuera del alcance del presupuesto no puede sumar a su consumo
+        if transaction.currency is not None and transaction.currency != budget.currency:
+            errors.append("currency: Transaction currency does not match the budget")
+        if transaction.category_id is not None and transaction.category_id != budget.category_id:
+            errors.append("budget_id: Transaction category does not match the budget")
+        if transaction.trasaction_date is not None and not (
+                budget.start_date <= transaction.trasaction_date.date() <= budget.end_date):
+            errors.append("budget_id: Transaction date is outside the budget period")
+    return errors
+
+
+async def create_transaction(
+    session: AsyncSessionDep, user_id: UUID, transaction: TransactionCreate
+) -> TransactionResponse:
+    errors = check_references(transaction, *await get_owned_ids(session, user_id))
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+    db_transaction = Transactions(**transaction.model_dump(), user_id=user_id)
+    session.add(db_transaction)
+    effects = TransactionEffects(user_id)
+    effects.add(db_transaction)
+    await effects.apply(session)
+    await session.commit()
+    await session.refresh(db_transaction)
+    return TransactionResponse.model_validate(db_transaction)
+
+
+async def update_transaction(
+    session: AsyncSessionDep, user_id: UUID, transaction_id: int, transaction: TransactionUpdate
+) -> TransactionResponse:
+    db_transaction = await get_transaction(session, user_id, transaction_id)
+    updates = transaction.model_dump(exclude_unset=True)
+    # El presupuesto se valida contra la categoría, moneda y fecha resultantes de la edición
+    errors = check_references(transaction.model_copy(update={
+        field: updates.get(field, getattr(db_transaction, field))
+        for field in ("category_id", "budget_id", "currency", "trasaction_date")
+    }), *await get_owned_ids(session, user_id))
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+    effects = TransactionEffects(user_id)
+    effects.remove(db_transaction)
+    for key, value in updates.items():
+        setattr(db_transaction, key, value)
+    effects.add(db_transaction)
+    session.add(db_transaction)
+    await effects.apply(session)
+    await session.commit()
+    await session.refresh(db_transaction)
+    return TransactionResponse.model_validate(db_transaction)
+
+
+async def delete_transaction(session: AsyncSessionDep, user_id: UUID, transaction_id: int):
+    db_transaction = await get_transaction(session, user_id, transaction_id)
+    effects = TransactionEffects(user_id)
+    effects.remove(db_transaction)
+    if db_transaction.fingerprint is not None:
+        # Libera la huella: reimportar el extracto vuelve a traer el movimiento borrado
+        await session.exec(delete(TransactionFingerprint).where(
+            TransactionFingerprint.user_id == user_id,
+            TransactionFingerprint.fingerprint == db_transaction.fingerprint))
+    await session.delete(db_transaction)
+    await effects.apply(session)
+    await session.commit()
+
+
+def format_validation_error(error: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    ]
+
+
+async def insert_transactions(session: AsyncSessionDep, rows: list[dict]) -> None:
+    # executemany sobre un INSERT: SQLAlchemy lo agrupa en sentencias multi-fila
+    await session.exec(insert(Transactions), params=rows)
+
+
+async def ingest_batch(
+    session: AsyncSessionDep, user_id: UUID, rows: AsyncIterator[ParsedRow]
+) -> BatchResult:
+    """Valida e inserta filas por lotes en una sola transacción, reportando errores por fila"""
+    category_ids, budgets = await get_owned_ids(session, user_id)
+    received = inserted = 0
+    errors: list[BatchRowError] = []
+    pending: list[dict] = []
+    effects = TransactionEffects(user_id)
+    async for row, data, error in rows:
+        received += 1
+        if received > BATCH_MAX_ROWS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Batch exceeds {BATCH_MAX_ROWS} rows")
+        if error is not None:
+            errors.append(BatchRowError(row=row, errors=[error]))
+            continue
+        try:
+            transaction = TransactionCreate.model_validate(data)
+        except ValidationError as e:
+            errors.append(BatchRowError(row=row, errors=format_validation_error(e)))
+            continue
+        reference_errors = check_references(transaction, category_ids, budgets)
+        if reference_errors:
+            errors.append(BatchRowError(row=row, errors=reference_errors))
+            continue
+        pending.append({**transaction.model_dump(), "user_id": user_id})
+        effects.add(transaction)
+        if len(pending) >= BATCH_INSERT_SIZE:
+            await insert_transactions(session, pending)
+            inserted += len(pending)
+            pending = []
+    if pending:
+        await insert_transactions(session, pending)
+        inserted += len(pending)
+    await effects.apply(session)
+    await session.commit()
+    return BatchResult(
+        received=received, inserted=inserted, failed=len(errors), errors=errors)
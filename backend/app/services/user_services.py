@@ -1,72 +1,98 @@
+from typing import AsyncIterator
+from uuid import UUID
 from fastapi import HTTPException, status
 from sqlmodel import select
 from sqlalchemy.exc import SQLAlchemyError
-from ..utils.auth import get_password_hash
-from ..db.session import SessionDep
+from ..utils.auth import get_password_hash_async
+from ..db.session import AsyncSessionDep, SessionFactoryDep
 from ..schemas.user_schema import UserCreate, UserResponse, UserUpdate
 from ..db.models import User
+from ..auth.user_cache import invalidate_user
 
 
-def get_all_users(session: SessionDep) -> list[UserResponse]:
+async def get_all_users(
+    session: AsyncSessionDep, limit: int, after: UUID | None = None
+) -> list[UserResponse]:
+    """Página de usuarios ordenada por id, continuando después del cursor 'after'"""
     try:
-        users = session.exec(select(User)).all()
+        query = select(User).order_by(User.id).limit(limit)
+        if after is not None:
+            query = query.where(User.id > after)
+        users = (await session.exec(query)).all()
         return [UserResponse.model_validate(user) for user in users]
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)) from e
 
 
-def get_user_by_id(user_id: str, session: SessionDep) -> UserResponse:
-    db_user = session.exec(select(User).where(User.id == user_id)).first()
+async def stream_users_ndjson(
+    session_factory: SessionFactoryDep, batch_size: int
+) -> AsyncIterator[bytes]:
+    """Exporta todos los usuarios como NDJSON leyendo por lotes con un cursor del servidor"""
+    async with session_factory() as session:
+        result = await session.stream_scalars(
+            select(User).order_by(User.id).execution_options(yield_per=batch_size))
+        async for users in result.partitions():
+            yield b"".join(
+                UserResponse.model_validate(user).model_dump_json().encode() + b"\n"
+                for user in users
+            )
+
+
+async def get_user_by_id(user_id: str, session: AsyncSessionDep) -> UserResponse:
+    db_user = (await session.exec(select(User).where(User.id == user_id))).first()
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return UserResponse.model_validate(db_user)
 
 
-def create_user(user_data: UserCreate, session: SessionDep) -> UserResponse:
+async def create_user(user_data: UserCreate, session: AsyncSessionDep) -> UserResponse:
     db_user = User.model_validate(user_data.model_dump())
-    db_user.password = get_password_hash(db_user.password)
-    if session.exec(select(User).where(User.email == db_user.email)).first():
+    if (await session.exec(select(User).where(User.email == db_user.email))).first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
-    if session.exec(select(User).where(User.username == db_user.username)).first():
+    if (await session.exec(select(User).where(User.username == db_user.username))).first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Username already exists")
     if db_user.age < 18:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Age must be a positive number")
+    db_user.password = await get_password_hash_async(db_user.password)
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    await session.commit()
+    await session.refresh(db_user)
     return db_user
 
 
-def update_user(user_id: str, user: UserUpdate, session: SessionDep):
-    db_user = session.exec(select(User).where(User.id == user_id)).first()
+async def update_user(user_id: str, user: UserUpdate, session: AsyncSessionDep):
+    db_user = (await session.exec(select(User).where(User.id == user_id))).first()
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    previous_username = db_user.username
     user_data_dict = user.model_dump(exclude_unset=True)
     for key, value in user_data_dict.items():
         if key == "password":
-            hashed_password = get_password_hash(value)
+            hashed_password = await get_password_hash_async(value)
             setattr(db_user, key, hashed_password)
-        if key == "age" and value < 18:
+        elif key == "age" and value < 18:
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Age must be a positive number")
         else:
             setattr(db_user, key, value)
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    await session.commit()
+    await session.refresh(db_user)
+    invalidate_user(db_user.id, previous_username, db_user.username)
     return db_user
 
 
-def delete_user(user_id: str, session: SessionDep):
-    db_user = session.exec(select(User).where(User.id == user_id)).first()
+async def delete_user(user_id: str, session: AsyncSessionDep):
+    db_user = (await session.exec(select(User).where(User.id == user_id))).first()
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    session.delete(db_user)
-    session.commit()
+    await session.delete(db_user)
+    await session.commit()
+    invalidate_user(db_user.id, db_user.username)
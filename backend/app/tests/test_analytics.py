@@ -0,0 +1,67 @@
+from datetime import date
+import numpy as np
+from app.db.models import Categories
+from app.services.analytics_service import rolling_mean, sum_by_index, summarize
+
+
+def test_rolling_mean_uses_partial_windows():
+    assert rolling_mean(np.array([2.0, 4.0, 6.0, 8.0]), 2).tolist() == [2.0, 3.0, 5.0, 7.0]
+
+
+def test_sum_by_index_stays_integer():
+    # Por encima de 2**53 un float64 ya no distingue unidades
+    amounts = np.array([2 ** 53, 1, 1], dtype=np.int64)
+    totals = sum_by_index(np.array([0, 0, 1]), amounts, 3)
+
+    assert totals.dtype == np.int64
+    assert totals.tolist() == [2 ** 53 + 1, 1, 0]
+
+
+def test_summarize_metrics():
+    dates = np.array(["2024-01-10", "2024-01-20", "2024-02-05", "2024-03-01"], dtype="datetime64[D]")
+    amounts = np.array([1000, 3000, 6000, 8000])
+    categories = np.array([1, 2, 1, 1])
+
+    summary = summarize(dates, amounts, categories, date(2024, 1, 1), date(2024, 3, 31), horizon=2)
+
+    assert (summary.total, summary.count, len(summary.daily)) == (180, 4, 91)
+    assert [(c.category_id, c.total) for c in summary.categories] == [(1, 150), (2, 30)]
+    assert [m.total for m in summary.months] == [40, 60, 80]
+    assert summary.months[0].delta is None
+    assert (summary.months[1].delta, summary.months[1].delta_pct) == (20, 0.5)
+    assert [f.month for f in summary.forecast] == [date(2024, 4, 1), date(2024, 5, 1)]
+    assert [round(f.total, 6) for f in summary.forecast] == [100, 120]
+
+
+def test_summary_endpoint(client, auth_headers, session, test_user, test_category):
+    other = Categories(user_id=test_user.id, name="Transport")
+    session.add(other)
+    session.commit()
+    rows = [
+        {"category_id": test_category.id, "amount": 30, "trasaction_date": "2024-01-15T08:00:00"},
+        {"category_id": other.id, "amount": 10, "trasaction_date": "2024-02-15T08:00:00"},
+        {"category_id": test_category.id, "amount": 60, "trasaction_date": "2024-03-31T23:00:00"},
+        {"category_id": test_category.id, "amount": 99, "trasaction_date": "2024-04-01T00:00:00"},
+    ]
+    client.post("/transactions/batch", json=rows, headers=auth_headers)
+
+    response = client.get("/analytics/summary", headers=auth_headers, params={
+        "date_from": "2024-01-01", "date_to": "2024-03-31"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["total"], data["count"]) == (100, 3)
+    assert {c["category_id"]: c["share"] for c in data["categories"]} == {
+        test_category.id: 0.9, other.id: 0.1}
+    assert [m["total"] for m in data["months"]] == [30, 10, 60]
+    assert len(data["forecast"]) == 3
+
+
+def test_summary_empty_and_invalid_range(client, auth_headers):
+    response = client.get("/analytics/summary", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["total"] == 0
+
+    response = client.get("/analytics/summary", headers=auth_headers, params={
+        "date_from": "2024-03-01", "date_to": "2024-01-01"})
+    assert response.status_code == 422
@@ -0,0 +1,112 @@
+from datetime import timedelta
+import jwt
+import pytest
+from app.auth.jwt_manager import create_access_token, decode_token, token_cache
+from app.auth.user_cache import user_cache
+from app.db.models import User
+from app.services import auth_service
+from app.utils.auth import get_password_hash
+from app.utils.cache import TTLCache
+
+
+@pytest.fixture
+def stateless_auth(monkeypatch):
+    monkeypatch.setattr(auth_service, "AUTH_MODE", "stateless")
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+@pytest.fixture
+def auth_headers(client, session):
+    user = User(
+        username="cached",
+        email="cached@example.com",
+        password=get_password_hash("testpassword"),
+        first_name="Cached",
+        last_name="User",
+        age=30,
+    )
+    session.add(user)
+    session.commit()
+    response = client.post(
+        "/auth/login",
+        data={"username": "cached", "password": "testpassword", "scope": "me"},
+    )
+    return user, {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_stateless_auth_serves_from_cache(client, stateless_auth, auth_headers):
+    _, headers = auth_headers
+
+    assert client.get("/auth/users/me/", headers=headers).status_code == 200
+    hits = user_cache.hits
+    response = client.get("/auth/users/me/", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["username"] == "cached"
+    assert user_cache.hits == hits + 1
+
+
+def test_update_user_invalidates_cache(client, stateless_auth, auth_headers):
+    user, headers = auth_headers
+    assert client.get("/auth/users/me/", headers=headers).status_code == 200
+
+    client.patch(f"/users/{user.id}", json={"username": "renamed"})
+
+    assert client.get("/auth/users/me/", headers=headers).status_code == 401
+
+
+def test_delete_user_invalidates_cache(client, stateless_auth, auth_headers):
+    user, headers = auth_headers
+    assert client.get("/auth/users/me/", headers=headers).status_code == 200
+
+    client.delete(f"/users/{user.id}")
+
+    assert client.get("/auth/users/me/", headers=headers).status_code == 401
+
+
+def test_ttl_cache_expiry_and_eviction(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.utils.cache.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=5)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    now[0] += 10
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 2
+
+
+def test_decode_token_is_cached():
+    token = create_access_token({"sub": "cached", "scopes": ["me"]})
+    misses = token_cache.misses
+
+    first = decode_token(token)
+    first["sub"] = "mutated"
+    second = decode_token(token)
+
+    assert second["sub"] == "cached"
+    assert token_cache.misses == misses + 1
+    assert token_cache.hits >= 1
+
+
+def test_decode_token_rejects_invalid_tokens():
+    expired = create_access_token({"sub": "cached"}, expires_delta=timedelta(seconds=-1))
+    tampered = create_access_token({"sub": "cached"})[:-2] + "xx"
+
+    with pytest.raises(jwt.ExpiredSignatureError):
+        decode_token(expired)
+    with pytest.raises(jwt.InvalidTokenError):
+        decode_token(tampered)
+
+
+def test_auth_cache_stats(client, internal_headers):
+    response = client.get("/internal/auth-cache", headers=internal_headers)
+
+    assert response.status_code == 200
+    assert set(response.json()) == {"token_cache", "user_cache"}
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import date, timedelta
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.models import BillOccurrence, RecurringBills
+from app.services import bill_scheduler
+from app.services.bill_service import next_occurrence
+
+
+def test_next_occurrence_keeps_anchor_day():
+    bill = RecurringBills(starts_on=date(2024, 1, 31), interval_unit="month", interval_count=1)
+    february = next_occurrence(bill, date(2024, 1, 31))
+    assert february == date(2024, 2, 29)
+    assert next_occurrence(bill, february) == date(2024, 3, 31)
+
+    weekly = RecurringBills(starts_on=date(2024, 1, 1), interval_unit="week", interval_count=2)
+    assert next_occurrence(weekly, date(2024, 1, 1)) == date(2024, 1, 15)
+
+
+def test_create_bill_and_due_soon(client, auth_headers):
+    today = date.today()
+    response = client.post("/bills/", headers=auth_headers, json={
+        "name": "Gym", "amount": 20, "starts_on": today.isoformat(),
+        "interval_unit": "week", "interval_count": 1,
+    })
+    assert response.status_code == 201
+    assert date.fromisoformat(response.json()["next_due_at"]) > today
+
+    due = client.get("/bills/due", headers=auth_headers, params={"days": 7}).json()
+    assert [item["due_on"] for item in due] == [today.isoformat(), (today + timedelta(days=7)).isoformat()]
+    assert due[0]["name"] == "Gym"
+
+    paid = client.post(f"/bills/occurrences/{due[0]['id']}/pay", headers=auth_headers)
+    assert paid.json()["is_paid"] is True
+    due = client.get("/bills/due", headers=auth_headers, params={"days": 7}).json()
+    assert len(due) == 1
+
+
+def test_invalid_interval_unit(client, auth_headers):
+    response = client.post("/bills/", headers=auth_headers, json={
+        "name": "Rent", "amount": 500, "starts_on": "2024-01-01", "interval_unit": "fortnight",
+    })
+    assert response.status_code == 422
+
+
+def test_scheduler_tick_materializes_in_batches(session, async_engine, test_user, monkeypatch):
+    monkeypatch.setattr(bill_scheduler, "BILL_SCHEDULER_BATCH_SIZE", 2)
+    today = date(2024, 6, 1)
+    for name in ("a", "b", "c"):
+        session.add(RecurringBills(
+            user_id=test_user.id, name=name, amount=10, starts_on=date(2024, 5, 20),
+            interval_unit="month", next_due_at=date(2024, 5, 20)))
+    session.commit()
+    factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    assert asyncio.run(bill_scheduler.run_tick(factory, today)) == 2
+    assert asyncio.run(bill_scheduler.run_tick(factory, today)) == 1
+    assert asyncio.run(bill_scheduler.run_tick(factory, today)) == 0
+
+    session.expire_all()
+    occurrences = session.exec(select(BillOccurrence)).all()
+    # Horizonte de 60 días desde el 1/6: vencimientos 20/5, 20/6 y 20/7 por factura
+    assert len(occurrences) == 9
+    bills = session.exec(select(RecurringBills)).all()
+    assert {bill.next_due_at for bill in bills} == {date(2024, 8, 20)}
+
+
+def test_delete_bill(client, auth_headers):
+    bill = client.post("/bills/", headers=auth_headers, json={
+        "name": "Rent", "amount": 500, "starts_on": date.today().isoformat()}).json()
+    assert client.delete(f"/bills/{bill['id']}", headers=auth_headers).status_code == 204
+    assert client.get("/bills/due", headers=auth_headers).json() == []
+    assert client.delete(f"/bills/{bill['id']}", headers=auth_headers).status_code == 404
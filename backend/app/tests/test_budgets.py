@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+from app.db.models import Budget, Categories
+
+# Dentro de la ventana de make_budget
+TODAY = f"{date.today()}T10:00:00"
+
+
+def make_budget(session, user, category, amount=100, start=None, end=None):
+    today = date.today()
+    budget = Budget(
+        user_id=user.id, category_id=category.id, amount=amount,
+        start_date=start or today - timedelta(days=10), end_date=end or today + timedelta(days=10))
+    session.add(budget)
+    session.commit()
+    session.refresh(budget)
+    return budget
+
+
+def post_transaction(client, headers, category_id, budget_id, amount):
+    response = client.post("/transactions/", headers=headers, json={
+        "category_id": category_id, "budget_id": budget_id, "amount": amount,
+        "trasaction_date": TODAY,
+    })
+    return response.json()["id"]
+
+
+def test_create_budget(client, auth_headers, test_category):
+    response = client.post("/budgets/", headers=auth_headers, json={
+        "category_id": test_category.id, "amount": 250,
+        "start_date": "2024-11-01", "end_date": "2024-11-30",
+    })
+    assert response.status_code == 201
+    assert response.json()["consumed_amount"] == "0.00"
+
+    response = client.post("/budgets/", headers=auth_headers, json={
+        "category_id": test_category.id, "amount": 250,
+        "start_date": "2024-11-30", "end_date": "2024-11-01",
+    })
+    assert response.status_code == 422
+
+
+def test_status_tracks_linked_transactions(client, auth_headers, session, test_user, test_category):
+    budget = make_budget(session, test_user, test_category)
+    first = post_transaction(client, auth_headers, test_category.id, budget.id, 60)
+    second = post_transaction(client, auth_headers, test_category.id, budget.id, 30)
+
+    data = client.get(f"/budgets/{budget.id}/status", headers=auth_headers).json()
+    assert (data["consumed_amount"], data["remaining"], data["overrun"]) == ("90.00", "10.00", False)
+
+    client.patch(f"/transactions/{second}", headers=auth_headers, json={"amount": 50})
+    data = client.get(f"/budgets/{budget.id}/status", headers=auth_headers).json()
+    assert data["overrun"] is True
+    assert data["utilization"] == 1.1
+
+    client.patch(f"/transactions/{first}", headers=auth_headers, json={"budget_id": None})
+    client.delete(f"/transactions/{second}", headers=auth_headers)
+    data = client.get(f"/budgets/{budget.id}/status", headers=auth_headers).json()
+    assert data["consumed_amount"] == "0.00"
+
+
+def test_status_tracks_batches(client, auth_headers, session, test_user, test_category):
+    budget = make_budget(session, test_user, test_category)
+    rows = [
+        {"category_id": test_category.id, "budget_id": budget.id, "amount": 20,
+         "trasaction_date": TODAY}
+        for _ in range(3)
+    ]
+    client.post("/transactions/batch", json=rows, headers=auth_headers)
+
+    data = client.get(f"/budgets/{budget.id}/status", headers=auth_headers).json()
+    assert data["consumed_amount"] == "60.00"
+
+
+def test_active_budgets_status(client, auth_headers, session, test_user, test_category):
+    active = make_budget(session, test_user, test_category, amount=10)
+    make_budget(session, test_user, test_category,
+                start=date(2020, 1, 1), end=date(2020, 1, 31))
+    post_transaction(client, auth_headers, test_category.id, active.id, 15)
+
+    response = client.get("/budgets/status", headers=auth_headers)
+
+    assert response.status_code == 200
+    statuses = response.json()
+    assert [item["budget_id"] for item in statuses] == [active.id]
+    assert statuses[0]["overrun"] is True
+
+
+def test_transactions_outside_budget_scope_are_rejected(client, auth_headers, session, test_user, test_category):
+    budget = make_budget(session, test_user, test_category)
+    other = Categories(user_id=test_user.id, name="Transport")
+    session.add(other)
+    session.commit()
+    outside = (date.today() - timedelta(days=30)).isoformat() + "T10:00:00"
+
+    wrong_category = client.post("/transactions/", headers=auth_headers, json={
+        "category_id": other.id, "budget_id": budget.id, "amount": 5, "trasaction_date": TODAY})
+    wrong_date = client.post("/transactions/", headers=auth_headers, json={
+        "category_id": test_category.id, "budget_id": budget.id, "amount": 5, "trasaction_date": outside})
+    linked = post_transaction(client, auth_headers, test_category.id, budget.id, 5)
+    moved = client.patch(f"/transactions/{linked}", headers=auth_headers, json={"trasaction_date": outside})
+
+    assert wrong_category.json()["detail"] == ["budget_id: Transaction category does not match the budget"]
+    assert wrong_date.json()["detail"] == ["budget_id: Transaction date is outside the budget period"]
+    assert moved.status_code == 422
+    assert client.get(f"/budgets/{budget.id}/status", headers=auth_headers).json()["consumed_amount"] == "5.00"
+
+
+def test_budget_status_not_found(client, auth_headers):
+    response = client.get("/budgets/999/status", headers=auth_headers)
+    assert response.status_code == 404
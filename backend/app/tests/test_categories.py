@@ -0,0 +1,109 @@
+import json
+import time
+from decimal import Decimal
+import pytest
+from sqlmodel import select
+from app.db.models import Categories, CategoryRule, Transactions
+from app.services.category_service import RuleMatcher
+from app.utils.aho_corasick import AhoCorasick
+from app.utils.safe_regex import compile_rule_regex
+
+
+def rule(rule_id, category_id, kind, pattern=None, min_amount=None, max_amount=None, priority=0):
+    return CategoryRule(id=rule_id, category_id=category_id, kind=kind, pattern=pattern,
+                        min_amount=min_amount, max_amount=max_amount, priority=priority)
+
+
+def test_aho_corasick_finds_overlapping_keywords():
+    automaton = AhoCorasick(["he", "she", "his", "hers", ""])
+
+    assert automaton.find("ushers") == {0, 1, 3}
+    assert automaton.find("this") == {2}
+    assert automaton.find("xyz") == set()
+
+
+def test_rule_matcher_priority_and_amounts():
+    matcher = RuleMatcher([
+        rule(1, 10, "keyword", "uber"),
+        rule(2, 20, "keyword", "uber eats", priority=5),
+        rule(3, 30, "regex", r"^PAGO\s+TARJETA"),
+        rule(4, 40, "amount", min_amount=Decimal("1000")),
+        rule(5, 50, "keyword", "supermercado", max_amount=Decimal("100")),
+    ])
+
+    assert matcher.match("UBER *TRIP", Decimal("12")) == 10
+    assert matcher.match("Uber Eats - Pedido", Decimal("12")) == 20
+    assert matcher.match("pago tarjeta visa", Decimal("12")) == 30
+    # El monto descarta la palabra clave y gana la regla de rango (creada antes)
+    assert matcher.match("Supermercado Día", Decimal("1500")) == 40
+    assert matcher.match("Supermercado Día", Decimal("80")) == 50
+    assert matcher.match("Farmacia", Decimal("5")) is None
+
+
+@pytest.mark.parametrize("pattern", [r"(a+)+$", r"(a|a)*$", "a*a*b", "a*a*a*b", r"(\w)\1", r"(?=a)a", "a" * 201])
+def test_unsafe_regexes_are_rejected(pattern):
+    with pytest.raises(ValueError):
+        compile_rule_regex(pattern)
+
+
+def test_accepted_regex_is_fast_on_long_descriptions():
+    regex = compile_rule_regex(r"uber.*eats")
+
+    started = time.perf_counter()
+    assert regex.search("uber" + "a" * 600) is None
+    assert compile_rule_regex(r"^PAGO\s+TARJETA").search("pago  tarjeta")
+    assert time.perf_counter() - started < 1
+
+
+def test_stored_unsafe_regex_is_ignored():
+    matcher = RuleMatcher([rule(1, 10, "regex", r"(a+)+$"), rule(2, 20, "regex", r"^pago\s+luz")])
+
+    started = time.perf_counter()
+    assert matcher.match("a" * 50 + "!", Decimal("1")) is None
+    assert matcher.match("PAGO  luz", Decimal("1")) == 20
+    assert time.perf_counter() - started < 1
+
+
+def test_rule_endpoints(client, auth_headers, test_category):
+    response = client.post("/categories/rules", headers=auth_headers, json={
+        "category_id": test_category.id, "kind": "keyword", "pattern": "Coffee", "priority": 1})
+    assert response.status_code == 201
+    rule_id = response.json()["id"]
+
+    invalid = [
+        {"category_id": test_category.id, "kind": "regex", "pattern": "("},
+        {"category_id": test_category.id, "kind": "regex", "pattern": "(a+)+$"},
+        {"category_id": test_category.id, "kind": "keyword"},
+        {"category_id": test_category.id, "kind": "amount"},
+        {"category_id": test_category.id, "kind": "amount", "min_amount": 10, "max_amount": 1},
+        {"category_id": 999, "kind": "keyword", "pattern": "x"},
+    ]
+    for body in invalid:
+        assert client.post("/categories/rules", headers=auth_headers, json=body).status_code == 422
+
+    assert [item["id"] for item in client.get("/categories/rules", headers=auth_headers).json()] == [rule_id]
+    assert client.delete(f"/categories/rules/{rule_id}", headers=auth_headers).status_code == 204
+    assert client.delete(f"/categories/rules/{rule_id}", headers=auth_headers).status_code == 404
+
+
+def test_import_applies_rules_and_sees_rule_changes(client, auth_headers, session, test_user, test_category):
+    food = Categories(user_id=test_user.id, name="Food")
+    income = Categories(user_id=test_user.id, name="Income")
+    session.add_all([food, income])
+    session.commit()
+    headers = {**auth_headers, "Content-Type": "text/csv"}
+    statement = "date,description,amount\n2024-01-05,CAFE MARTINEZ 123,-3.50\n2024-01-07,ACME payroll,2500\n"
+
+    client.post("/categories/rules", headers=auth_headers, json={
+        "category_id": food.id, "kind": "keyword", "pattern": "café"})
+    client.post("/transactions/import", params={"category_id": test_category.id},
+                content=statement.encode(), headers=headers)
+    # La regla nueva invalida el matcher en caché
+    client.post("/categories/rules", headers=auth_headers, json={
+        "category_id": income.id, "kind": "regex", "pattern": r"payroll|salary"})
+    response = client.post("/transactions/import", params={"category_id": test_category.id},
+                           content=statement.replace("2024-01", "2024-02").encode(), headers=headers)
+
+    assert json.loads(response.text.splitlines()[-1])["inserted"] == 2
+    transactions = session.exec(select(Transactions).order_by(Transactions.id)).all()
+    assert [t.category_id for t in transactions] == [food.id, test_category.id, food.id, income.id]
@@ -0,0 +1,110 @@
+import asyncio
+from datetime import date, datetime
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.models import FxRate
+from app.jobs import import_fx_rates
+from app.services.fx_service import FxRateCache, fx_rates, parse_rates_csv
+
+
+@pytest.fixture(autouse=True)
+def reset_fx_cache():
+    fx_rates.invalidate()
+    yield
+    fx_rates.invalidate()
+
+
+def test_rate_cache_uses_latest_rate_on_or_before_date():
+    cache = FxRateCache()
+    cache.load([
+        ("EUR", "USD", date(2024, 1, 1), 1.10),
+        ("EUR", "USD", date(2024, 1, 10), 1.20),
+        ("USD", "ARS", date(2024, 1, 1), 800.0),
+    ])
+
+    assert cache.rate("EUR", "USD", date(2024, 1, 5)) == 1.10
+    assert cache.rate("EUR", "USD", date(2024, 2, 1)) == 1.20
+    assert cache.rate("USD", "EUR", date(2024, 1, 10)) == 1 / 1.20
+    assert cache.rate("EUR", "ARS", date(2024, 1, 5)) == pytest.approx(880.0)
+    assert cache.rate("ARS", "ARS", date(2020, 1, 1)) == 1.0
+    with pytest.raises(KeyError):
+        cache.rate("EUR", "USD", date(2023, 12, 31))
+
+
+def test_parse_rates_csv():
+    rows = parse_rates_csv(["date,base,quote,rate", "2024-01-01, eur ,usd,1.1"])
+    assert rows == [{"rate_date": date(2024, 1, 1), "base": "EUR", "quote": "USD", "rate": 1.1}]
+
+
+def test_converted_report_uses_home_currency(client, auth_headers, session, test_user, test_category):
+    session.add(FxRate(base="EUR", quote="USD", rate_date=date(2024, 11, 1), rate=1.5))
+    session.add(FxRate(base="EUR", quote="USD", rate_date=date(2024, 11, 15), rate=2.0))
+    session.commit()
+    for amount, currency, day in ((10, "EUR", 5), (10, "EUR", 20), (3.5, "USD", 20)):
+        client.post("/transactions/", headers=auth_headers, json={
+            "category_id": test_category.id, "amount": amount, "currency": currency,
+            "trasaction_date": f"2024-11-{day:02d}T10:00:00"})
+    params = {"date_from": "2024-11-01", "date_to": "2024-11-30"}
+
+    report = client.get("/reports/monthly/converted", headers=auth_headers, params=params).json()
+    assert report == [{"month": "2024-11-01", "category_id": test_category.id,
+                       "currency": "USD", "total": "38.50", "count": 3}]
+
+    test_user.home_currency = "EUR"
+    session.add(test_user)
+    session.commit()
+    report = client.get("/reports/monthly/converted", headers=auth_headers, params=params).json()
+    assert report[0]["currency"] == "EUR"
+    assert report[0]["total"] == "21.75"
+
+
+def test_converted_report_missing_rate(client, auth_headers, test_category):
+    client.post("/transactions/", headers=auth_headers, json={
+        "category_id": test_category.id, "amount": 10, "currency": "JPY",
+        "trasaction_date": "2024-11-05T10:00:00"})
+
+    response = client.get("/reports/monthly/converted", headers=auth_headers, params={
+        "date_from": "2024-11-01", "date_to": "2024-11-30", "currency": "USD"})
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "No FX rate for JPY/USD on 2024-11-05"
+
+
+def test_import_job_upserts_rates(tmp_path, session, async_engine, monkeypatch, capsys):
+    monkeypatch.setattr(import_fx_rates, "get_session_factory", lambda: async_sessionmaker(
+        async_engine, class_=AsyncSession, expire_on_commit=False))
+    path = tmp_path / "rates.csv"
+    path.write_text("date,base,quote,rate\n2024-01-01,EUR,USD,1.1\n2024-01-02,EUR,USD,1.2\n")
+    import_fx_rates.main([str(path)])
+    path.write_text("date,base,quote,rate\n2024-01-02,EUR,USD,1.25\n")
+    import_fx_rates.main([str(path)])
+
+    assert "Imported 1 FX rates" in capsys.readouterr().out
+    rates = session.exec(select(FxRate.rate).order_by(FxRate.rate_date)).all()
+    assert rates == [1.1, 1.25]
+
+
+def test_rate_cache_sees_changes_from_other_processes(session, async_engine):
+    # Otra caché (otro worker) ya cargada; las escrituras llegan por la sesión síncrona, como desde el job
+    cache = FxRateCache(check_interval=0)
+    session.add(FxRate(base="EUR", quote="USD", rate_date=date(2024, 1, 1), rate=1.1,
+                       updated_at=datetime(2024, 1, 1, 12)))
+    session.commit()
+
+    async def refresh():
+        async with AsyncSession(async_engine) as async_session:
+            await cache.refresh(async_session)
+        return cache.rate("EUR", "USD", date(2024, 1, 5))
+
+    assert asyncio.run(refresh()) == 1.1
+    session.add(FxRate(base="EUR", quote="USD", rate_date=date(2024, 1, 2), rate=1.2,
+                       updated_at=datetime(2024, 1, 2, 12)))
+    session.commit()
+    assert asyncio.run(refresh()) == 1.2
+    # Una corrección no cambia la cantidad de filas, solo updated_at
+    correction = session.get(FxRate, ("EUR", "USD", date(2024, 1, 2)))
+    correction.rate, correction.updated_at = 1.25, datetime(2024, 1, 3, 12)
+    session.commit()
+    assert asyncio.run(refresh()) == 1.25
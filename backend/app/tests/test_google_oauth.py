@@ -0,0 +1,131 @@
+import asyncio
+import time
+from urllib.parse import parse_qs
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+from app.auth import google_oauth as google_module
+from app.auth.google_oauth import GoogleOAuth, GoogleOAuthError, get_google_oauth
+from app.main import app
+
+ISSUER = "https://idp.test"
+CLIENT_ID = "client-id"
+
+
+class FakeIdP:
+    """IdP de OpenID mínimo servido con httpx.MockTransport"""
+
+    def __init__(self, certs_cache_control: str = "public, max-age=3600"):
+        self.certs_cache_control = certs_cache_control
+        self.requests: list[str] = []
+        self.rotate("k1")
+
+    def rotate(self, kid: str) -> None:
+        self.kid = kid
+        self.key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def id_token(self, **overrides) -> str:
+        claims = {"iss": ISSUER, "aud": CLIENT_ID, "sub": "42", "email": "test@example.com",
+                  "given_name": "Test", "exp": int(time.time()) + 300, **overrides}
+        return jwt.encode(claims, self.key, algorithm="RS256", headers={"kid": self.kid})
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request.url.path)
+        if request.url.path == "/.well-known/openid-configuration":
+            return httpx.Response(200, headers={"cache-control": "public, max-age=3600"}, json={
+                "issuer": ISSUER,
+                "authorization_endpoint": f"{ISSUER}/authorize",
+                "token_endpoint": f"{ISSUER}/token",
+                "jwks_uri": f"{ISSUER}/certs",
+            })
+        if request.url.path == "/certs":
+            jwk = {**RSAAlgorithm.to_jwk(self.key.public_key(), as_dict=True),
+                   "kid": self.kid, "alg": "RS256", "use": "sig"}
+            return httpx.Response(200, headers={"cache-control": self.certs_cache_control}, json={"keys": [jwk]})
+        if request.url.path == "/token":
+            if parse_qs(request.content.decode())["code"] != ["good"]:
+                return httpx.Response(400, json={"error": "invalid_grant", "error_description": "Bad code"})
+            return httpx.Response(200, json={"access_token": "access", "id_token": self.id_token()})
+        if request.url.path == "/people":
+            return httpx.Response(200, json={"birthdays": [{"date": {"year": 1990}}]})
+        return httpx.Response(404)
+
+    def client(self) -> GoogleOAuth:
+        return GoogleOAuth(CLIENT_ID, "secret", "https://app.test/auth/google/callback",
+                           f"{ISSUER}/.well-known/openid-configuration", transport=httpx.MockTransport(self.handler))
+
+
+@pytest.fixture
+def idp(monkeypatch):
+    monkeypatch.setattr(google_module, "GOOGLE_PEOPLE_URL", f"{ISSUER}/people")
+    return FakeIdP()
+
+
+def test_id_token_verification_caches_certs(idp):
+    google = idp.client()
+
+    async def verify_twice():
+        first = await google.verify_id_token(idp.id_token())
+        second = await google.verify_id_token(idp.id_token(sub="43"))
+        await google.aclose()
+        return first, second
+
+    first, second = asyncio.run(verify_twice())
+
+    assert (first["sub"], second["sub"]) == ("42", "43")
+    assert idp.requests == ["/.well-known/openid-configuration", "/certs"]
+
+
+def test_certs_reload_on_rotation_and_without_max_age(idp):
+    idp.certs_cache_control = "no-cache"
+    google = idp.client()
+
+    async def verify():
+        await google.verify_id_token(idp.id_token())
+        await google.verify_id_token(idp.id_token())
+        idp.rotate("k2")
+        await google.verify_id_token(idp.id_token())
+        await google.aclose()
+
+    asyncio.run(verify())
+
+    assert idp.requests.count("/certs") == 3
+
+
+def test_id_token_rejects_wrong_audience_and_expired(idp):
+    google = idp.client()
+
+    async def verify(token):
+        try:
+            await google.verify_id_token(token)
+        finally:
+            await google.aclose()
+
+    with pytest.raises(GoogleOAuthError):
+        asyncio.run(verify(idp.id_token(aud="someone-else")))
+    with pytest.raises(GoogleOAuthError):
+        asyncio.run(verify(idp.id_token(exp=int(time.time()) - 60)))
+
+
+def test_google_callback_with_fake_idp(client, test_user, idp):
+    app.dependency_overrides[get_google_oauth] = idp.client
+
+    response = client.get("/auth/google/callback?code=good")
+    assert response.status_code == 200
+    assert "access_token" in response.json()
+
+    response = client.get("/auth/google/callback?code=bad")
+    assert response.status_code == 400
+    assert "Bad code" in response.json()["detail"]
+
+
+def test_google_callback_new_user_reads_profile(client, idp):
+    app.dependency_overrides[get_google_oauth] = idp.client
+
+    response = client.get("/auth/google/callback?code=good")
+
+    # Sin usuario previo se registra con la edad tomada del perfil
+    assert response.status_code == 200
+    assert "/people" in idp.requests
@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.db.models import User
+from app.utils.hashers import HASHERS, BcryptHasher, HashingPolicy, PasswordHasher, ScryptHasher, hashing_policy, identify_hasher
+
+
+@pytest.mark.parametrize("name", sorted(HASHERS))
+def test_hasher_roundtrip(name):
+    hasher = HASHERS[name]
+    hashed = hasher.hash("s3cret")
+
+    assert identify_hasher(hashed) is hasher
+    assert hasher.verify("s3cret", hashed)
+    assert not hasher.verify("wrong", hashed)
+    assert not hasher.needs_rehash(hashed)
+
+
+def test_needs_rehash_below_policy():
+    assert BcryptHasher(rounds=12).needs_rehash(BcryptHasher(rounds=10).hash("pw"))
+    assert ScryptHasher(ln=15).needs_rehash(ScryptHasher(ln=14).hash("pw"))
+    assert hashing_policy.needs_rehash(ScryptHasher(ln=14).hash("pw"))
+
+
+def test_calibrate_stays_within_bounds():
+    hasher = BcryptHasher(rounds=12)
+    hasher.calibrate(target_ms=0)
+
+    assert hasher.rounds == BcryptHasher.MIN_ROUNDS
+
+
+def test_hasher_interface_is_abstract():
+    with pytest.raises(TypeError):
+        PasswordHasher()
+
+
+def test_policy_counters_are_thread_safe():
+    policy = HashingPolicy("bcrypt", target_ms=0)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: policy.count("verifications"), range(2000)))
+
+    assert policy.stats()["verifications"] == 2000
+
+
+def test_login_rehashes_weak_hash(client, session, internal_headers):
+    user = User(
+        username="legacy",
+        email="legacy@example.com",
+        password=BcryptHasher(rounds=10).hash("testpassword"),
+        first_name="Legacy",
+        last_name="User",
+        age=30,
+    )
+    session.add(user)
+    session.commit()
+
+    response = client.post(
+        "/auth/login",
+        data={"username": "legacy", "password": "testpassword"},
+    )
+
+    assert response.status_code == 200
+    session.refresh(user)
+    assert not hashing_policy.needs_rehash(user.password)
+    assert client.get("/internal/password-hashing", headers=internal_headers).json()["rehashes"] >= 1
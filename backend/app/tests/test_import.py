@@ -0,0 +1,353 @@
+import asyncio
+import json
+from datetime import date, datetime
+from decimal import Decimal
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.models import Categories, TransactionFingerprint, Transactions
+from app.jobs import import_statement
+from app.schemas.transaction_schema import TransactionCreate
+from app.services import import_service
+from app.utils.dedupe import NearDuplicateIndex, normalize_description
+from app.utils.statement_parsing import aiter_ofx, aiter_statement_csv, parse_statement_amount
+
+CSV_STATEMENT = (
+    "Fecha;Concepto;Importe;Categoria\n"
+    "05/01/2024;Coffee;-3,50;\n"
+    "05/01/2024;Coffee;-3,50;\n"
+    "06/01/2024;\"Rent\nJanuary\";-1.200,00;Housing\n"
+    "07/01/2024;Salary;2.500,00;\n"
+    "bad date;Oops;-1,00;\n"
+)
+
+OFX_STATEMENT = b"""OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><CURDEF>EUR
+<BANKACCTFROM><BANKID>0011<ACCTID>1234<ACCTTYPE>CHECKING</BANKACCTFROM>
+<BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240105120000[-3:ART]<TRNAMT>-12.34<FITID>1<NAME>Grocer<MEMO>Card</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240106<TRNAMT>-5.00<FITID>2<NAME>Bus</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+async def chunked(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def collect(records):
+    return [record async for record in records]
+
+
+def progress_lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_parse_amounts():
+    assert parse_statement_amount("-1.200,00") == Decimal("-1200.00")
+    assert parse_statement_amount("(12.50)") == Decimal("-12.50")
+    assert parse_statement_amount("$ 1,234.56") == Decimal("1234.56")
+    assert parse_statement_amount("12,50-") == Decimal("-12.50")
+
+
+def test_csv_records_carry_byte_offsets():
+    data = CSV_STATEMENT.encode()
+    records = asyncio.run(collect(aiter_statement_csv(chunked(data))))
+
+    assert [row for row, _, _, _ in records] == [1, 2, 3, 4, 5]
+    assert records[2][2]["concepto"] == "Rent\nJanuary"
+    assert records[-1][1] == len(data)
+    assert data[:records[0][1]].endswith(b"-3,50;\n")
+
+
+def test_ofx_records():
+    records = asyncio.run(collect(aiter_ofx(chunked(OFX_STATEMENT))))
+
+    assert [data for _, _, data, _ in records] == [
+        {"date": "20240105120000[-3:ART]", "amount": "-12.34", "description": "Grocer - Card",
+         "external_id": "1", "account": "0011:1234", "currency": "EUR"},
+        {"date": "20240106", "amount": "-5.00", "description": "Bus", "external_id": "2",
+         "account": "0011:1234", "currency": "EUR"},
+    ]
+    assert OFX_STATEMENT[:records[0][1]].rstrip().endswith(b"</STMTTRN>")
+
+
+def test_fingerprinter_keeps_few_days_open():
+    fingerprinter = import_service.Fingerprinter(open_days=2)
+
+    def row(day, description="Coffee"):
+        return TransactionCreate(
+            trasaction_date=datetime(2024, 1, day), amount=Decimal("3.50"), description=description, category_id=1)
+
+    first = fingerprinter(row(1), None)
+    assert fingerprinter(row(1), None) != first
+    for day in (2, 3, 2, 4):
+        fingerprinter(row(day), None)
+
+    # Solo quedan abiertos los dos últimos días; volver a uno cerrado es un error de la fila
+    assert [day.day for day in fingerprinter.seen] == [2, 4]
+    with pytest.raises(ValueError, match="sort the statement by date"):
+        fingerprinter(row(1), None)
+
+
+def test_fingerprinter_scopes_fitid_by_account():
+    fingerprinter = import_service.Fingerprinter()
+    transaction = TransactionCreate(
+        trasaction_date=datetime(2024, 1, 5), amount=Decimal("3.50"), category_id=1)
+    moved = transaction.model_copy(update={"trasaction_date": datetime(2024, 1, 6)})
+
+    assert fingerprinter(transaction, "1", "bank:a") != fingerprinter(transaction, "1", "bank:b")
+    assert fingerprinter(transaction, "1", "bank:a") == fingerprinter(moved, "1", "bank:a")
+    # Sin cuenta el FITID solo se confía junto al día
+    assert fingerprinter(transaction, "1") != fingerprinter(moved, "1")
+
+
+def test_near_duplicate_index():
+    index = NearDuplicateIndex(window_days=2, threshold=0.6)
+    index.add("a", "USD", 350, date(2024, 1, 5), "STARBUCKS #1234 Buenos Aires")
+    index.add("b", "USD", 350, date(2024, 1, 9), "Starbucks Buenos Aires")
+
+    assert normalize_description("  Café, Düsseldorf! ") == "cafe dusseldorf"
+    assert [ref for ref, _ in index.match("USD", 350, date(2024, 1, 6), "Starbucks - Buenos Aires 99")] == ["a"]
+    assert index.match("USD", 351, date(2024, 1, 5), "Starbucks Buenos Aires") == []
+    assert index.match("USD", 350, date(2024, 1, 5), "Uber trip") == []
+
+
+def test_import_csv_endpoint(client, auth_headers, session, test_user, test_category):
+    housing = Categories(user_id=test_user.id, name="Housing")
+    session.add(housing)
+    session.commit()
+
+    response = client.post(
+        "/transactions/import", params={"category_id": test_category.id},
+        content=CSV_STATEMENT.encode(), headers={**auth_headers, "Content-Type": "text/csv"})
+
+    assert response.status_code == 200
+    final = progress_lines(response)[-1]
+    assert final["done"] is True
+    assert (final["rows"], final["inserted"], final["duplicates"], final["failed"]) == (5, 4, 0, 1)
+    assert final["offset"] == len(CSV_STATEMENT.encode())
+    assert final["errors"][0]["row"] == 5
+    transactions = session.exec(select(Transactions).order_by(Transactions.id)).all()
+    assert [(t.amount, t.category_id) for t in transactions] == [
+        (Decimal("3.50"), test_category.id), (Decimal("3.50"), test_category.id),
+        (Decimal("1200.00"), housing.id), (Decimal("-2500.00"), test_category.id)]
+    assert transactions[2].description == "Rent\nJanuary"
+
+
+def test_reimport_skips_existing_rows(client, auth_headers, session, test_category):
+    headers = {**auth_headers, "Content-Type": "text/csv"}
+    params = {"category_id": test_category.id}
+    client.post("/transactions/import", params=params, content=CSV_STATEMENT.encode(), headers=headers)
+
+    response = client.post("/transactions/import", params=params, content=CSV_STATEMENT.encode(), headers=headers)
+
+    final = progress_lines(response)[-1]
+    assert (final["inserted"], final["duplicates"]) == (0, 4)
+    assert len(session.exec(select(Transactions)).all()) == 4
+
+
+def test_import_resumes_from_offset(client, auth_headers, session, test_category, monkeypatch):
+    monkeypatch.setattr(import_service, "IMPORT_BATCH_SIZE", 2)
+    headers = {**auth_headers, "Content-Type": "text/csv"}
+    body = CSV_STATEMENT.encode()
+
+    lines = progress_lines(client.post(
+        "/transactions/import", params={"category_id": test_category.id}, content=body, headers=headers))
+    assert [line["rows"] for line in lines] == [2, 4, 5, 5]
+
+    # Reanudar desde el primer lote confirmado no vuelve a insertar nada
+    response = client.post("/transactions/import", params={
+        "category_id": test_category.id, "offset": lines[0]["offset"]}, content=body, headers=headers)
+    final = progress_lines(response)[-1]
+    assert (final["rows"], final["inserted"]) == (3, 0)
+
+
+def test_import_ofx_and_rollup(client, auth_headers, test_category):
+    response = client.post(
+        "/transactions/import", params={"category_id": test_category.id},
+        content=OFX_STATEMENT, headers={**auth_headers, "Content-Type": "application/x-ofx"})
+
+    assert progress_lines(response)[-1]["inserted"] == 2
+    report = client.get("/reports/monthly", headers=auth_headers).json()
+    assert [(row["currency"], row["total"]) for row in report] == [("EUR", "17.34")]
+
+
+def test_import_latin1_statement(client, auth_headers, session, test_category):
+    body = "Fecha;Descripción;Importe\n05/01/2024;Débito automático;-3,50\n".encode("latin-1")
+    headers = {**auth_headers, "Content-Type": "text/csv"}
+
+    as_utf8 = progress_lines(client.post(
+        "/transactions/import", params={"category_id": test_category.id}, content=body, headers=headers))[-1]
+    by_param = progress_lines(client.post(
+        "/transactions/import", params={"category_id": test_category.id, "encoding": "latin-1"},
+        content=body, headers=headers))[-1]
+    by_charset = progress_lines(client.post(
+        "/transactions/import", params={"category_id": test_category.id}, content=body,
+        headers={**headers, "Content-Type": "text/csv; charset=ISO-8859-1"}))[-1]
+    unknown = client.post("/transactions/import", params={"category_id": test_category.id, "encoding": "nope"},
+                          content=body, headers=headers)
+
+    # Sin encoding la cabecera no decodifica: error informado, no un 500
+    assert (as_utf8["inserted"], as_utf8["errors"][0]["errors"]) == (0, ["header is not valid utf-8"])
+    assert (by_param["inserted"], by_param["failed"]) == (1, 0)
+    assert by_charset["duplicates"] == 1
+    assert session.exec(select(Transactions.description)).all() == ["Débito automático"]
+    assert unknown.status_code == 422
+
+
+def test_import_utf16_statement(client, auth_headers, session, test_category):
+    text = "Fecha;Descripción;Importe\r\n05/01/2024;Débito ਊ automático;3,50-\r\n06/01/2024;Luz;-10,00\r\n"
+    headers = {**auth_headers, "Content-Type": "text/csv; charset=utf-16"}
+
+    # UTF-16 con BOM (así exporta Excel) y UTF-16 big-endian sin BOM por parámetro
+    with_bom = progress_lines(client.post(
+        "/transactions/import", params={"category_id": test_category.id},
+        content=text.encode("utf-16"), headers=headers))[-1]
+    big_endian = progress_lines(client.post(
+        "/transactions/import", params={"category_id": test_category.id, "encoding": "utf-16-be"},
+        content=text.encode("utf-16-be"), headers=headers))[-1]
+    not_text = client.post("/transactions/import", params={"category_id": test_category.id, "encoding": "hex"},
+                           content=b"", headers=headers)
+
+    assert (with_bom["inserted"], with_bom["failed"], with_bom["offset"]) == (2, 0, len(text.encode("utf-16")))
+    assert (big_endian["inserted"], big_endian["duplicates"]) == (0, 2)
+    assert sorted(session.exec(select(Transactions.description)).all()) == ["Débito ਊ automático", "Luz"]
+    assert not_text.status_code == 422
+
+
+def test_invalid_line_is_a_row_error():
+    data = "date;amount\n2024-01-05;1\n2024-01-06;D\xe9bito\n".encode("latin-1")
+
+    records = asyncio.run(collect(aiter_statement_csv(chunked(data))))
+
+    assert [(row, error) for row, _, _, error in records] == [
+        (1, None), (2, "invalid utf-8, set the file encoding")]
+    assert records[-1][1] == len(data)
+
+
+def test_import_rejects_unknown_category_and_type(client, auth_headers):
+    response = client.post("/transactions/import", params={"category_id": 999},
+                           content=b"date,amount\n", headers={**auth_headers, "Content-Type": "text/csv"})
+    assert response.status_code == 422
+
+    response = client.post("/transactions/import", params={"category_id": 1},
+                           content=b"{}", headers={**auth_headers, "Content-Type": "application/json"})
+    assert response.status_code == 415
+
+
+def test_cli_resumes_csv_from_offset(tmp_path, session, async_engine, test_user, test_category, monkeypatch, capsys):
+    monkeypatch.setattr(import_statement, "get_session_factory", lambda: async_sessionmaker(
+        async_engine, class_=AsyncSession, expire_on_commit=False))
+    path = tmp_path / "statement.csv"
+    path.write_bytes(CSV_STATEMENT.encode())
+    first_row_end = CSV_STATEMENT.index("\n", CSV_STATEMENT.index("\n") + 1) + 1
+
+    import_statement.main([str(path), "--user-id", str(test_user.id), "--category-id", str(test_category.id),
+                           "--offset", str(first_row_end)])
+
+    final = json.loads(capsys.readouterr().out.splitlines()[-1])
+    assert (final["rows"], final["inserted"], final["failed"]) == (4, 3, 1)
+
+
+def test_import_progress_can_be_polled(client, auth_headers, test_category):
+    client.post(
+        "/transactions/import", params={"category_id": test_category.id, "import_id": "jan"},
+        content=CSV_STATEMENT.encode(), headers={**auth_headers, "Content-Type": "text/csv"})
+
+    progress = client.get("/transactions/import/jan", headers=auth_headers).json()
+
+    assert (progress["done"], progress["inserted"]) == (True, 4)
+    assert client.get("/transactions/import/other", headers=auth_headers).status_code == 404
+
+
+def test_overlapping_statements_only_add_new_rows(client, auth_headers, session, test_category):
+    headers = {**auth_headers, "Content-Type": "text/csv"}
+    params = {"category_id": test_category.id}
+    client.post("/transactions/import", params=params, content=CSV_STATEMENT.encode(), headers=headers)
+    overlapping = (
+        "Fecha;Concepto;Importe\n"
+        "05/01/2024;COFFEE;-3,50\n"
+        "05/01/2024;Coffee;-3,50\n"
+        "05/01/2024;Coffee;-3,50\n"
+        "08/01/2024;Bus;-1,00\n"
+    )
+
+    response = client.post("/transactions/import", params=params, content=overlapping.encode(), headers=headers)
+
+    # La tercera copia del café es nueva: el extracto anterior tenía solo dos
+    final = progress_lines(response)[-1]
+    assert (final["inserted"], final["duplicates"]) == (2, 2)
+    assert len(session.exec(select(Transactions).where(Transactions.fingerprint.is_not(None))).all()) == 6
+
+
+def test_ofx_reimport_matches_bank_ids(client, auth_headers, test_category):
+    headers = {**auth_headers, "Content-Type": "application/x-ofx"}
+    params = {"category_id": test_category.id}
+    client.post("/transactions/import", params=params, content=OFX_STATEMENT, headers=headers)
+
+    # El banco corrigió la descripción, pero el FITID identifica el movimiento
+    response = client.post("/transactions/import", params=params,
+                           content=OFX_STATEMENT.replace(b"<NAME>Bus", b"<NAME>City bus"), headers=headers)
+
+    final = progress_lines(response)[-1]
+    assert (final["inserted"], final["duplicates"]) == (0, 2)
+
+
+def test_fitid_dedupe_survives_a_date_correction(client, auth_headers, session, test_category):
+    headers = {**auth_headers, "Content-Type": "application/x-ofx"}
+    params = {"category_id": test_category.id}
+    client.post("/transactions/import", params=params, content=OFX_STATEMENT, headers=headers)
+
+    # El banco movió la fecha de un movimiento a otro mes: la huella no incluye la fecha
+    response = client.post("/transactions/import", params=params,
+                           content=OFX_STATEMENT.replace(b"<DTPOSTED>20240106", b"<DTPOSTED>20240203"),
+                           headers=headers)
+
+    final = progress_lines(response)[-1]
+    assert (final["inserted"], final["duplicates"]) == (0, 2)
+    assert len(session.exec(select(TransactionFingerprint)).all()) == 2
+
+
+def test_deleting_an_imported_transaction_releases_its_fingerprint(client, auth_headers, session, test_category):
+    headers = {**auth_headers, "Content-Type": "application/x-ofx"}
+    params = {"category_id": test_category.id}
+    client.post("/transactions/import", params=params, content=OFX_STATEMENT, headers=headers)
+    transaction = session.exec(select(Transactions).order_by(Transactions.id)).first()
+
+    assert client.delete(f"/transactions/{transaction.id}", headers=auth_headers).status_code == 204
+    response = client.post("/transactions/import", params=params, content=OFX_STATEMENT, headers=headers)
+
+    final = progress_lines(response)[-1]
+    assert (final["inserted"], final["duplicates"]) == (1, 1)
+
+
+def test_same_fitid_in_two_accounts_is_imported_twice(client, auth_headers, test_category):
+    headers = {**auth_headers, "Content-Type": "application/x-ofx"}
+    params = {"category_id": test_category.id}
+    client.post("/transactions/import", params=params, content=OFX_STATEMENT, headers=headers)
+
+    response = client.post("/transactions/import", params=params,
+                           content=OFX_STATEMENT.replace(b"<ACCTID>1234", b"<ACCTID>9876"), headers=headers)
+
+    final = progress_lines(response)[-1]
+    assert (final["inserted"], final["duplicates"]) == (2, 0)
+
+
+def test_import_reports_near_duplicates(client, auth_headers, session, test_user, test_category):
+    manual = Transactions(user_id=test_user.id, category_id=test_category.id, amount=Decimal("1200.00"),
+                          description="rent january", trasaction_date=datetime(2024, 1, 5))
+    session.add(manual)
+    session.commit()
+
+    response = client.post(
+        "/transactions/import", params={"category_id": test_category.id},
+        content=CSV_STATEMENT.encode(), headers={**auth_headers, "Content-Type": "text/csv"})
+
+    final = progress_lines(response)[-1]
+    assert (final["inserted"], final["near_duplicates"]) == (4, 1)
+    assert final["near_duplicate_matches"] == [{"row": 3, "transaction_id": manual.id, "similarity": 1.0}]
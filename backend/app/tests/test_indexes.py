@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import text
+
+# Consultas de los caminos de acceso clave y el índice que deben usar
+ACCESS_PATHS = [
+    (
+        "SELECT * FROM transactions WHERE user_id = :user_id "
+        "AND trasaction_date >= :date_from AND trasaction_date < :date_to",
+        "ix_transactions_user_id_trasaction_date",
+    ),
+    (
+        "SELECT SUM(amount) FROM transactions WHERE user_id = :user_id AND category_id = :category_id",
+        "ix_transactions_user_id_category_id",
+    ),
+    (
+        "SELECT * FROM transactions WHERE budget_id = :budget_id",
+        "ix_transactions_budget_id",
+    ),
+    (
+        "SELECT * FROM transactions WHERE category_id = :category_id",
+        "ix_transactions_category_id",
+    ),
+    (
+        "SELECT * FROM budget WHERE user_id = :user_id "
+        "AND start_date <= :today AND end_date >= :today",
+        "ix_budget_user_id_start_date_end_date",
+    ),
+    (
+        "SELECT * FROM categories WHERE user_id = :user_id",
+        "ix_categories_user_id",
+    ),
+]
+
+
+@pytest.mark.parametrize("query, index", ACCESS_PATHS)
+def test_query_plan_uses_index(session, query, index):
+    params = {
+        "user_id": "0" * 32, "category_id": 1, "budget_id": 1,
+        "date_from": "2024-01-01", "date_to": "2024-02-01", "today": "2024-01-15",
+    }
+    plan = session.connection().execute(text(f"EXPLAIN QUERY PLAN {query}"), params).all()
+
+    details = " ".join(row[-1] for row in plan)
+    assert f"USING INDEX {index}" in details or f"USING COVERING INDEX {index}" in details, details
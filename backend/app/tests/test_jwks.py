@@ -0,0 +1,70 @@
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from app.auth import jwt_manager
+from app.auth.keyring import KeyRing
+
+
+@pytest.fixture
+def asymmetric_keys(monkeypatch):
+    monkeypatch.setattr(jwt_manager, "ALGORITHM", "EdDSA")
+    jwt_manager.set_keyring(KeyRing.generate("EdDSA"))
+    yield
+    jwt_manager.set_keyring(None)
+
+
+def write_key(directory, kid, public_only=False):
+    private_key = ed25519.Ed25519PrivateKey.generate()
+    if public_only:
+        data = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+        (directory / f"{kid}.pub.pem").write_bytes(data)
+    else:
+        data = private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption())
+        (directory / f"{kid}.pem").write_bytes(data)
+
+
+def test_tokens_carry_kid_and_verify(asymmetric_keys):
+    token = jwt_manager.create_access_token({"sub": "user"})
+
+    assert jwt.get_unverified_header(token)["kid"] == jwt_manager.get_keyring().active_kid
+    assert jwt_manager.decode_token(token)["sub"] == "user"
+
+
+def test_rotation_keeps_old_tokens_valid(asymmetric_keys, tmp_path):
+    write_key(tmp_path, "2024-01")
+    write_key(tmp_path, "2024-02")
+    jwt_manager.set_keyring(KeyRing.from_directory(str(tmp_path), "2024-01"))
+    old_token = jwt_manager.create_access_token({"sub": "user"})
+
+    jwt_manager.set_keyring(KeyRing.from_directory(str(tmp_path)))
+    new_token = jwt_manager.create_access_token({"sub": "user"})
+
+    assert jwt.get_unverified_header(new_token)["kid"] == "2024-02"
+    assert jwt_manager.decode_token(old_token)["sub"] == "user"
+
+    (tmp_path / "2024-01.pem").unlink()
+    jwt_manager.set_keyring(KeyRing.from_directory(str(tmp_path)))
+    with pytest.raises(jwt.InvalidTokenError):
+        jwt_manager.decode_token(old_token)
+
+
+def test_public_only_keys_cannot_sign(tmp_path):
+    write_key(tmp_path, "retired", public_only=True)
+
+    with pytest.raises(ValueError):
+        KeyRing.from_directory(str(tmp_path))
+
+
+def test_jwks_endpoint(client, asymmetric_keys):
+    response = client.get("/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    keys = response.json()["keys"]
+    assert keys[0]["kid"] == jwt_manager.get_keyring().active_kid
+    assert keys[0]["alg"] == "EdDSA"
+    assert "d" not in keys[0]
+    assert "max-age" in response.headers["Cache-Control"]
@@ -0,0 +1,64 @@
+import asyncio
+import os
+import subprocess
+import sys
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from app import main
+from app.db import session as db_session
+from app.db.pool_metrics import InstrumentedAsyncQueuePool
+from app.utils.inflight import InFlightCounter, InFlightMiddleware
+
+
+def test_app_imports_without_sql_url():
+    env = {key: value for key, value in os.environ.items() if key != "SQL_URL"}
+    result = subprocess.run([sys.executable, "-c", "import app.main"], env=env, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+
+
+def test_warm_pool_opens_connections(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'warm.db'}", poolclass=InstrumentedAsyncQueuePool, pool_size=3)
+
+    async def scenario():
+        warmed = await db_session.warm_pool(engine, connections=10)
+        idle = engine.pool.checkedin()
+        await engine.dispose()
+        return warmed, idle
+
+    assert asyncio.run(scenario()) == (3, 3)
+
+
+def test_lifespan_creates_and_disposes_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_session, "DB_URL", f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setattr(db_session, "engine", None)
+    monkeypatch.setattr(main, "BILL_SCHEDULER_ENABLED", False)
+    monkeypatch.setattr(main.hashing_policy, "calibrate", lambda: None)
+
+    with TestClient(main.app) as client:
+        assert db_session.engine is not None
+        assert client.get("/").status_code == 200
+        assert main.in_flight.count == 0
+
+    assert db_session.engine is None
+
+
+def test_drain_waits_for_in_flight_requests():
+    counter = InFlightCounter()
+    release = asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+
+    async def scenario():
+        request = asyncio.create_task(InFlightMiddleware(slow_app, counter)({"type": "http"}, None, None))
+        await asyncio.sleep(0)
+        timed_out = await counter.drain(timeout=0.05, interval=0.01)
+        asyncio.get_running_loop().call_later(0.05, release.set)
+        drained = await counter.drain(timeout=1, interval=0.01)
+        await request
+        return timed_out, drained
+
+    assert asyncio.run(scenario()) == (False, True)
+    assert counter.count == 0
@@ -0,0 +1,81 @@
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import text
+from app.db.models import Budget
+from app.utils.money import from_minor, to_minor
+
+
+def test_minor_unit_conversion():
+    assert to_minor(Decimal("10.25")) == 1025
+    assert to_minor(0.1 + 0.2) == 30
+    assert to_minor("-1.005") == -101
+    assert from_minor(-105) == Decimal("-1.05")
+
+
+def test_amounts_are_stored_as_integers(client, auth_headers, session, test_category):
+    response = client.post("/transactions/", headers=auth_headers, json={
+        "category_id": test_category.id, "amount": 12.34, "trasaction_date": "2024-11-05T10:00:00"})
+
+    assert response.json()["amount"] == "12.34"
+    assert session.exec(text("SELECT amount FROM transactions")).one() == (1234,)
+
+
+def test_rollup_totals_are_exact(client, auth_headers, test_category):
+    rows = [
+        {"category_id": test_category.id, "amount": 0.1, "trasaction_date": "2024-11-05T10:00:00"}
+        for _ in range(10)
+    ]
+    client.post("/transactions/batch", json=rows, headers=auth_headers)
+
+    report = client.get("/reports/monthly", headers=auth_headers).json()
+
+    assert report[0]["total"] == "1.00"
+    assert report[0]["currency"] == "USD"
+
+
+def test_amount_precision_is_validated(client, auth_headers, test_category):
+    response = client.post("/transactions/", headers=auth_headers, json={
+        "category_id": test_category.id, "amount": 1.234, "trasaction_date": "2024-11-05T10:00:00"})
+    assert response.status_code == 422
+
+    response = client.post("/transactions/", headers=auth_headers, json={
+        "category_id": test_category.id, "amount": 1, "currency": "usd",
+        "trasaction_date": "2024-11-05T10:00:00"})
+    assert response.status_code == 422
+
+    # Tres decimales no entran en la escala fija de centésimos; sin decimales sí
+    response = client.post("/transactions/", headers=auth_headers, json={
+        "category_id": test_category.id, "amount": 1, "currency": "KWD",
+        "trasaction_date": "2024-11-05T10:00:00"})
+    assert response.status_code == 422
+    response = client.post("/transactions/", headers=auth_headers, json={
+        "category_id": test_category.id, "amount": 1500, "currency": "JPY",
+        "trasaction_date": "2024-11-05T10:00:00"})
+    assert response.json()["amount"] == "1500.00"
+
+
+def test_rollup_is_split_by_currency(client, auth_headers, test_category):
+    for amount, currency in ((10, "USD"), (2500, "ARS"), (5, "USD")):
+        client.post("/transactions/", headers=auth_headers, json={
+            "category_id": test_category.id, "amount": amount, "currency": currency,
+            "trasaction_date": "2024-11-05T10:00:00"})
+
+    report = client.get("/reports/monthly", headers=auth_headers).json()
+
+    assert {(row["currency"], row["total"]) for row in report} == {("ARS", "2500.00"), ("USD", "15.00")}
+    filtered = client.get("/reports/monthly", headers=auth_headers, params={"currency": "ARS"}).json()
+    assert [row["count"] for row in filtered] == [1]
+
+
+def test_budget_currency_must_match(client, auth_headers, session, test_user, test_category):
+    budget = Budget(user_id=test_user.id, category_id=test_category.id, amount=100, currency="EUR",
+                    start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+    session.add(budget)
+    session.commit()
+
+    response = client.post("/transactions/", headers=auth_headers, json={
+        "category_id": test_category.id, "budget_id": budget.id, "amount": 10,
+        "trasaction_date": "2024-11-05T10:00:00"})
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == ["currency: Transaction currency does not match the budget"]
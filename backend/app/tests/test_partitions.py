@@ -0,0 +1,60 @@
+import asyncio
+from datetime import date
+from types import SimpleNamespace
+from sqlalchemy import create_mock_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.models import Transactions
+from app.db.partitions import (
+    add_months, create_partition_sql, detach_partitions, ensure_partitions, partition_month, partition_name)
+
+
+def test_partition_naming_and_bounds():
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert partition_name(date(2024, 3, 1)) == "transactions_y2024m03"
+    assert partition_month("transactions_y2024m03") == date(2024, 3, 1)
+    assert partition_month("transactions_default") is None
+    assert create_partition_sql(date(2024, 12, 1)) == (
+        "CREATE TABLE IF NOT EXISTS transactions_y2024m12 PARTITION OF transactions "
+        "FOR VALUES FROM ('2024-12-01 00:00:00') TO ('2025-01-01 00:00:00')")
+
+
+def test_partition_maintenance_is_a_noop_without_postgres(session, async_engine):
+    async def maintain():
+        async with AsyncSession(async_engine) as async_session:
+            return (await ensure_partitions(async_session),
+                    await detach_partitions(async_session, date(2024, 1, 1)))
+
+    assert asyncio.run(maintain()) == ([], [])
+
+
+def test_model_matches_the_partitioned_table():
+    ddl = str(CreateTable(Transactions.__table__).compile(dialect=postgresql.dialect()))
+
+    assert "PRIMARY KEY (id, trasaction_date)" in ddl
+    assert ddl.rstrip().endswith("PARTITION BY RANGE (trasaction_date)")
+    assert "id SERIAL NOT NULL" in ddl
+
+
+def test_partition_ddl_runs_under_an_advisory_lock():
+    class PostgresSession:
+        def __init__(self):
+            self.statements = []
+
+        def get_bind(self):
+            return create_mock_engine("postgresql+asyncpg://", lambda *args, **kwargs: None)
+
+        async def exec(self, statement):
+            sql = str(statement)
+            self.statements.append(sql)
+            return SimpleNamespace(scalar=lambda: "p" if "relkind" in sql else False,
+                                   scalars=lambda: ["transactions_default"])
+
+    session = PostgresSession()
+    created = asyncio.run(ensure_partitions(session, today=date(2024, 11, 5), months_ahead=1))
+
+    assert created == ["transactions_y2024m11", "transactions_y2024m12"]
+    assert "pg_advisory_xact_lock" in session.statements[1]
+    assert "pg_inherits" in session.statements[2]
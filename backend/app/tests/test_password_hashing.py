@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+from app.utils.auth import PasswordHashPool, get_password_hash_async, verify_password_async
+
+
+def test_hash_and_verify_async():
+    async def scenario():
+        hashed = await get_password_hash_async("secret")
+        return await verify_password_async("secret", hashed), await verify_password_async("wrong", hashed)
+
+    assert asyncio.run(scenario()) == (True, False)
+
+
+def test_hash_pool_rejects_when_saturated():
+    pool = PasswordHashPool(workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        busy = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as exc_info:
+            await pool.run(lambda: None)
+        release.set()
+        await busy
+        return exc_info.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "1"
+    assert pool.rejected == 1
+    assert pool.pending == 0
+
+
+def test_hash_pool_keeps_slot_until_cancelled_work_finishes():
+    pool = PasswordHashPool(workers=1, max_queue=0)
+    started, release = threading.Event(), threading.Event()
+
+    def work():
+        started.set()
+        release.wait()
+
+    async def scenario():
+        busy = asyncio.ensure_future(pool.run(work))
+        await asyncio.to_thread(started.wait)
+        busy.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await busy
+        # El hilo sigue trabajando: el cupo no se devolvió
+        with pytest.raises(HTTPException):
+            await pool.run(lambda: None)
+        release.set()
+        while pool.pending:
+            await asyncio.sleep(0.01)
+        return await pool.run(lambda: "ok")
+
+    assert asyncio.run(scenario()) == "ok"
+    assert pool.rejected == 1
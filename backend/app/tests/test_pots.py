@@ -0,0 +1,108 @@
+import asyncio
+from datetime import date
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.models import SavingPots
+from app.schemas.pot_schema import ContributionCreate
+from app.services import pot_service
+
+
+def make_pot(session, user, name="Holidays", current_amount=0.0):
+    pot = SavingPots(user_id=user.id, name=name, target_amount=1000,
+                     current_amount=current_amount, start_date=date(2024, 1, 1))
+    session.add(pot)
+    session.commit()
+    session.refresh(pot)
+    return pot
+
+
+def test_create_and_list_pots(client, auth_headers):
+    response = client.post("/pots/", headers=auth_headers, json={
+        "name": "Car", "target_amount": 5000, "start_date": "2024-01-01"})
+    assert response.status_code == 201
+    assert response.json()["current_amount"] == "0.00"
+    assert [pot["name"] for pot in client.get("/pots/", headers=auth_headers).json()] == ["Car"]
+
+
+def test_contributions_update_balance_and_ledger(client, auth_headers, session, test_user):
+    pot = make_pot(session, test_user)
+
+    deposit = client.post(f"/pots/{pot.id}/contributions", headers=auth_headers,
+                          json={"amount": 100, "note": "salary"})
+    assert deposit.status_code == 201
+    assert deposit.json()["balance"] == "100.00"
+    withdrawal = client.post(f"/pots/{pot.id}/contributions", headers=auth_headers, json={"amount": -30})
+    assert withdrawal.json()["balance"] == "70.00"
+
+    overdraft = client.post(f"/pots/{pot.id}/contributions", headers=auth_headers, json={"amount": -71})
+    assert overdraft.status_code == 409
+
+    history = client.get(f"/pots/{pot.id}/contributions", headers=auth_headers).json()
+    assert [(entry["amount"], entry["balance"]) for entry in history] == [("-30.00", "70.00"), ("100.00", "100.00")]
+    assert client.post("/pots/999/contributions", headers=auth_headers, json={"amount": 1}).status_code == 404
+    assert client.post(f"/pots/{pot.id}/contributions", headers=auth_headers, json={"amount": 0}).status_code == 422
+
+
+def test_batch_contributions(client, auth_headers, session, test_user):
+    first = make_pot(session, test_user, "Holidays")
+    second = make_pot(session, test_user, "Car", current_amount=50)
+
+    response = client.post("/pots/contributions/batch", headers=auth_headers, json=[
+        {"pot_id": second.id, "amount": -20},
+        {"pot_id": first.id, "amount": 10},
+        {"pot_id": first.id, "amount": 15},
+    ])
+
+    assert response.status_code == 200
+    assert response.json() == {"applied": 3, "balances": [
+        {"pot_id": first.id, "current_amount": "25.00"}, {"pot_id": second.id, "current_amount": "30.00"}]}
+    history = client.get(f"/pots/{first.id}/contributions", headers=auth_headers).json()
+    assert [entry["balance"] for entry in history] == ["25.00", "10.00"]
+
+
+def test_batch_contributions_are_all_or_nothing(client, auth_headers, session, test_user):
+    first = make_pot(session, test_user, "Holidays")
+    second = make_pot(session, test_user, "Car")
+
+    response = client.post("/pots/contributions/batch", headers=auth_headers, json=[
+        {"pot_id": first.id, "amount": 10},
+        {"pot_id": second.id, "amount": -5},
+    ])
+
+    assert response.status_code == 409
+    session.expire_all()
+    assert session.get(SavingPots, first.id).current_amount == 0
+    assert client.get(f"/pots/{first.id}/contributions", headers=auth_headers).json() == []
+
+
+def test_batch_running_balance_never_goes_negative(client, auth_headers, session, test_user):
+    pot = make_pot(session, test_user)
+    funded = make_pot(session, test_user, "Car", current_amount=100)
+
+    # El neto es cero, pero el primer retiro dejaría el pot vacío en -100
+    rejected = client.post("/pots/contributions/batch", headers=auth_headers, json=[
+        {"pot_id": pot.id, "amount": -100}, {"pot_id": pot.id, "amount": 100}])
+    accepted = client.post("/pots/contributions/batch", headers=auth_headers, json=[
+        {"pot_id": funded.id, "amount": -100}, {"pot_id": funded.id, "amount": 100}])
+
+    assert rejected.status_code == 409
+    assert client.get(f"/pots/{pot.id}/contributions", headers=auth_headers).json() == []
+    assert accepted.status_code == 200
+    history = client.get(f"/pots/{funded.id}/contributions", headers=auth_headers).json()
+    assert [entry["balance"] for entry in history] == ["100.00", "0.00"]
+
+
+def test_concurrent_contributions_do_not_lose_updates(session, async_engine, test_user):
+    pot = make_pot(session, test_user)
+    factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def deposit():
+        async with factory() as async_session:
+            await pot_service.contribute(async_session, test_user.id, pot.id, ContributionCreate(amount=1))
+
+    async def run():
+        await asyncio.gather(*(deposit() for _ in range(20)))
+
+    asyncio.run(run())
+    session.expire_all()
+    assert session.get(SavingPots, pot.id).current_amount == 20
@@ -0,0 +1,116 @@
+import asyncio
+import pytest
+from sqlmodel import select
+from app.auth.revocation import (
+    InMemoryRevocationStore, RedisRevocationStore, RevocationStore, get_revocation_store)
+from app.db.models import User
+from app.main import app
+from app.utils.auth import get_password_hash
+
+
+class FakeRedis:
+    """Subconjunto de redis.asyncio usado por RedisRevocationStore"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = (value, ex)
+        return True
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request, client):
+    if request.param == "memory":
+        revocation_store = InMemoryRevocationStore()
+    else:
+        revocation_store = RedisRevocationStore(FakeRedis())
+    app.dependency_overrides[get_revocation_store] = lambda: revocation_store
+    return revocation_store
+
+
+@pytest.fixture
+def tokens(client, session):
+    session.add(User(
+        username="refresher",
+        email="refresher@example.com",
+        password=get_password_hash("testpassword"),
+        first_name="Refresh",
+        last_name="User",
+        age=30,
+    ))
+    session.commit()
+    response = client.post(
+        "/auth/login",
+        data={"username": "refresher", "password": "testpassword", "scope": "me"},
+    )
+    return response.json()
+
+
+def test_login_returns_refresh_token(tokens):
+    assert tokens["refresh_token"]
+    assert tokens["expires_in"] > 0
+
+
+def test_refresh_rotates_tokens(client, store, tokens):
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["refresh_token"] != tokens["refresh_token"]
+    me = client.get("/auth/users/me/", headers={"Authorization": f"Bearer {data['access_token']}"})
+    assert me.status_code == 200
+
+
+def test_refresh_token_reuse_is_rejected(client, store, tokens):
+    client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Refresh token already used"
+
+
+def test_logout_revokes_refresh_token(client, store, tokens):
+    assert client.post("/auth/logout", json={"refresh_token": tokens["refresh_token"]}).status_code == 204
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_refresh_rejects_deleted_user(client, session, store, tokens):
+    session.delete(session.exec(select(User).where(User.username == "refresher")).one())
+    session.commit()
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "User not found"
+
+
+def test_revocation_store_is_abstract():
+    with pytest.raises(TypeError):
+        RevocationStore()
+
+
+def test_access_and_refresh_tokens_are_not_interchangeable(client, store, tokens):
+    refresh = client.post("/auth/refresh", json={"refresh_token": tokens["access_token"]})
+    me = client.get("/auth/users/me/", headers={"Authorization": f"Bearer {tokens['refresh_token']}"})
+
+    assert refresh.status_code == 401
+    assert me.status_code == 401
+
+
+def test_in_memory_store_evicts_expired_entries():
+    store = InMemoryRevocationStore()
+
+    async def scenario():
+        await store.revoke("expired", ttl=-1)
+        await store.revoke("active", ttl=60)
+        return await store.is_revoked("expired"), await store.is_revoked("active")
+
+    assert asyncio.run(scenario()) == (False, True)
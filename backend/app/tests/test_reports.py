@@ -0,0 +1,108 @@
+import asyncio
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from sqlalchemy.dialects import postgresql
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.models import Categories
+from app.schemas.transaction_schema import TransactionCreate
+from app.services import report_service, transaction_service
+
+
+def post_transaction(client, headers, category_id, amount, when):
+    response = client.post("/transactions/", headers=headers, json={
+        "category_id": category_id, "amount": amount, "trasaction_date": when,
+    })
+    return response.json()["id"]
+
+
+def monthly(client, headers, **params):
+    rows = client.get("/reports/monthly", headers=headers, params=params).json()
+    return {(row["month"], row["category_id"]): row for row in rows}
+
+
+def test_rollup_tracks_inserts(client, auth_headers, test_category):
+    post_transaction(client, auth_headers, test_category.id, 10, "2024-11-05T10:00:00")
+    post_transaction(client, auth_headers, test_category.id, 30, "2024-11-20T10:00:00")
+    post_transaction(client, auth_headers, test_category.id, 5, "2024-12-01T00:00:00")
+
+    report = monthly(client, auth_headers)
+
+    november = report[("2024-11-01", test_category.id)]
+    assert (november["total"], november["count"]) == ("40.00", 2)
+    assert (november["min_amount"], november["max_amount"]) == ("10.00", "30.00")
+    assert report[("2024-12-01", test_category.id)]["total"] == "5.00"
+
+
+def test_rollup_tracks_updates_and_deletes(client, auth_headers, test_category, session, test_user):
+    other = Categories(user_id=test_user.id, name="Transport")
+    session.add(other)
+    session.commit()
+    first = post_transaction(client, auth_headers, test_category.id, 10, "2024-11-05T10:00:00")
+    second = post_transaction(client, auth_headers, test_category.id, 30, "2024-11-20T10:00:00")
+
+    client.patch(f"/transactions/{second}", headers=auth_headers, json={"category_id": other.id})
+    report = monthly(client, auth_headers)
+    assert report[("2024-11-01", test_category.id)]["max_amount"] == "10.00"
+    assert report[("2024-11-01", other.id)]["total"] == "30.00"
+
+    client.delete(f"/transactions/{first}", headers=auth_headers)
+    report = monthly(client, auth_headers)
+    assert ("2024-11-01", test_category.id) not in report
+
+
+def test_rollup_tracks_batches_and_filters(client, auth_headers, test_category):
+    rows = [
+        {"category_id": test_category.id, "amount": amount, "trasaction_date": f"2024-{month:02d}-10T00:00:00"}
+        for month in (1, 2, 3) for amount in (1, 2)
+    ]
+    client.post("/transactions/batch", json=rows, headers=auth_headers)
+
+    report = monthly(client, auth_headers, date_from="2024-02-01", date_to="2024-03-31")
+
+    assert sorted(month for month, _ in report) == ["2024-02-01", "2024-03-01"]
+    assert report[("2024-02-01", test_category.id)]["count"] == 2
+
+
+def test_rollup_survives_concurrent_delete_and_insert(client, auth_headers, test_category, test_user, async_engine):
+    existing = [post_transaction(client, auth_headers, test_category.id, 10, f"2024-11-{day:02d}T10:00:00")
+                for day in range(1, 6)]
+
+    async def delete(transaction_id):
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            await transaction_service.delete_transaction(session, test_user.id, transaction_id)
+
+    async def create(amount):
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            await transaction_service.create_transaction(session, test_user.id, TransactionCreate(
+                category_id=test_category.id, amount=amount, trasaction_date=datetime(2024, 11, 15)))
+
+    async def scenario():
+        # Cada ronda borra una fila y agrega otra del mismo bucket a la vez
+        for transaction_id, amount in zip(existing, (20, 30, 40, 50, 60)):
+            await asyncio.gather(delete(transaction_id), create(amount))
+
+    asyncio.run(scenario())
+
+    november = monthly(client, auth_headers)[("2024-11-01", test_category.id)]
+    assert (november["total"], november["count"]) == ("200.00", 5)
+    assert (november["min_amount"], november["max_amount"]) == ("20.00", "60.00")
+
+
+def test_subtract_bucket_locks_rollup_row_first():
+    class RecordingSession:
+        def __init__(self):
+            self.statements = []
+
+        async def exec(self, statement):
+            self.statements.append(statement)
+            return SimpleNamespace(one=lambda: (None, None))
+
+    session = RecordingSession()
+    asyncio.run(report_service.subtract_bucket(
+        session, uuid.uuid4(), 1, date(2024, 11, 1), "USD", report_service.SpendBucket(Decimal(5), 1)))
+
+    lock, *_, cleanup = [str(statement.compile(dialect=postgresql.dialect())) for statement in session.statements]
+    assert lock.startswith("SELECT monthlyspend.count") and lock.endswith("FOR UPDATE")
+    assert cleanup.startswith("DELETE FROM monthlyspend") and "monthlyspend.count <= " in cleanup
@@ -0,0 +1,103 @@
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import create_mock_engine
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlmodel import SQLModel
+from app.db.models import Categories, Transactions, User
+from app.services.transaction_service import description_matches
+
+
+def add_transactions(session, user, category, *rows):
+    for day, description in rows:
+        session.add(Transactions(user_id=user.id, category_id=category.id, amount=Decimal("10"),
+                                 description=description, trasaction_date=datetime(2024, 1, day)))
+    session.commit()
+
+
+def search(client, auth_headers, **params):
+    response = client.get("/transactions/search", params=params, headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_search_matches_prefixes_without_accents(client, auth_headers, session, test_user, test_category):
+    add_transactions(session, test_user, test_category,
+                     (3, "Café Martínez Palermo"), (4, "UBER *TRIP"), (5, "Uber Eats pedido"), (6, None))
+    other = User(id=uuid.uuid4(), username="other", password="x", first_name="O", last_name="U",
+                 email="other@example.com", age=30)
+    session.add(other)
+    session.commit()
+    other_category = Categories(user_id=other.id, name="Other")
+    session.add(other_category)
+    session.commit()
+    add_transactions(session, other, other_category, (7, "Uber"))
+
+    assert [t["description"] for t in search(client, auth_headers, q="cafe MART")["items"]] == [
+        "Café Martínez Palermo"]
+    assert [t["description"] for t in search(client, auth_headers, q="uber")["items"]] == [
+        "Uber Eats pedido", "UBER *TRIP"]
+    assert search(client, auth_headers, q="uber", date_to="2024-01-05T00:00:00")["items"][0]["description"] == (
+        "UBER *TRIP")
+    assert search(client, auth_headers, q="?!")["items"] == []
+
+
+def test_search_keyset_pagination(client, auth_headers, session, test_user, test_category):
+    add_transactions(session, test_user, test_category, *[(day, f"Coffee {n}") for n, day in enumerate([1, 2, 2, 2, 3])])
+
+    seen, cursor = [], None
+    while True:
+        page = search(client, auth_headers, q="coffee", limit=2, **({"cursor": cursor} if cursor else {}))
+        seen += [t["id"] for t in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 5 == len(set(seen))
+    assert client.get("/transactions/search", params={"q": "coffee", "cursor": "nope"},
+                      headers=auth_headers).status_code == 422
+
+
+def test_search_follows_updates_and_deletes(client, auth_headers, test_category):
+    created = client.post("/transactions/", headers=auth_headers, json={
+        "category_id": test_category.id, "amount": 5, "description": "Netflix",
+        "trasaction_date": "2024-01-05T10:00:00"}).json()
+
+    client.patch(f"/transactions/{created['id']}", json={"description": "Spotify"}, headers=auth_headers)
+    assert search(client, auth_headers, q="netflix")["items"] == []
+    assert [t["id"] for t in search(client, auth_headers, q="spotify")["items"]] == [created["id"]]
+
+    client.delete(f"/transactions/{created['id']}", headers=auth_headers)
+    assert search(client, auth_headers, q="spotify")["items"] == []
+
+
+def test_fuzzy_search_matches_inside_words(client, auth_headers, session, test_user, test_category):
+    add_transactions(session, test_user, test_category, (3, "MERCADOPAGOSTEAM"))
+
+    assert search(client, auth_headers, q="steam")["items"] == []
+    assert len(search(client, auth_headers, q="steam", fuzzy=True)["items"]) == 1
+
+
+def test_postgres_search_uses_indexed_expressions():
+    class PostgresSession:
+        def get_bind(self):
+            return create_mock_engine("postgresql+asyncpg://", lambda *args, **kwargs: None)
+
+    condition = description_matches(PostgresSession(), "uber eat", ["uber", "eat"], fuzzy=True)
+    sql = str(condition.compile(dialect=asyncpg.dialect(), compile_kwargs={"literal_binds": True}))
+
+    assert ("to_tsvector('simple', f_unaccent(coalesce(description, ''))) @@ "
+            "to_tsquery('simple', f_unaccent('uber:* & eat:*'))") in sql
+    assert "transactions.description %> 'uber eat'" in sql
+
+
+def test_postgres_schema_creates_unaccent_before_the_index():
+    statements = []
+    engine = create_mock_engine("postgresql+asyncpg://", lambda sql, *args, **kwargs: statements.append(
+        str(sql.compile(dialect=engine.dialect))))
+    SQLModel.metadata.create_all(engine, checkfirst=False)
+
+    function = next(i for i, sql in enumerate(statements) if "FUNCTION f_unaccent(text)" in sql)
+    index = next(i for i, sql in enumerate(statements) if "ix_transactions_description_tsv" in sql)
+    assert "IMMUTABLE" in statements[function]
+    assert function < index
@@ -0,0 +1,163 @@
+import asyncio
+import json
+from sqlmodel import func, select
+from app.db.models import Transactions
+from app.services import transaction_service
+from app.utils.batch_parsing import aiter_byte_lines, aiter_csv, aiter_ndjson
+
+
+def transaction_data(category, **overrides):
+    return {
+        "category_id": category.id,
+        "amount": 12.5,
+        "description": "Supermarket",
+        "trasaction_date": "2024-11-05T10:00:00",
+        **overrides,
+    }
+
+
+def test_transactions_require_auth(client):
+    assert client.get("/transactions/").status_code == 401
+
+
+def test_create_and_get_transaction(client, auth_headers, test_category):
+    response = client.post("/transactions/", json=transaction_data(test_category), headers=auth_headers)
+
+    assert response.status_code == 201
+    created = response.json()
+    fetched = client.get(f"/transactions/{created['id']}", headers=auth_headers)
+    assert fetched.status_code == 200
+    assert fetched.json()["amount"] == "12.50"
+
+
+def test_create_transaction_foreign_category(client, auth_headers, test_category):
+    response = client.post(
+        "/transactions/", json=transaction_data(test_category, category_id=999), headers=auth_headers)
+
+    assert response.status_code == 422
+
+
+def test_update_and_delete_transaction(client, auth_headers, test_category):
+    created = client.post("/transactions/", json=transaction_data(test_category), headers=auth_headers).json()
+
+    updated = client.patch(f"/transactions/{created['id']}", json={"amount": 20}, headers=auth_headers)
+    deleted = client.delete(f"/transactions/{created['id']}", headers=auth_headers)
+
+    assert updated.json()["amount"] == "20.00"
+    assert deleted.status_code == 204
+    assert client.get(f"/transactions/{created['id']}", headers=auth_headers).status_code == 404
+
+
+def test_batch_json_reports_row_errors(client, auth_headers, test_category, session):
+    rows = [
+        transaction_data(test_category),
+        transaction_data(test_category, amount="not-a-number"),
+        transaction_data(test_category, category_id=999),
+        transaction_data(test_category, description=None),
+    ]
+
+    response = client.post("/transactions/batch", json=rows, headers=auth_headers)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["received"] == 4
+    assert result["inserted"] == 2
+    assert [error["row"] for error in result["errors"]] == [2, 3]
+    assert session.exec(select(func.count()).select_from(Transactions)).one() == 2
+
+
+def test_batch_ndjson(client, auth_headers, test_category):
+    body = "\n".join(json.dumps(transaction_data(test_category)) for _ in range(3)) + "\n{broken\n"
+
+    response = client.post(
+        "/transactions/batch", content=body,
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"})
+
+    result = response.json()
+    assert result["inserted"] == 3
+    assert result["errors"][0]["row"] == 4
+
+
+def test_batch_csv(client, auth_headers, test_category):
+    body = (
+        "category_id,amount,description,trasaction_date\n"
+        f'{test_category.id},10.5,"Coffee, large",2024-11-01T08:00:00\n'
+        f'{test_category.id},3,"Multi\nline",2024-11-02T08:00:00\n'
+        f"{test_category.id},oops,,2024-11-03T08:00:00\n"
+    )
+
+    response = client.post(
+        "/transactions/batch", content=body,
+        headers={**auth_headers, "Content-Type": "text/csv"})
+
+    result = response.json()
+    assert result["inserted"] == 2
+    assert result["errors"][0]["row"] == 3
+    listed = client.get("/transactions/", headers=auth_headers).json()
+    assert [row["description"] for row in listed] == ["Coffee, large", "Multi\nline"]
+
+
+def test_batch_invalid_utf8_is_a_row_error(client, auth_headers, test_category):
+    line = json.dumps(transaction_data(test_category)).encode()
+    ndjson = client.post(
+        "/transactions/batch", content=line + b"\n" + line.replace(b"Supermarket", b"D\xe9bito") + b"\n",
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"})
+    csv_body = (
+        "category_id,amount,description,trasaction_date\n"
+        f"{test_category.id},1,D\xe9bito,2024-11-01T08:00:00\n"
+        f"{test_category.id},2,Ok,2024-11-02T08:00:00\n"
+    ).encode("latin-1")
+    csv = client.post(
+        "/transactions/batch", content=csv_body, headers={**auth_headers, "Content-Type": "text/csv"})
+    array = client.post(
+        "/transactions/batch", content=b'[{"description": "D\xe9bito"}]',
+        headers={**auth_headers, "Content-Type": "application/json"})
+
+    assert (ndjson.json()["inserted"], ndjson.json()["errors"]) == (1, [{"row": 2, "errors": ["invalid UTF-8"]}])
+    assert (csv.json()["inserted"], csv.json()["errors"]) == (1, [{"row": 1, "errors": ["invalid UTF-8"]}])
+    assert array.json()["errors"] == [{"row": 0, "errors": ["invalid UTF-8"]}]
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def collect(items):
+    return [item async for item in items]
+
+
+def test_byte_lines_across_chunks_and_too_long_lines():
+    data = b"short\n" + b"x" * 50 + b"\nok\r\n" + b"y" * 30
+
+    for size in (1, 3, 7, 100):
+        lines = asyncio.run(collect(aiter_byte_lines(chunked(data, size), max_bytes=20)))
+        assert lines == [(b"short", 6), (None, 57), (b"ok\r", 61), (None, 91)]
+
+
+def test_long_lines_and_records_are_row_errors():
+    ndjson = b'{"a": 1}\n{"b": "' + b"x" * 100 + b'"}\n{"c": 3}\n'
+    csv_body = b'a,b\n1,"open\n' + b"y" * 15 + b"\n" + b"z" * 20 + b"\n" + b"2,3\n"
+
+    ndjson_rows = asyncio.run(collect(aiter_ndjson(chunked(ndjson, 4), max_bytes=40)))
+    csv_rows = asyncio.run(collect(aiter_csv(chunked(csv_body, 4), max_bytes=40)))
+
+    assert ndjson_rows == [(1, {"a": 1}, None), (2, None, "line is longer than 40 bytes"), (3, {"c": 3}, None)]
+    assert csv_rows == [(1, None, "record is longer than 40 bytes"), (2, {"a": "2", "b": "3"}, None)]
+
+
+def test_batch_json_body_is_limited_in_bytes(client, auth_headers, test_category, monkeypatch):
+    monkeypatch.setattr(transaction_service, "BATCH_MAX_JSON_BYTES", 100)
+
+    response = client.post(
+        "/transactions/batch", json=[transaction_data(test_category)] * 5, headers=auth_headers)
+
+    assert response.status_code == 413
+
+
+def test_batch_unsupported_content_type(client, auth_headers):
+    response = client.post(
+        "/transactions/batch", content="x",
+        headers={**auth_headers, "Content-Type": "text/plain"})
+
+    assert response.status_code == 415
@@ -1,4 +1,6 @@
+import json
 from uuid import UUID
+from app.db.models import User
 def test_create_user_success(client):
     new_user = {
         "username": "testuser",
@@ -189,4 +191,53 @@ def test_update_user_invalid_age(client, test_user):
 
     response = client.patch(f"/users/{test_user.id}", json=update_data)
 
-    assert response.status_code == 422
\ No newline at end of file
+    assert response.status_code == 422
+
+def test_update_user_password_is_hashed(client, test_user, session):
+    response = client.patch(f"/users/{test_user.id}", json={"password": "newpassword"})
+
+    assert response.status_code == 200
+    session.refresh(test_user)
+    assert test_user.password != "newpassword"
+    assert test_user.password.startswith("$2b$")
+
+
+def create_users(session, count):
+    users = [
+        User(username=f"user{i}", email=f"user{i}@example.com", password="testpassword",
+             first_name="Test", last_name="User", age=25)
+        for i in range(count)
+    ]
+    session.add_all(users)
+    session.commit()
+    return sorted(str(user.id) for user in users)
+
+
+def test_get_users_keyset_pagination(client, session):
+    expected = create_users(session, 5)
+
+    first = client.get("/users/", params={"limit": 2})
+    second = client.get("/users/", params={"limit": 2, "after": first.headers["X-Next-Cursor"]})
+    last = client.get("/users/", params={"limit": 2, "after": second.headers["X-Next-Cursor"]})
+
+    ids = [user["id"] for page in (first, second, last) for user in page.json()]
+    assert ids == expected
+    assert "X-Next-Cursor" not in last.headers
+
+
+def test_get_users_limit_is_capped(client):
+    response = client.get("/users/", params={"limit": 10_000})
+
+    assert response.status_code == 422
+
+
+def test_export_users_ndjson(client, session):
+    expected = create_users(session, 3)
+
+    response = client.get("/users/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == expected
+    assert "password" not in rows[0]
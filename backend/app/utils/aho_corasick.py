@@ -0,0 +1,53 @@
+from collections import deque
+from typing import Iterable
+
+
+class AhoCorasick:
+    """Autómata de Aho-Corasick: encuentra todas las palabras clave de un texto en una pasada
+
+    El costo de find es lineal en el largo del texto (más las coincidencias),
+    independiente de cuántas palabras clave haya.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        # Índices de los patrones que terminan en cada nodo, incluidos los sufijos
+        self.out: list[list[int]] = [[]]
+        for index, pattern in enumerate(patterns):
+            if not pattern:
+                continue
+            node = 0
+            for char in pattern:
+                child = self.goto[node].get(char)
+                if child is None:
+                    child = len(self.goto)
+                    self.goto[node][char] = child
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = child
+            self.out[node].append(index)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(char, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def find(self, text: str) -> set[int]:
+        """Índices de los patrones que aparecen en el texto"""
+        goto, fail, out = self.goto, self.fail, self.out
+        found = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
@@ -1,15 +1,76 @@
-import bcrypt
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from os import cpu_count, getenv
+from fastapi import HTTPException, status
+from .hashers import hashing_policy, identify_hasher
+
+# Pool dedicado para el hashing: bcrypt, scrypt y argon2 liberan el GIL
+PASSWORD_HASH_WORKERS = int(getenv("PASSWORD_HASH_WORKERS", str(cpu_count() or 2)))
+PASSWORD_HASH_MAX_QUEUE = int(getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    try:
-        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
-    except ValueError:
+    hasher = identify_hasher(hashed_password)
+    if hasher is None:
         return False
+    hashing_policy.count("verifications")
+    return hasher.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password.encode("utf-8"), salt)
-    return hashed_password.decode("utf-8")
+    hashing_policy.count("hashes")
+    return hashing_policy.hasher.hash(password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    return hashing_policy.needs_rehash(hashed_password)
+
+
+class PasswordHashPool:
+    """Ejecuta el hashing fuera del event loop con un límite de trabajos en cola"""
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash")
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                return False
+            self.pending += 1
+            return True
+
+    def _release(self) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    async def run(self, func, *args):
+        if not self._acquire():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Password hashing capacity exceeded, try again later",
+                headers={"Retry-After": "1"},
+            )
+        # El cupo se libera cuando termina el hilo, no el awaiting: si el cliente se
+        # desconecta y se cancela la corrutina, el hashing sigue ocupando al worker
+        future = self._executor.submit(func, *args)
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+
+password_hash_pool = PasswordHashPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
 
+async def get_password_hash_async(password: str) -> str:
+    return await password_hash_pool.run(get_password_hash, password)
@@ -0,0 +1,161 @@
+import csv
+import json
+from os import getenv
+from typing import AsyncIterator
+
+# Cada fila parseada: (número de fila, datos o None, error o None)
+ParsedRow = tuple[int, dict | None, str | None]
+
+# Tope de una línea (o registro CSV de varias líneas): más largo es un error de fila
+MAX_LINE_BYTES = int(getenv("MAX_LINE_BYTES", str(1024 * 1024)))
+
+INVALID_UTF8 = "invalid UTF-8"
+
+
+def line_too_long(max_bytes: int) -> str:
+    return f"line is longer than {max_bytes} bytes"
+
+
+def record_too_long(max_bytes: int) -> str:
+    return f"record is longer than {max_bytes} bytes"
+
+
+def decode_line(line: bytes) -> str | None:
+    try:
+        return line.decode("utf-8-sig").rstrip("\r")
+    except UnicodeDecodeError:
+        return None
+
+
+def find_line_end(buffer: bytearray, newline: bytes, unit: int, start: int) -> int:
+    # En UTF-16/32 el fin de línea solo cuenta alineado a una unidad de código
+    position = buffer.find(newline, start)
+    while position != -1 and position % unit:
+        position = buffer.find(newline, position + 1)
+    return position
+
+
+async def aiter_byte_lines(
+    chunks: AsyncIterator[bytes], max_bytes: int = MAX_LINE_BYTES, newline: bytes = b"\n", unit: int = 1
+) -> AsyncIterator[tuple[bytes | None, int]]:
+    """Corta un stream de bytes en líneas y da los bytes leídos hasta el final de cada una
+
+    Cada chunk se revisa una sola vez buscando el fin de línea. Una línea de más de
+    max_bytes se descarta sin guardarla y se entrega como None.
+    """
+    buffer = bytearray()
+    base = 0
+    searched = 0
+    too_long = False
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while (end := find_line_end(buffer, newline, unit, searched)) != -1:
+            discard = too_long or end - start > max_bytes
+            yield None if discard else bytes(buffer[start:end]), base + end + len(newline)
+            start = searched = end + len(newline)
+            too_long = False
+        del buffer[:start]
+        base += start
+        searched = max(len(buffer) - len(newline) + 1, 0) // unit * unit
+        if searched > max_bytes:
+            del buffer[:searched]
+            base += searched
+            searched = 0
+            too_long = True
+    if buffer or too_long:
+        yield None if too_long or len(buffer) > max_bytes else bytes(buffer), base + len(buffer)
+
+
+async def aiter_lines(
+    chunks: AsyncIterator[bytes], max_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[tuple[str | None, str | None]]:
+    """Corta un stream de bytes en líneas de texto sin cargarlo completo
+
+    Da (línea, None) o (None, error) si la línea no es UTF-8 válido o supera max_bytes.
+    """
+    async for line, _ in aiter_byte_lines(chunks, max_bytes):
+        if line is None:
+            yield None, line_too_long(max_bytes)
+            continue
+        text = decode_line(line)
+        yield (text, None) if text is not None else (None, INVALID_UTF8)
+
+
+async def aiter_ndjson(chunks: AsyncIterator[bytes], max_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[ParsedRow]:
+    row = 0
+    async for line, error in aiter_lines(chunks, max_bytes):
+        if error is not None:
+            row += 1
+            yield row, None, error
+            continue
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row, None, f"invalid JSON: {e.msg}"
+            continue
+        if not isinstance(data, dict):
+            yield row, None, "expected a JSON object"
+            continue
+        yield row, data, None
+
+
+async def aiter_csv(chunks: AsyncIterator[bytes], max_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[ParsedRow]:
+    """CSV con cabecera; un registro entre comillas puede ocupar varias líneas"""
+    header = None
+    pending = ""
+    row = 0
+    async for line, error in aiter_lines(chunks, max_bytes):
+        if error is not None:
+            if header is None:
+                yield 0, None, f"{error} in header"
+                return
+            # Se descarta el registro entero, aunque viniera de líneas anteriores
+            pending = ""
+            row += 1
+            yield row, None, error
+            continue
+        pending = f"{pending}\n{line}" if pending else line
+        if len(pending) > max_bytes:
+            # Comillas sin cerrar: el registro no puede crecer sin límite
+            pending = ""
+            row += 1
+            yield row, None, record_too_long(max_bytes)
+            continue
+        if pending.count('"') % 2:
+            continue
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, None, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        # Las celdas vacías se tratan como ausentes para los campos opcionales
+        yield row, {key: value for key, value in zip(header, values) if value != ""}, None
+
+
+async def aiter_json_array(body: bytes) -> AsyncIterator[ParsedRow]:
+    try:
+        data = json.loads(body)
+    except json.JSONDecodeError as e:
+        yield 0, None, f"invalid JSON: {e.msg}"
+        return
+    except UnicodeDecodeError:
+        yield 0, None, INVALID_UTF8
+        return
+    if not isinstance(data, list):
+        yield 0, None, "expected a JSON array"
+        return
+    for row, item in enumerate(data, start=1):
+        if not isinstance(item, dict):
+            yield row, None, "expected a JSON object"
+            continue
+        yield row, item, None
@@ -0,0 +1,65 @@
+import hashlib
+import re
+import unicodedata
+from collections import defaultdict
+from datetime import date
+from typing import Hashable
+
+FINGERPRINT_LENGTH = 32
+
+
+def normalize_description(description: str | None) -> str:
+    """Minúsculas, sin acentos ni puntuación y con los espacios colapsados"""
+    if not description:
+        return ""
+    text = unicodedata.normalize("NFKD", description)
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    return " ".join(re.split(r"[^a-z0-9]+", text)).strip()
+
+
+def fingerprint(*parts) -> str:
+    digest = hashlib.blake2b("\x1f".join(str(part) for part in parts).encode(), digest_size=FINGERPRINT_LENGTH // 2)
+    return digest.hexdigest()
+
+
+def trigrams(text: str) -> frozenset[str]:
+    # Sin los tokens numéricos: los extractos agregan referencias que cambian entre copias
+    words = " ".join(word for word in text.split() if not word.isdigit())
+    padded = f"  {words} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def similarity(left: frozenset[str], right: frozenset[str]) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+class NearDuplicateIndex:
+    """Índice en memoria de movimientos por (moneda, monto, día) para detectar casi duplicados
+
+    Un candidato coincide si tiene el mismo monto y moneda, una fecha dentro de la
+    ventana y una descripción parecida (Jaccard de trigramas): cada consulta revisa
+    2 * window + 1 buckets en lugar de todo el lote.
+    """
+
+    def __init__(self, window_days: int, threshold: float):
+        self.window_days = window_days
+        self.threshold = threshold
+        self.buckets: dict[tuple[str, int, int], list[tuple[Hashable, frozenset[str]]]] = defaultdict(list)
+
+    def add(self, ref: Hashable, currency: str, amount_minor: int, day: date, description: str | None) -> None:
+        self.buckets[currency, amount_minor, day.toordinal()].append(
+            (ref, trigrams(normalize_description(description))))
+
+    def match(
+        self, currency: str, amount_minor: int, day: date, description: str | None
+    ) -> list[tuple[Hashable, float]]:
+        grams = trigrams(normalize_description(description))
+        matches = []
+        for offset in range(-self.window_days, self.window_days + 1):
+            for ref, candidate in self.buckets.get((currency, amount_minor, day.toordinal() + offset), ()):
+                score = similarity(grams, candidate)
+                if score >= self.threshold:
+                    matches.append((ref, score))
+        return matches
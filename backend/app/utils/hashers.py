@@ -0,0 +1,269 @@
+import base64
+from abc import ABC, abstractmethod
+import hashlib
+import hmac
+import os
+import threading
+from time import perf_counter
+import bcrypt
+
+try:
+    import argon2
+except ImportError:  # argon2-cffi es opcional
+    argon2 = None
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+
+class PasswordHasher(ABC):
+    """Interfaz común de los algoritmos de hashing de contraseñas"""
+
+    name: str = ""
+
+    @abstractmethod
+    def identify(self, hashed_password: str) -> bool: ...
+
+    @abstractmethod
+    def hash(self, password: str) -> str: ...
+
+    @abstractmethod
+    def verify(self, password: str, hashed_password: str) -> bool: ...
+
+    @abstractmethod
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Indica si el hash está por debajo del costo configurado"""
+
+    @abstractmethod
+    def calibrate(self, target_ms: float) -> None:
+        """Ajusta el costo al mayor valor que entra en el presupuesto de latencia"""
+
+    @abstractmethod
+    def params(self) -> dict: ...
+
+    def _time_ms(self, func, *args) -> float:
+        start = perf_counter()
+        func(*args)
+        return (perf_counter() - start) * 1000
+
+
+class BcryptHasher(PasswordHasher):
+    name = "bcrypt"
+    MIN_ROUNDS = 10
+    MAX_ROUNDS = 16
+
+    def __init__(self, rounds: int = 12):
+        self.rounds = rounds
+
+    def identify(self, hashed_password: str) -> bool:
+        return hashed_password.startswith(("$2a$", "$2b$", "$2y$"))
+
+    def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        try:
+            return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+        except ValueError:
+            return False
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return int(hashed_password.split("$")[2]) < self.rounds
+
+    def calibrate(self, target_ms: float) -> None:
+        # Cada ronda extra duplica el costo: se mide la mínima y se extrapola
+        base_ms = self._time_ms(
+            bcrypt.hashpw, b"calibration", bcrypt.gensalt(rounds=self.MIN_ROUNDS))
+        rounds = self.MIN_ROUNDS
+        while rounds < self.MAX_ROUNDS and base_ms * 2 ** (rounds + 1 - self.MIN_ROUNDS) <= target_ms:
+            rounds += 1
+        self.rounds = rounds
+
+    def params(self) -> dict:
+        return {"rounds": self.rounds}
+
+
+class ScryptHasher(PasswordHasher):
+    """scrypt de hashlib con formato $scrypt$ln=<log2 N>,r=<r>,p=<p>$<salt>$<hash>"""
+
+    name = "scrypt"
+    MIN_LN = 14
+    MAX_LN = 20
+
+    def __init__(self, ln: int = 15, r: int = 8, p: int = 1):
+        self.ln = ln
+        self.r = r
+        self.p = p
+
+    def _derive(self, password: bytes, salt: bytes, ln: int, r: int, p: int) -> bytes:
+        return hashlib.scrypt(
+            password, salt=salt, n=2 ** ln, r=r, p=p,
+            maxmem=256 * r * 2 ** ln, dklen=32)
+
+    def _parse(self, hashed_password: str) -> tuple[dict, bytes, bytes]:
+        _, _, params, salt, digest = hashed_password.split("$")
+        values = dict(item.split("=") for item in params.split(","))
+        return {key: int(value) for key, value in values.items()}, _b64decode(salt), _b64decode(digest)
+
+    def identify(self, hashed_password: str) -> bool:
+        return hashed_password.startswith("$scrypt$")
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(16)
+        digest = self._derive(password.encode("utf-8"), salt, self.ln, self.r, self.p)
+        return f"$scrypt$ln={self.ln},r={self.r},p={self.p}${_b64encode(salt)}${_b64encode(digest)}"
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        try:
+            params, salt, digest = self._parse(hashed_password)
+            candidate = self._derive(
+                password.encode("utf-8"), salt, params["ln"], params["r"], params["p"])
+        except (ValueError, KeyError):
+            return False
+        return hmac.compare_digest(candidate, digest)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        params, _, _ = self._parse(hashed_password)
+        return params["ln"] < self.ln or params["r"] < self.r or params["p"] < self.p
+
+    def calibrate(self, target_ms: float) -> None:
+        # El costo crece linealmente con N = 2 ** ln
+        base_ms = self._time_ms(
+            self._derive, b"calibration", b"salt", self.MIN_LN, self.r, self.p)
+        ln = self.MIN_LN
+        while ln < self.MAX_LN and base_ms * 2 ** (ln + 1 - self.MIN_LN) <= target_ms:
+            ln += 1
+        self.ln = ln
+
+    def params(self) -> dict:
+        return {"ln": self.ln, "r": self.r, "p": self.p}
+
+
+class Argon2idHasher(PasswordHasher):
+    name = "argon2id"
+    MIN_TIME_COST = 2
+    MAX_TIME_COST = 10
+
+    def __init__(self, time_cost: int = 3, memory_cost: int = 65536, parallelism: int = 4):
+        self.memory_cost = memory_cost
+        self.parallelism = parallelism
+        self._set_time_cost(time_cost)
+
+    def _set_time_cost(self, time_cost: int) -> None:
+        self.time_cost = time_cost
+        self._hasher = argon2.PasswordHasher(
+            time_cost=time_cost, memory_cost=self.memory_cost,
+            parallelism=self.parallelism, type=argon2.Type.ID)
+
+    def identify(self, hashed_password: str) -> bool:
+        return hashed_password.startswith("$argon2id$")
+
+    def hash(self, password: str) -> str:
+        return self._hasher.hash(password)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        try:
+            return self._hasher.verify(hashed_password, password)
+        except (argon2.exceptions.VerificationError, argon2.exceptions.InvalidHashError):
+            return False
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return self._hasher.check_needs_rehash(hashed_password)
+
+    def calibrate(self, target_ms: float) -> None:
+        # El costo crece linealmente con time_cost a memoria fija
+        self._set_time_cost(1)
+        base_ms = self._time_ms(self._hasher.hash, "calibration")
+        time_cost = int(target_ms // base_ms) if base_ms else self.MAX_TIME_COST
+        self._set_time_cost(min(max(time_cost, self.MIN_TIME_COST), self.MAX_TIME_COST))
+
+    def params(self) -> dict:
+        return {
+            "time_cost": self.time_cost,
+            "memory_cost": self.memory_cost,
+            "parallelism": self.parallelism,
+        }
+
+
+HASHERS: dict[str, PasswordHasher] = {}
+
+
+def register_hasher(hasher: PasswordHasher) -> None:
+    HASHERS[hasher.name] = hasher
+
+
+register_hasher(BcryptHasher())
+register_hasher(ScryptHasher())
+if argon2 is not None:
+    register_hasher(Argon2idHasher())
+
+
+def identify_hasher(hashed_password: str) -> PasswordHasher | None:
+    """Devuelve el algoritmo que generó el hash almacenado"""
+    for hasher in HASHERS.values():
+        if hasher.identify(hashed_password):
+            return hasher
+    return None
+
+
+class HashingPolicy:
+    """Algoritmo activo, calibración de costo y contadores de uso"""
+
+    def __init__(self, algorithm: str, target_ms: float):
+        if algorithm not in HASHERS:
+            raise ValueError(f"Algoritmo de hashing no disponible: {algorithm}")
+        self.algorithm = algorithm
+        self.target_ms = target_ms
+        self.calibrated_ms: float | None = None
+        self.hashes = 0
+        self.verifications = 0
+        self.rehashes = 0
+        self._lock = threading.Lock()
+        # Aparte de _lock: los contadores se tocan desde los hilos del pool mientras se calibra
+        self._counters_lock = threading.Lock()
+
+    @property
+    def hasher(self) -> PasswordHasher:
+        return HASHERS[self.algorithm]
+
+    def calibrate(self) -> None:
+        """Micro-benchmark de arranque: ajusta el costo al presupuesto de latencia"""
+        with self._lock:
+            if self.target_ms <= 0 or self.calibrated_ms is not None:
+                return
+            self.hasher.calibrate(self.target_ms)
+            start = perf_counter()
+            self.hasher.hash("calibration")
+            self.calibrated_ms = (perf_counter() - start) * 1000
+
+    def count(self, counter: str) -> None:
+        """Incrementa hashes, verifications o rehashes; se llama desde varios hilos"""
+        with self._counters_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        hasher = identify_hasher(hashed_password)
+        return hasher is not self.hasher or hasher.needs_rehash(hashed_password)
+
+    def stats(self) -> dict:
+        with self._counters_lock:
+            counters = {"hashes": self.hashes, "verifications": self.verifications, "rehashes": self.rehashes}
+        return {
+            "algorithm": self.algorithm,
+            "params": self.hasher.params(),
+            "target_ms": self.target_ms,
+            "calibrated_ms": self.calibrated_ms,
+            **counters,
+        }
+
+
+hashing_policy = HashingPolicy(
+    algorithm=os.getenv("PASSWORD_HASH_ALGORITHM", "bcrypt"),
+    target_ms=float(os.getenv("PASSWORD_HASH_TARGET_MS", "0")),
+)
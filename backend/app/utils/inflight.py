@@ -0,0 +1,39 @@
+import asyncio
+from time import monotonic
+
+
+class InFlightCounter:
+    """Requests HTTP en curso, para drenarlos antes de cerrar el pool al apagar"""
+
+    def __init__(self):
+        self.count = 0
+
+    async def drain(self, timeout: float, interval: float = 0.05) -> bool:
+        """Espera a que terminen los requests en curso; False si se agotó el tiempo"""
+        deadline = monotonic() + timeout
+        while self.count > 0:
+            if monotonic() >= deadline:
+                return False
+            await asyncio.sleep(interval)
+        return True
+
+
+in_flight = InFlightCounter()
+
+
+class InFlightMiddleware:
+    """Middleware ASGI que mantiene el contador; incluye respuestas en streaming hasta el último byte"""
+
+    def __init__(self, app, counter: InFlightCounter = in_flight):
+        self.app = app
+        self.counter = counter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self.counter.count += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.counter.count -= 1
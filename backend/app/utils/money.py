@@ -0,0 +1,43 @@
+from decimal import ROUND_HALF_UP, Decimal
+from os import getenv
+from typing import Annotated
+from pydantic import AfterValidator, Field, PlainSerializer, StringConstraints
+
+# Los montos se guardan como enteros en centésimos (unidades menores) con escala fija
+# para todas las monedas: las sin decimales (JPY) entran exactas, guardadas ×100, y
+# las de 3 o 4 decimales (ISO 4217) no se pueden representar y se rechazan
+MONEY_SCALE = 2
+MINOR_UNIT = Decimal(1).scaleb(-MONEY_SCALE)
+DEFAULT_CURRENCY = getenv("DEFAULT_CURRENCY", "USD")
+UNSUPPORTED_CURRENCIES = frozenset({"BHD", "IQD", "JOD", "KWD", "LYD", "OMR", "TND", "CLF", "UYW"})
+
+
+def to_minor(amount: Decimal | int | float | str) -> int:
+    """Monto decimal a unidades menores; los float pasan por str para no arrastrar el error binario"""
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount))
+    return int(amount.quantize(MINOR_UNIT, rounding=ROUND_HALF_UP).scaleb(MONEY_SCALE))
+
+
+def from_minor(minor: int) -> Decimal:
+    return Decimal(int(minor)).scaleb(-MONEY_SCALE)
+
+
+def format_amount(amount: Decimal) -> str:
+    return str(amount.quantize(MINOR_UNIT))
+
+
+def check_currency(code: str) -> str:
+    if code in UNSUPPORTED_CURRENCIES:
+        raise ValueError(f"{code} has more than {MONEY_SCALE} decimal places and is not supported")
+    return code
+
+
+# Monto en la API: Decimal exacto al validar y string al serializar ("12.50"), sin pasar por float
+Amount = Annotated[
+    Decimal,
+    Field(decimal_places=MONEY_SCALE),
+    PlainSerializer(format_amount, return_type=str, when_used="json"),
+]
+
+CurrencyCode = Annotated[str, StringConstraints(pattern=r"^[A-Z]{3}$"), AfterValidator(check_currency)]
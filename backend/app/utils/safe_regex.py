@@ -0,0 +1,64 @@
+import re
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+# Las reglas regex las escribe el usuario y se evalúan en el event loop: se
+# acepta solo un subconjunto con backtracking acotado y con entrada acotada
+REGEX_MAX_LENGTH = 200
+REGEX_MAX_INPUT = 512
+# Tope de caminos que el backtracking puede probar en una búsqueda sobre REGEX_MAX_INPUT caracteres
+REGEX_MAX_STEPS = 1_000_000
+
+REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, sre_constants.POSSESSIVE_REPEAT)
+
+
+def walk(pattern: sre_parse.SubPattern, in_repeat: bool) -> int:
+    """Valida el patrón y devuelve cuántas formas tiene de repartirse un texto
+
+    Una secuencia multiplica las de sus partes, una alternativa las suma y un
+    cuantificador aporta su rango, con los abiertos acotados por REGEX_MAX_INPUT.
+    """
+    ways = 1
+    for op, av in pattern:
+        if op in (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS):
+            raise ValueError("backreferences are not allowed")
+        if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            raise ValueError("lookarounds are not allowed")
+        if op in REPEATS:
+            if in_repeat:
+                raise ValueError("nested quantifiers are not allowed")
+            low, high, item = av
+            walk(item, True)
+            ways *= min(high, REGEX_MAX_INPUT) - low + 1
+        elif op == sre_constants.BRANCH:
+            if in_repeat:
+                raise ValueError("alternation inside a quantifier is not allowed")
+            ways *= sum(walk(branch, in_repeat) for branch in av[1])
+        elif op == sre_constants.SUBPATTERN:
+            ways *= walk(av[3], in_repeat)
+        elif op == sre_constants.ATOMIC_GROUP:
+            ways *= walk(av, in_repeat)
+    return ways
+
+
+def compile_rule_regex(pattern: str) -> re.Pattern:
+    """Compila una regex de regla rechazando lo que puede disparar backtracking catastrófico
+
+    Además de los cuantificadores anidados y las alternativas repetidas (como (a+)+
+    o (a|a)*) se rechazan los patrones cuyos cuantificadores combinados pueden
+    probar más de REGEX_MAX_STEPS caminos: en la práctica, un único cuantificador
+    abierto como .* o \\s+. El texto se recorta a REGEX_MAX_INPUT caracteres al buscar.
+    """
+    if len(pattern) > REGEX_MAX_LENGTH:
+        raise ValueError(f"regex is longer than {REGEX_MAX_LENGTH} characters")
+    try:
+        parsed = sre_parse.parse(pattern, re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"invalid regex: {e}")
+    if walk(parsed, False) * REGEX_MAX_INPUT > REGEX_MAX_STEPS:
+        raise ValueError("regex can backtrack too much, use at most one open-ended quantifier")
+    return re.compile(pattern, re.IGNORECASE)
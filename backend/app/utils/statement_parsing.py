@@ -0,0 +1,231 @@
+import codecs
+import csv
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import AsyncIterator
+from .batch_parsing import MAX_LINE_BYTES, aiter_byte_lines, line_too_long, record_too_long
+
+# Cada registro de un extracto: (número de registro, offset en bytes al final del
+# registro, datos o None, error o None). El offset permite reanudar una importación.
+StatementRecord = tuple[int, int, dict | None, str | None]
+
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d")
+
+
+# Marcas BOM de UTF-32 antes que las de UTF-16: FF FE también empieza la de UTF-32 LE
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"), (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"), (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+
+def line_codec(encoding: str, head: bytes = b"") -> tuple[str, bytes]:
+    """Codec sin BOM y fin de línea en bytes para cortar el archivo antes de decodificarlo
+
+    UTF-16 y UTF-32 sin endianness toman la de la marca BOM (o little-endian, la de
+    Windows). Un encoding que no codifica texto lanza LookupError.
+    """
+    name = codecs.lookup(encoding).name
+    if name in ("utf-16", "utf-32"):
+        name = next((codec for bom, codec in BOMS if codec.startswith(name) and head.startswith(bom)),
+                    f"{name}-le")
+    newline = "\n".encode(name)
+    return ("utf-8-sig" if name == "utf-8" else name), newline
+
+
+def line_decoder(codec: str):
+    """Decodificador de líneas: None si la línea no es válida en el encoding
+
+    Descarta la marca BOM. Muchos bancos exportan en latin-1, cp1252 o UTF-16.
+    """
+
+    def decode(line: bytes) -> str | None:
+        try:
+            return line.decode(codec).lstrip("\ufeff").rstrip("\r")
+        except UnicodeDecodeError:
+            return None
+
+    return decode
+
+
+async def aiter_offset_lines(
+    chunks: AsyncIterator[bytes], offset: int = 0, encoding: str = "utf-8", max_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[tuple[str | None, str | None, int]]:
+    """Como aiter_lines, pero con el offset absoluto en bytes al final de cada línea
+
+    Da (línea, None, offset) o (None, error, offset) si la línea no decodifica o supera
+    max_bytes. Los primeros bytes se leen antes para reconocer la marca BOM.
+    """
+    chunks = aiter(chunks)
+    head = b""
+    while len(head) < 4 and (chunk := await anext(chunks, None)) is not None:
+        head += chunk
+
+    async def rest() -> AsyncIterator[bytes]:
+        if head:
+            yield head
+        async for chunk in chunks:
+            yield chunk
+
+    codec, newline = line_codec(encoding, head)
+    decode = line_decoder(codec)
+    async for line, end in aiter_byte_lines(rest(), max_bytes, newline, len(newline)):
+        if line is None:
+            yield None, line_too_long(max_bytes), offset + end
+            continue
+        text = decode(line)
+        if text is None:
+            yield None, f"invalid {encoding}, set the file encoding", offset + end
+            continue
+        yield text, None, offset + end
+
+
+def sniff_delimiter(header_line: str) -> str:
+    # Muchos bancos exportan con ';' porque la coma es el separador decimal
+    return ";" if header_line.count(";") > header_line.count(",") else ","
+
+
+async def aiter_statement_csv(
+    chunks: AsyncIterator[bytes], offset: int = 0, header: list[str] | None = None, delimiter: str | None = None,
+    encoding: str = "utf-8", max_bytes: int = MAX_LINE_BYTES,
+) -> AsyncIterator[StatementRecord]:
+    """Extracto CSV con cabecera; si se reanuda a mitad de archivo se pasa la cabecera ya leída
+
+    Una línea que no decodifica con encoding es un error de esa fila, no del extracto.
+    """
+    pending = ""
+    row = 0
+    async for line, error, end in aiter_offset_lines(chunks, offset, encoding, max_bytes):
+        if error is not None:
+            if header is None:
+                too_long = error == line_too_long(max_bytes)
+                yield 0, end, None, f"header {error}" if too_long else f"header is not valid {encoding}"
+                return
+            pending = ""
+            row += 1
+            yield row, end, None, error
+            continue
+        pending = f"{pending}\n{line}" if pending else line
+        if len(pending) > max_bytes:
+            pending = ""
+            row += 1
+            yield row, end, None, record_too_long(max_bytes)
+            continue
+        if pending.count('"') % 2:
+            continue
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+        if delimiter is None:
+            delimiter = sniff_delimiter(record)
+        values = next(csv.reader([record], delimiter=delimiter))
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, end, None, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, end, {key: value.strip() for key, value in zip(header, values) if value.strip()}, None
+
+
+async def aiter_ofx_tokens(chunks: AsyncIterator[bytes], offset: int = 0) -> AsyncIterator[tuple[bytes, int]]:
+    """Corta el stream en tokens que empiezan en '<', con el offset al final de cada uno"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while (next_tag := buffer.find(b"<", start + 1)) != -1:
+            yield buffer[start:next_tag], offset + next_tag
+            start = next_tag
+        buffer = buffer[start:]
+        offset += start
+    if buffer:
+        yield buffer, offset + len(buffer)
+
+
+async def aiter_ofx(chunks: AsyncIterator[bytes], offset: int = 0) -> AsyncIterator[StatementRecord]:
+    """Movimientos <STMTTRN> de un OFX (SGML o XML) leídos tag por tag en streaming
+
+    Se trabaja sobre bytes para que los offsets coincidan con el archivo; los
+    valores se decodifican como latin-1, el charset habitual de los OFX 1.x.
+    La cuenta (BANKID:ACCTID) acompaña a cada movimiento porque el FITID solo es
+    único dentro de su cuenta.
+    """
+    currency = None
+    account: dict[str, str] = {}
+    current: dict | None = None
+    row = 0
+    async for token, end in aiter_ofx_tokens(chunks, offset):
+        if not token.startswith(b"<"):
+            continue
+        tag, _, value = token[1:].decode("latin-1").partition(">")
+        tag, value = tag.strip().upper(), value.strip()
+        if tag == "CURDEF":
+            currency = value
+        elif tag in ("BANKID", "ACCTID") and current is None:
+            account[tag] = value
+        elif tag == "STMTTRN":
+            current = {}
+        elif tag == "/STMTTRN" and current is not None:
+            row += 1
+            yield row, end, {
+                "date": current.get("DTPOSTED"),
+                "amount": current.get("TRNAMT"),
+                "description": " - ".join(
+                    part for part in (current.get("NAME"), current.get("MEMO")) if part) or None,
+                "external_id": current.get("FITID"),
+                "account": ":".join(account[tag] for tag in ("BANKID", "ACCTID") if tag in account) or None,
+                "currency": currency,
+            }, None
+            current = None
+        elif current is not None and not tag.startswith("/") and value:
+            current[tag] = value
+
+
+def parse_statement_date(value: str, date_format: str | None = None) -> datetime:
+    value = value.strip()
+    if date_format:
+        return datetime.strptime(value, date_format)
+    # Fechas OFX: AAAAMMDD[HHMMSS[.XXX]][[-3:ART]]
+    match = re.fullmatch(r"(\d{8})(\d{6})?(\.\d+)?(\[.*\])?", value)
+    if match:
+        return datetime.strptime(match.group(1) + (match.group(2) or "000000"), "%Y%m%d%H%M%S")
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    for candidate in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, candidate)
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognized date '{value}'")
+
+
+def parse_statement_amount(value: str) -> Decimal:
+    """Monto con separadores locales: '1.234,56', '1,234.56', '(12.50)', '-12,5' o '12,50-'"""
+    text = re.sub(r"[^\d,.\-()]", "", value.strip())
+    negative = text.startswith("(") and text.endswith(")")
+    text = text.strip("()")
+    if text.endswith("-") and not text.startswith("-"):
+        negative, text = True, text[:-1]
+    if "," in text and "." in text:
+        decimal_separator = "," if text.rfind(",") > text.rfind(".") else "."
+    elif text.count(",") == 1 and len(text) - text.rfind(",") - 1 != 3:
+        decimal_separator = ","
+    elif text.count(".") > 1:
+        decimal_separator = ","
+    else:
+        decimal_separator = "."
+    thousands = {",", "."} - {decimal_separator}
+    for separator in thousands:
+        text = text.replace(separator, "")
+    if decimal_separator == ",":
+        text = text.replace(",", ".")
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"invalid amount '{value}'")
+    return -amount if negative else amount
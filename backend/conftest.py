@@ -2,36 +2,63 @@ import pytest
 import uuid
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import SQLModel, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.main import app
-from app.db.session import get_session
-from app.db.models import User
+from app.routes import internal_routes
+from app.db.session import get_async_session, get_db_engine, get_session_factory
+from app.db.models import Categories, User
+from app.auth.jwt_manager import create_access_token
 
-SQLITE_URL = "sqlite:///:memory:"
 
-engine = create_engine(SQLITE_URL, connect_args={
-                       "check_same_thread": False}, poolclass=StaticPool)
+@pytest.fixture(name="db_path")
+def db_path_fixture(tmp_path):
+    # Archivo compartido: el engine síncrono carga datos de prueba y el
+    # engine aiosqlite atiende a la app
+    return tmp_path / "test.db"
+
+
+@pytest.fixture(name="async_engine")
+def async_engine_fixture(db_path):
+    # NullPool: TestClient puede usar un event loop distinto por request
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    yield engine
+    engine.sync_engine.dispose()
 
 
 @pytest.fixture(name="session")
-def session_fixture():
+def session_fixture(db_path):
+    engine = create_engine(f"sqlite:///{db_path}", poolclass=NullPool)
     SQLModel.metadata.create_all(engine)
     with Session(engine) as session:
         yield session
     SQLModel.metadata.drop_all(engine)
+    engine.dispose()
 
 
 @pytest.fixture(name="client")
-def client_fixture(session: Session):
-    def get_session_override():
-        return session
-    app.dependency_overrides[get_session] = get_session_override
+def client_fixture(session: Session, async_engine):
+    async def get_session_override():
+        async with AsyncSession(async_engine, expire_on_commit=False) as async_session:
+            yield async_session
+    app.dependency_overrides[get_async_session] = get_session_override
+    app.dependency_overrides[get_session_factory] = lambda: async_sessionmaker(
+        async_engine, class_=AsyncSession, expire_on_commit=False)
+    app.dependency_overrides[get_db_engine] = lambda: async_engine
     client = TestClient(app)
     yield client
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def internal_headers(monkeypatch):
+    monkeypatch.setattr(internal_routes, "INTERNAL_API_TOKEN", "internal-secret")
+    return {"X-Internal-Token": "internal-secret"}
+
+
 @pytest.fixture
 def test_user(session):
     user_id = uuid.uuid4()
@@ -39,3 +66,19 @@ def test_user(session):
     session.add(user)
     session.commit()
     return user
+
+
+@pytest.fixture
+def auth_headers(test_user):
+    token = create_access_token(
+        {"sub": test_user.username, "uid": str(test_user.id), "scopes": ["me"]})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def test_category(session, test_user):
+    category = Categories(user_id=test_user.id, name="Groceries")
+    session.add(category)
+    session.commit()
+    session.refresh(category)
+    return category